@@ -0,0 +1,5 @@
+# Standalone benchmark scripts; run from the ``mysite`` directory, e.g.
+#   python -m benchmarks.bench_black_scholes
+# The suite runs every hot path and stores JSON for comparing commits:
+#   python -m benchmarks.suite --out before.json   (then after.json on the new commit)
+#   python -m benchmarks.report before.json after.json
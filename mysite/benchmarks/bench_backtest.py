@@ -0,0 +1,90 @@
+"""Backtest engine: every start date at once vs. rolling each start on its own.
+
+    python -m benchmarks.bench_backtest [--years 10 20] [--days 30] [--loop-starts 50]
+
+Rolls a 30-day iron condor over a synthetic GBM close history with a 21-day realized
+vol. The per-start loop walks its cycles one after another, pricing each cycle's marks
+in one bsm_price_batch call; its time is measured on --loop-starts starts and scaled
+to all of them. Both must produce the same equity curves.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from options.optionslib import OptionStrat
+from options.optionslib.backtest import backtest, realized_vol
+from options.optionslib.black_scholes import bsm_price_batch
+from options.optionslib.strategy import DAYS_PER_YEAR
+
+
+def _history(years, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = np.arange(np.datetime64("2000-01-03"), np.datetime64("2000-01-03") + int(365.25 * years))
+    dates = dates[np.is_busday(dates)]
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0.0003, 0.011, len(dates))))
+    return dates, close
+
+
+def _condor():
+    strat = OptionStrat("iron condor", 100.0)
+    strat.long_put(90, 0.5)
+    strat.short_put(95, 1.2)
+    strat.short_call(105, 1.1)
+    strat.long_call(110, 0.4)
+    return strat
+
+
+def _roll_one(strat, dates, close, days, sigma, r, start):
+    """Equity curve of one start, cycle by cycle (single-expiry strategies)."""
+    legs = strat.leg_array()
+    weight = (legs["side"] * legs["Q"]).astype(float)
+    day = dates.astype(np.int64)
+    n = len(day)
+    equity = np.full(n, np.nan)
+    base, i = 0.0, start
+    while True:
+        expiry = day[i] + days
+        exit_ = int(np.searchsorted(day, expiry))
+        end = min(exit_, n - 1)
+        j = np.arange(i, end + 1)
+        T = np.maximum(expiry - day[j], 0.0)[:, None] / DAYS_PER_YEAR
+        K = close[i] * legs["K"] / strat.S0
+        value = bsm_price_batch(close[j, None], K, T, r, sigma[j, None], 0.0, legs["is_call"]) @ weight
+        equity[i:end + 1] = base + value - value[0]
+        base = equity[end]
+        if exit_ >= n - 1:
+            return equity
+        i = exit_
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--years", type=int, nargs="+", default=[10, 20])
+    ap.add_argument("--days", type=float, default=30)
+    ap.add_argument("--loop-starts", type=int, default=50)
+    args = ap.parse_args(argv)
+
+    strat = _condor()
+    print(f"{'years':>5} {'closes':>7} {'starts':>7} {'vectorized s':>13} {'loop s (est.)':>14} {'speedup':>8}")
+    for years in args.years:
+        dates, close = _history(years)
+        sigma = realized_vol(close)
+        starts = np.arange(0, len(dates), 5)
+
+        t0 = time.perf_counter()
+        res = backtest(strat, dates, close, args.days, sigma, 0.02, starts=starts)
+        vectorized = time.perf_counter() - t0
+
+        sample = starts[:: max(1, len(starts) // args.loop_starts)][: args.loop_starts]
+        t0 = time.perf_counter()
+        curves = [_roll_one(strat, dates, close, args.days, sigma, 0.02, s) for s in sample]
+        loop = (time.perf_counter() - t0) * len(starts) / len(sample)
+        rows = np.searchsorted(starts, sample)
+        assert np.allclose(np.array(curves), res["equity"][rows], equal_nan=True)
+        print(f"{years:>5} {len(dates):>7} {len(starts):>7} {vectorized:>13.3f} {loop:>14.2f} "
+              f"{loop / vectorized:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
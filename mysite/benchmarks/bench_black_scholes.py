@@ -0,0 +1,58 @@
+"""Scalar vs. batch Black-Scholes throughput.
+
+    python -m benchmarks.bench_black_scholes [--sizes 1000 100000 1000000]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from options.optionslib.black_scholes import bsm_price, greeks, bsm_price_batch, greeks_batch
+
+
+def _chain(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        "spot": np.full(n, 100.0),
+        "strike": rng.uniform(50.0, 150.0, n),
+        "t": rng.uniform(1 / 365.25, 2.0, n),
+        "r": np.full(n, 0.02),
+        "sigma": rng.uniform(0.05, 0.8, n),
+        "q": np.zeros(n),
+        "kind": rng.choice(np.array(["C", "P"]), n),
+    }
+
+
+def _timeit(fn):
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def _scalar(chain):
+    cols = [chain[k].tolist() for k in ("spot", "strike", "t", "r", "sigma", "q", "kind")]
+    for s, k, t, r, v, q, kind in zip(*cols):
+        bsm_price(s, k, t, r, v, q, kind)
+        greeks(s, k, t, r, v, q, kind)
+
+
+def _batch(chain):
+    bsm_price_batch(**chain)
+    greeks_batch(**chain)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    args = ap.parse_args(argv)
+
+    print(f"{'contracts':>10} {'scalar s':>10} {'batch s':>10} {'speedup':>8} {'batch c/s':>12}")
+    for n in args.sizes:
+        chain = _chain(n)
+        t_scalar = _timeit(lambda: _scalar(chain))
+        t_batch = _timeit(lambda: _batch(chain))
+        print(f"{n:>10} {t_scalar:>10.4f} {t_batch:>10.4f} {t_scalar / t_batch:>7.1f}x {n / t_batch:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Chain store: append throughput, open cost, chain/quote lookups and RSS on a synthetic history.
+
+    python -m benchmarks.bench_chainstore [--days 250] [--underlyings 40] [--dir /tmp/chains]
+
+The history is days x underlyings x 8 expiries x 100 strikes x call/put quotes
+(the defaults make 16M quotes, ~1 GB on disk). Lookups run in a fresh interpreter
+and report private memory apart from mapped (reclaimable) page cache. Linux only.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from options.optionslib.chainstore import ChainStore, to_day
+
+EXPIRIES = 8
+STRIKES = 100
+
+_CHILD = r"""
+import json, sys, time
+import numpy as np
+from options.optionslib.chainstore import ChainStore
+path, n = sys.argv[1], int(sys.argv[2])
+t0 = time.perf_counter()
+store = ChainStore(path)
+opened = time.perf_counter() - t0
+rng = np.random.default_rng(1)
+segs = store.segments[rng.integers(0, len(store.segments), n)]
+t0 = time.perf_counter()
+total = 0.0
+for u, d, e in zip(segs["underlying"], segs["date"], segs["expiry"]):
+    chain = store.chain(store.symbols[u], np.datetime64(int(d), "D"), np.datetime64(int(e), "D"))
+    total += float(chain.mid.sum())
+chains = time.perf_counter() - t0
+ids = rng.integers(0, len(store), n)
+t0 = time.perf_counter()
+for i in ids:
+    store.quote(i)
+quotes = time.perf_counter() - t0
+# RssFile is mapped page cache the kernel can drop; RssAnon is what the reader really holds
+status = dict(line.split(":", 1) for line in open("/proc/self/status"))
+print(json.dumps({"open_s": opened, "chain_s": chains / n, "quote_s": quotes / n,
+                  "anon_mb": int(status["RssAnon"].split()[0]) / 1024,
+                  "file_mb": int(status["RssFile"].split()[0]) / 1024}))
+"""
+
+
+def _batch(day, symbols, rng):
+    """One quote date for every underlying: the shape of a daily vendor file."""
+    n_u = len(symbols)
+    per = EXPIRIES * STRIKES * 2
+    spot = 50.0 + 10.0 * np.arange(n_u)
+    u = np.repeat(np.arange(n_u), per)
+    expiry = day + 7 * np.tile(np.repeat(np.arange(1, EXPIRIES + 1), STRIKES * 2), n_u)
+    moneyness = np.tile(np.repeat(np.linspace(0.7, 1.3, STRIKES), 2), n_u * EXPIRIES)
+    strike = np.round(spot[u] * moneyness, 1)
+    is_call = np.tile([True, False], n_u * EXPIRIES * STRIKES)
+    mid = np.maximum(np.where(is_call, spot[u] - strike, strike - spot[u]), 0.0) + rng.uniform(0.1, 3.0, len(u))
+    columns = {"strike": strike, "is_call": is_call, "bid": mid - 0.05, "ask": mid + 0.05,
+               "iv": rng.uniform(0.1, 0.6, len(u)), "underlying_price": spot[u],
+               "volume": rng.integers(0, 1000, len(u)), "open_interest": rng.integers(0, 10000, len(u))}
+    return np.asarray(symbols)[u], np.full(len(u), day), expiry, columns
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--days", type=int, default=250)
+    ap.add_argument("--underlyings", type=int, default=40)
+    ap.add_argument("--lookups", type=int, default=2000)
+    ap.add_argument("--dir", help="store directory (default: a temporary one, removed afterwards)")
+    args = ap.parse_args(argv)
+
+    path = args.dir or tempfile.mkdtemp(prefix="chainstore-")
+    try:
+        store = ChainStore.create(path)
+        symbols = [f"S{i:03d}" for i in range(args.underlyings)]
+        rng = np.random.default_rng(0)
+        first = to_day("2020-01-01")
+        t0 = time.perf_counter()
+        for d in range(args.days):
+            store.append(*_batch(first + d, symbols, rng))
+        elapsed = time.perf_counter() - t0
+        size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+        print(f"append: {len(store):,} quotes, {len(store.segments):,} chains, {size / 2**20:,.0f} MB "
+              f"in {elapsed:.1f}s ({len(store) / elapsed:,.0f} quotes/s)")
+
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")])))
+        proc = subprocess.run([sys.executable, "-c", _CHILD, path, str(args.lookups)],
+                              capture_output=True, text=True, env=env)
+        if proc.returncode != 0:
+            sys.exit(proc.stderr)
+        r = json.loads(proc.stdout)
+        print(f"open:   {1e3 * r['open_s']:8.1f} ms")
+        print(f"chain:  {1e6 * r['chain_s']:8.1f} us per chain() + mid over {STRIKES * 2} quotes")
+        print(f"quote:  {1e6 * r['quote_s']:8.1f} us per quote(id)")
+        print(f"reader RSS after {2 * args.lookups} random lookups: {r['anon_mb']:.1f} MB private, "
+              f"{r['file_mb']:.1f} MB mapped page cache")
+    finally:
+        if not args.dir:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
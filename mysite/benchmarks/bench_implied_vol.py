@@ -0,0 +1,52 @@
+"""Implied-vol solver throughput on a synthetic chain.
+
+    python -m benchmarks.bench_implied_vol [--n 100000] [--repeat 5]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from options.optionslib.black_scholes import bsm_price_batch
+from options.optionslib.implied_vol import implied_vol_batch, implied_vol, IV_OK, IV_STATUS
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--n", type=int, default=100_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--scalar-sample", type=int, default=2_000)
+    args = ap.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    n = args.n
+    strike = rng.uniform(40.0, 200.0, n)
+    t = rng.uniform(1 / 365.25, 2.0, n)
+    true_vol = rng.uniform(0.05, 1.5, n)
+    kind = rng.choice(np.array(["C", "P"]), n)
+    price = bsm_price_batch(100.0, strike, t, 0.02, true_vol, 0.0, kind)
+
+    best = float("inf")
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        sigma, status = implied_vol_batch(price, 100.0, strike, t, 0.02, 0.0, kind)
+        best = min(best, time.perf_counter() - t0)
+
+    m = args.scalar_sample
+    t0 = time.perf_counter()
+    for i in range(m):
+        implied_vol(price[i], 100.0, strike[i], t[i], 0.02, 0.0, kind[i])
+    per_scalar = (time.perf_counter() - t0) / m
+
+    counts = {IV_STATUS[c]: int((status == c).sum()) for c in IV_STATUS}
+    print(f"contracts:        {n:,}")
+    print(f"batch best-of-{args.repeat}:  {best:.4f} s  ({n / best:,.0f} contracts/s)")
+    print(f"per-contract loop: {per_scalar * n:.4f} s est. ({1 / per_scalar:,.0f} contracts/s)")
+    print(f"status:           {counts}")
+    ok = status == IV_OK
+    residual = np.abs(bsm_price_batch(100.0, strike[ok], t[ok], 0.02, sigma[ok], 0.0, kind[ok]) - price[ok])
+    print(f"price-space residual (ok): {residual.max():.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Lattice accuracy vs. steps vs. wall time, against ``bsm_price`` in the European limit.
+
+    python -m benchmarks.bench_lattice [--strikes 50] [--steps 32 64 128 256 512 1024]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from options.optionslib.black_scholes import bsm_price_batch
+from options.optionslib.lattice import LATTICE_METHODS, lattice_price_batch
+
+
+def _best(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def _err(a, b):
+    e = np.abs(a - b)
+    return f"{np.median(e):>10.2e} {e.max():>10.2e}"
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--strikes", type=int, default=50)
+    ap.add_argument("--steps", type=int, nargs="+", default=[32, 64, 128, 256, 512, 1024])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+
+    S, t, r, sigma = 100.0, 1.0, 0.05, 0.2
+    K = np.linspace(70.0, 130.0, args.strikes)
+    exact = bsm_price_batch(S, K, t, r, sigma, 0.0, "P")
+    # American reference: a very fine smoothed + extrapolated tree
+    ref = lattice_price_batch(S, K, t, r, sigma, 0.0, "P", steps=8192)
+
+    print(f"{args.strikes} put strikes sharing one tree; median / max abs error")
+    print(f"{'method':>10} {'richardson':>10} {'steps':>6} {'european':>21} {'american':>21} {'ms':>8}")
+    for method in LATTICE_METHODS:
+        for richardson in (False, True):
+            for n in args.steps:
+                kw = dict(steps=n, method=method, richardson=richardson)
+                _, eu = _best(lambda: lattice_price_batch(S, K, t, r, sigma, 0.0, "P", american=False, **kw), 1)
+                dt, am = _best(lambda: lattice_price_batch(S, K, t, r, sigma, 0.0, "P", **kw), args.repeat)
+                print(f"{method:>10} {str(richardson):>10} {n:>6} {_err(eu, exact)} {_err(am, ref)} "
+                      f"{1e3 * dt:>8.2f}")
+
+    dt, _ = _best(lambda: bsm_price_batch(S, K, t, r, sigma, 0.0, "P"), args.repeat)
+    print(f"bsm_price_batch (European, closed form): {1e3 * dt:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
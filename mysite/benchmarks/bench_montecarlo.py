@@ -0,0 +1,47 @@
+"""Monte Carlo P&L distribution of a strategy, serial vs process pool.
+
+    python -m benchmarks.bench_montecarlo [--paths 2000000] [--workers 4]
+"""
+import argparse
+import time
+
+from options.optionslib import OptionStrat
+from options.optionslib.montecarlo import price_path_payoff, strategy_pnl_distribution
+
+
+def _asian_call(paths):
+    return (paths[:, 1:].mean(axis=1) - 100.0).clip(min=0.0)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--paths", type=int, default=2_000_000)
+    ap.add_argument("--workers", type=int, default=4)
+    args = ap.parse_args(argv)
+
+    strat = OptionStrat("bench", 100)
+    strat.long_put(95, 2.1)
+    strat.short_put(100, 4.0)
+    strat.short_call(105, 3.2)
+    strat.long_call(110, 1.4)
+
+    for workers in (1, args.workers):
+        t0 = time.perf_counter()
+        res = strategy_pnl_distribution(strat, 100, 30, 0.25, 0.02, n_paths=args.paths, workers=workers)
+        dt = time.perf_counter() - t0
+        print(f"strategy P&L  workers={workers}: {1e3 * dt:8.1f} ms  "
+              f"E={res['expected_pnl']:.4f} VaR95={res['var']:.3f} ES95={res['es']:.3f} "
+              f"P(profit)={res['prob_profit']:.3f}")
+
+    n = args.paths // 20
+    for workers in (1, args.workers):
+        t0 = time.perf_counter()
+        res = price_path_payoff(_asian_call, 100, 1.0, 0.05, 0.2, n_paths=n, n_steps=52,
+                                control_strike=100, workers=workers)
+        dt = time.perf_counter() - t0
+        print(f"asian call    workers={workers}: {1e3 * dt:8.1f} ms  "
+              f"price={res['price']:.4f} ± {res['std_error']:.4f}")
+
+
+if __name__ == "__main__":
+    main()
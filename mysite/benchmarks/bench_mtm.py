@@ -0,0 +1,40 @@
+"""Mark-to-market curve cost: legs x valuation dates x grid points.
+
+    python -m benchmarks.bench_mtm [--legs 20] [--dates 10] [--points 10000]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from options.optionslib import OptionStrat
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--legs", type=int, default=20)
+    ap.add_argument("--dates", type=int, default=10)
+    ap.add_argument("--points", type=int, default=10_000)
+    ap.add_argument("--repeat", type=int, default=10)
+    args = ap.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    strat = OptionStrat("bench", 100, {"start": 0, "stop": 300, "by": 300 / args.points})
+    for _ in range(args.legs):
+        leg = getattr(strat, rng.choice(["long_call", "short_call", "long_put", "short_put"]))
+        leg(float(rng.uniform(50, 150)), float(rng.uniform(0, 10)), int(rng.integers(1, 4)))
+    days = np.linspace(1, 60, args.dates)
+    strat.STs  # grid allocation is not part of the measurement
+
+    strat.mtm_values(days, [0.3], 0.02)
+    times = []
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        strat.mtm_values(days, [0.3], 0.02)
+        times.append(time.perf_counter() - t0)
+    print(f"{args.legs} legs x {args.dates} dates x {len(strat.STs)} points: "
+          f"best {1e3 * min(times):.1f} ms, median {1e3 * float(np.median(times)):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
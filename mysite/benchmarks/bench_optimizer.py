@@ -0,0 +1,53 @@
+"""Iron condor / vertical search time on a synthetic chain, with and without the bound.
+
+    python -m benchmarks.bench_optimizer [--strikes 50 100 200] [--max-loss 5]
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from options.optionslib import optimizer
+from options.optionslib.black_scholes import bsm_price_batch
+
+
+def _chain(n, S0=100.0, days=45):
+    K = np.linspace(0.5 * S0, 1.5 * S0, n)
+    T = days / 365.25
+    iv = 0.22 - 0.15 * np.log(K / S0) + 0.3 * np.log(K / S0) ** 2
+    calls = bsm_price_batch(S0, K, T, 0.0, iv, 0.0, "C").round(2)
+    puts = bsm_price_batch(S0, K, T, 0.0, iv, 0.0, "P").round(2)
+    return K, calls, puts
+
+
+def _time(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - t0, out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--strikes", type=int, nargs="+", default=[50, 100, 200])
+    ap.add_argument("--max-loss", type=float, default=None)
+    args = ap.parse_args(argv)
+
+    print(f"{'strikes':>8} {'condors':>12} {'objective':>15} {'pruned s':>9} {'full s':>8} {'verticals s':>12}")
+    for n in args.strikes:
+        K, calls, puts = _chain(n)
+        kw = dict(max_loss=args.max_loss, top_n=10, days=45, sigma=0.18)
+        for objective in optimizer.OBJECTIVES:
+            pruned, a = _time(lambda: optimizer.optimize_chain(100.0, K, calls, puts, "iron_condor", objective, **kw))
+            saved, optimizer._ADDITIVE = optimizer._ADDITIVE, ()  # same search without the bound
+            try:
+                full, b = _time(lambda: optimizer.optimize_chain(100.0, K, calls, puts, "iron_condor", objective, **kw))
+            finally:
+                optimizer._ADDITIVE = saved
+            assert [r["score"] for r in a] == [r["score"] for r in b], objective
+            vert, _ = _time(lambda: optimizer.optimize_chain(100.0, K, calls, puts, "bull_put", objective, **kw))
+            print(f"{n:>8} {math.comb(n, 4):>12,} {objective:>15} {pruned:>9.3f} {full:>8.3f} {vert:>12.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Requests/sec of the payoff.png view for each renderer, PNG cache disabled.
+
+    python -m benchmarks.bench_payoff_png [--requests 50]
+"""
+import argparse
+import json
+import os
+import time
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mysite.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.test import Client  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+from options.viewslib import chart  # noqa: E402
+from options.viewslib.cache import payoff_png_cache  # noqa: E402
+
+LEGS = [
+    {"type": "call", "side": "long", "K": 95, "price": 7.5},
+    {"type": "call", "side": "short", "K": 105, "price": 3.1},
+    {"type": "put", "side": "long", "K": 90, "price": 2.2},
+]
+
+
+def _run(client, renderer, n):
+    chart.RENDERER = renderer
+    client.get("/payoff.png", {"start": 0, "stop": 200, "by": 0.5, "legs": json.dumps(LEGS)})  # warm-up
+    t0 = time.perf_counter()
+    for i in range(n):
+        payoff_png_cache.local.clear()
+        resp = client.get("/payoff.png", {"name": f"bench {i}", "start": 0, "stop": 200, "by": 0.5,
+                                          "legs": json.dumps(LEGS)})
+        assert resp.status_code == 200, resp.status_code
+    return n / (time.perf_counter() - t0)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--requests", type=int, default=50)
+    args = ap.parse_args(argv)
+
+    setup_test_environment()
+    client = Client()
+    before = _run(client, "pyplot", args.requests)
+    print(f"pyplot (before): {before:8.1f} req/s")
+    for renderer in ("canvas", "svg"):
+        after = _run(client, renderer, args.requests)
+        print(f"{renderer + ' (after):':<17}{after:8.1f} req/s  ({after / before:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
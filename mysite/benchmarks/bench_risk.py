@@ -0,0 +1,62 @@
+"""Portfolio greeks + spot x vol risk grid for large portfolios.
+
+    python -m benchmarks.bench_risk [--legs 500] [--spot-steps 41] [--vol-steps 21]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from options.optionslib import OptionStrat
+from options.optionslib.black_scholes import bsm_price, greeks
+
+
+def _loop_reference(strat, S, days, vols, r, spot_shifts, vol_shifts):
+    """What the same work costs with per-contract scalar calls."""
+    legs = strat.leg_array()
+    for leg, d, v in zip(legs, days, vols):
+        greeks(S, leg["K"], d / 365.25, r, v, 0.0, "C" if leg["is_call"] else "P")
+    for ds in spot_shifts:
+        for dv in vol_shifts:
+            for leg, d, v in zip(legs, days, vols):
+                bsm_price(S * (1 + ds), leg["K"], d / 365.25, r, max(v + dv, 0.0), 0.0,
+                          "C" if leg["is_call"] else "P")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--legs", type=int, default=500)
+    ap.add_argument("--spot-steps", type=int, default=41)
+    ap.add_argument("--vol-steps", type=int, default=21)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    strat = OptionStrat("bench", 100)
+    for _ in range(args.legs):
+        leg = getattr(strat, rng.choice(["long_call", "short_call", "long_put", "short_put"]))
+        leg(float(rng.uniform(50, 150)), float(rng.uniform(0, 10)), int(rng.integers(1, 10)))
+    days = rng.uniform(1, 365, args.legs)
+    vols = rng.uniform(0.1, 0.6, args.legs)
+    spot_shifts = np.linspace(-0.2, 0.2, args.spot_steps)
+    vol_shifts = np.linspace(-0.1, 0.1, args.vol_steps)
+
+    best = float("inf")
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        strat.greeks(100.0, days, vols, 0.02)
+        strat.risk_grid(100.0, days, vols, 0.02, spot_shifts=spot_shifts, vol_shifts=vol_shifts)
+        best = min(best, time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    _loop_reference(strat, 100.0, days, vols, 0.02, spot_shifts, vol_shifts)
+    loop = time.perf_counter() - t0
+
+    n = args.legs * args.spot_steps * args.vol_steps
+    print(f"{args.legs} legs, {args.spot_steps}x{args.vol_steps} scenarios ({n:,} valuations)")
+    print(f"batched:     {1e3 * best:8.1f} ms")
+    print(f"scalar loop: {1e3 * loop:8.1f} ms  ({loop / best:.1f}x slower)")
+
+
+if __name__ == "__main__":
+    main()
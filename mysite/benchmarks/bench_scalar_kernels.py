@@ -0,0 +1,87 @@
+"""Microbenchmarks for the scalar Black-Scholes kernels (ns per call, best of --repeat).
+
+    python -m benchmarks.bench_scalar_kernels [--number 200000] [--repeat 5]
+
+The ``legacy_*`` functions are the kernels as they were before the fused
+``bsm_price_greeks`` path, kept here as the baseline.
+"""
+import argparse
+import math
+import timeit
+
+from options.optionslib.black_scholes import _norm_cdf, _norm_pdf, bsm_price, bsm_price_greeks, greeks
+
+
+def legacy_norm_cdf(x):
+    return 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
+
+
+def legacy_norm_pdf(x):
+    return math.exp(-0.5 * x * x) / math.sqrt(2.0 * math.pi)
+
+
+def legacy_bsm_price(spot, strike, t, r, sigma, q=0.0, kind="C"):
+    if t <= 0 or sigma <= 0 or spot <= 0 or strike <= 0:
+        return float(max(0.0, (spot - strike) if kind.upper() == "C" else (strike - spot)))
+    d1 = (math.log(spot / strike) + (r - q + 0.5 * sigma * sigma) * t) / (sigma * math.sqrt(t))
+    d2 = d1 - sigma * math.sqrt(t)
+    if kind.upper() == "C":
+        return spot * math.exp(-q * t) * legacy_norm_cdf(d1) - strike * math.exp(-r * t) * legacy_norm_cdf(d2)
+    return strike * math.exp(-r * t) * legacy_norm_cdf(-d2) - spot * math.exp(-q * t) * legacy_norm_cdf(-d1)
+
+
+def legacy_greeks(spot, strike, t, r, sigma, q=0.0, kind="C"):
+    if t <= 0 or sigma <= 0 or spot <= 0 or strike <= 0:
+        return {"delta": 0.0, "gamma": 0.0, "vega": 0.0, "theta": 0.0, "rho": 0.0}
+    d1 = (math.log(spot / strike) + (r - q + 0.5 * sigma * sigma) * t) / (sigma * math.sqrt(t))
+    d2 = d1 - sigma * math.sqrt(t)
+    pdf = legacy_norm_pdf(d1)
+    disc_q = math.exp(-q * t)
+    disc_r = math.exp(-r * t)
+    if kind.upper() == "C":
+        delta = disc_q * legacy_norm_cdf(d1)
+        rho = t * strike * disc_r * legacy_norm_cdf(d2)
+        theta = (-disc_q * spot * pdf * sigma / (2 * math.sqrt(t))
+                 - r * strike * disc_r * legacy_norm_cdf(d2)
+                 + q * spot * disc_q * legacy_norm_cdf(d1))
+    else:
+        delta = -disc_q * legacy_norm_cdf(-d1)
+        rho = -t * strike * disc_r * legacy_norm_cdf(-d2)
+        theta = (-disc_q * spot * pdf * sigma / (2 * math.sqrt(t))
+                 + r * strike * disc_r * legacy_norm_cdf(-d2)
+                 - q * spot * disc_q * legacy_norm_cdf(-d1))
+    gamma = disc_q * pdf / (spot * sigma * math.sqrt(t))
+    vega = spot * disc_q * pdf * math.sqrt(t)
+    return {"delta": delta, "gamma": gamma, "vega": vega, "theta": theta, "rho": rho}
+
+
+ARGS = (100.0, 105.0, 0.25, 0.02, 0.2, 0.01, "P")
+
+CASES = [
+    ("norm_cdf", lambda: legacy_norm_cdf(0.3), lambda: _norm_cdf(0.3)),
+    ("norm_pdf", lambda: legacy_norm_pdf(0.3), lambda: _norm_pdf(0.3)),
+    ("bsm_price", lambda: legacy_bsm_price(*ARGS), lambda: bsm_price(*ARGS)),
+    ("greeks", lambda: legacy_greeks(*ARGS), lambda: greeks(*ARGS)),
+    ("price + greeks", lambda: (legacy_bsm_price(*ARGS), legacy_greeks(*ARGS)), lambda: bsm_price_greeks(*ARGS)),
+]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--number", type=int, default=200_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args(argv)
+
+    print(f"{'kernel':>16} {'legacy ns':>10} {'current ns':>11} {'speedup':>8}")
+    for name, old, new in CASES:
+        t_old = min(timeit.repeat(old, number=args.number, repeat=args.repeat)) / args.number
+        t_new = min(timeit.repeat(new, number=args.number, repeat=args.repeat)) / args.number
+        print(f"{name:>16} {1e9 * t_old:>10.1f} {1e9 * t_new:>11.1f} {t_old / t_new:>7.2f}x")
+
+    # deep OTM tail: 1 + erf(x) cancels to 0, erfc keeps the digits
+    deep = (100.0, 300.0, 0.1, 0.0, 0.2, 0.0, "C")
+    print(f"deep OTM call: legacy {legacy_bsm_price(*deep):.3e}, current {bsm_price(*deep):.3e}")
+
+
+if __name__ == "__main__":
+    main()
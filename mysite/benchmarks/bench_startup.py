@@ -0,0 +1,101 @@
+"""Cold start of a web worker: import + URLconf + WSGI handler, in fresh interpreters.
+
+    python -m benchmarks.bench_startup [--runs 5] [--budget-ms 700] [--budget-mb 70]
+
+Also reports which heavy modules were loaded at boot and the extra cost the first
+payoff.png request pays for loading Matplotlib. Exits with status 1 when the median
+boot time or peak RSS is over budget, or when Matplotlib is imported at boot.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+HEAVY = ("matplotlib", "matplotlib.pyplot", "PIL")
+# the project root (holds the mysite package), wherever the script is started from
+ROOT = Path(__file__).resolve().parents[1]
+# median boot time / peak RSS after boot; timing-sensitive, so only checked here
+BUDGET_MS = 700.0
+BUDGET_MB = 70.0
+
+# runs in a child interpreter so every sample is a true cold start
+_CHILD = r"""
+import json, os, resource, sys, time
+
+def peak_rss_mb():
+    # ru_maxrss survives exec, so a big parent would inflate it; VmHWM is this image's own
+    try:
+        with open("/proc/self/status") as f:
+            return next(int(line.split()[1]) for line in f if line.startswith("VmHWM:")) / 1024
+    except (OSError, StopIteration):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+t0 = time.perf_counter()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mysite.settings")
+import django
+django.setup()
+from django.core.handlers.wsgi import WSGIHandler
+from django.urls import resolve
+resolve("/")  # loads the URLconf and every view module
+WSGIHandler()  # loads the middleware chain
+boot = time.perf_counter() - t0
+out = {"boot_s": boot, "loaded": [m for m in HEAVY if m in sys.modules],
+       "rss_mb": peak_rss_mb()}
+if FIRST_PNG:
+    from django.test import Client
+    t0 = time.perf_counter()
+    resp = Client().get("/payoff.png", {"S0": 100, "start": 0, "stop": 200, "by": 1,
+                                        "legs": '[{"type": "call", "side": "long", "K": 100, "price": 5}]'})
+    assert resp.status_code == 200, resp.status_code
+    out["first_png_s"] = time.perf_counter() - t0
+    out["rss_after_png_mb"] = peak_rss_mb()
+print(json.dumps(out))
+"""
+
+
+def _sample(first_png):
+    code = f"HEAVY = {HEAVY!r}\nFIRST_PNG = {first_png!r}\n" + _CHILD
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])))
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env)
+    if proc.returncode != 0:
+        raise RuntimeError(f"boot sample failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--budget-ms", type=float, default=BUDGET_MS, help="median boot time budget")
+    ap.add_argument("--budget-mb", type=float, default=BUDGET_MB, help="peak RSS budget after boot")
+    args = ap.parse_args(argv)
+
+    try:
+        samples = [_sample(first_png=False) for _ in range(max(1, args.runs))]
+        png = _sample(first_png=True)
+    except RuntimeError as ex:
+        sys.exit(str(ex))
+    boot_ms = statistics.median(s["boot_s"] for s in samples) * 1e3
+    rss = statistics.median(s["rss_mb"] for s in samples)
+    loaded = sorted({m for s in samples for m in s["loaded"]})
+
+    print(f"boot (median of {len(samples)}): {boot_ms:8.1f} ms   peak RSS {rss:6.1f} MB")
+    print(f"heavy modules at boot: {', '.join(loaded) or 'none'}")
+    print(f"first payoff.png:      {1e3 * png['first_png_s']:8.1f} ms   peak RSS {png['rss_after_png_mb']:6.1f} MB")
+
+    failures = []
+    if boot_ms > args.budget_ms:
+        failures.append(f"boot {boot_ms:.0f} ms > {args.budget_ms:g} ms")
+    if rss > args.budget_mb:
+        failures.append(f"RSS {rss:.1f} MB > {args.budget_mb:g} MB")
+    if any(m.startswith("matplotlib") for m in loaded):
+        failures.append("matplotlib imported at boot")
+    if failures:
+        print("over budget: " + "; ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
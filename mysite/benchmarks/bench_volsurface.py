@@ -0,0 +1,59 @@
+"""Vol surface lookups, surface-driven batch pricing and binary reload.
+
+    python -m benchmarks.bench_volsurface [--sizes 10000 100000 1000000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from options.optionslib.black_scholes import bsm_price_batch
+from options.optionslib.volsurface import VolSurface
+
+
+def _surface(spot=100.0, r=0.03, q=0.01):
+    strikes = np.linspace(50.0, 150.0, 41)
+    ts = np.array([7, 14, 30, 60, 90, 180, 365, 730]) / 365.25
+    K, T = np.meshgrid(strikes, ts)
+    k = np.log(K / spot) - (r - q) * T
+    vols = 0.2 - 0.05 * k + 0.03 * k * k / np.sqrt(T)
+    return VolSurface.from_quotes(spot, K, T, vols=vols, r=r, q=q, n_moneyness=41)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = ap.parse_args(argv)
+
+    surface = _surface()
+    rng = np.random.default_rng(0)
+    print(f"{'contracts':>10} {'vol lookup ms':>14} {'price (surface) ms':>19} {'price (flat) ms':>16}")
+    for n in args.sizes:
+        K = rng.uniform(50.0, 150.0, n)
+        T = rng.uniform(1 / 365.25, 2.0, n)
+        t0 = time.perf_counter()
+        surface.vol(K, T)
+        t1 = time.perf_counter()
+        bsm_price_batch(100.0, K, T, 0.03, surface, 0.01, "C")
+        t2 = time.perf_counter()
+        bsm_price_batch(100.0, K, T, 0.03, 0.2, 0.01, "C")
+        t3 = time.perf_counter()
+        print(f"{n:>10} {1e3 * (t1 - t0):>14.2f} {1e3 * (t2 - t1):>19.2f} {1e3 * (t3 - t2):>16.2f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "surface.bin")
+        surface.save(path)
+        t0 = time.perf_counter()
+        VolSurface.load(path)
+        load = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        VolSurface(surface.spot, surface.expiries, surface.moneyness, surface.vols, surface.r, surface.q)
+        rebuild = time.perf_counter() - t0
+        print(f"reload {os.path.getsize(path)} bytes: {1e3 * load:.3f} ms (refit from vols: {1e3 * rebuild:.3f} ms)")
+    print(f"arbitrage violations: {surface.arbitrage_violations()}")
+
+
+if __name__ == "__main__":
+    main()
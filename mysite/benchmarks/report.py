@@ -0,0 +1,70 @@
+"""Compare two ``benchmarks.suite`` result files (e.g. two commits).
+
+    python -m benchmarks.report base.json new.json [--threshold 10] [--metric median]
+
+Prints new/base time ratios per case. Exits with status 1 when any case is slower than
+``--threshold`` percent, so it can gate CI.
+"""
+import argparse
+import json
+import sys
+
+from .suite import SCHEMA, _fmt
+
+
+def _load(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("schema") != SCHEMA:
+        sys.exit(f"{path}: unsupported results schema {data.get('schema')!r}")
+    return data
+
+
+def compare(base, new, metric="median", threshold=10.0):
+    """``[(case, base s, new s, ratio, status)]``; status is ok/faster/slower/added/removed."""
+    rows = []
+    b, n = base["results"], new["results"]
+    for name in list(b) + [k for k in n if k not in b]:
+        if name not in n:
+            rows.append((name, b[name][metric], None, None, "removed"))
+            continue
+        if name not in b:
+            rows.append((name, None, n[name][metric], None, "added"))
+            continue
+        ratio = n[name][metric] / b[name][metric]
+        status = "slower" if ratio > 1 + threshold / 100 else "faster" if ratio < 1 / (1 + threshold / 100) else "ok"
+        rows.append((name, b[name][metric], n[name][metric], ratio, status))
+    return rows
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("base")
+    ap.add_argument("new")
+    ap.add_argument("--threshold", type=float, default=10.0, help="percent change flagged as a regression")
+    ap.add_argument("--metric", choices=["median", "min"], default="median")
+    args = ap.parse_args(argv)
+
+    base, new = _load(args.base), _load(args.new)
+    for label, data in (("base", base), ("new", new)):
+        env = data["env"]
+        print(f"{label}: {env.get('commit') or '?'} ({env['date']}, python {env['python']}, numpy {env['numpy']})")
+    if any(base["env"].get(k) != new["env"].get(k) for k in ("machine", "processor", "cpus")):
+        print("warning: results come from different machines; ratios are indicative only")
+
+    rows = compare(base, new, args.metric, args.threshold)
+    print(f"\n{'case':<42} {'base':>12} {'new':>12} {'ratio':>7}")
+    for name, b, n, ratio, status in rows:
+        cells = [_fmt(b) if b is not None else "-", _fmt(n) if n is not None else "-",
+                 f"{ratio:.2f}x" if ratio is not None else "-"]
+        flag = "" if status == "ok" else f"  {status}"
+        print(f"{name:<42} {cells[0]:>12} {cells[1]:>12} {cells[2]:>7}{flag}")
+
+    slower = [r[0] for r in rows if r[4] == "slower"]
+    if slower:
+        print(f"\n{len(slower)} regression(s) over {args.threshold:g}%: {', '.join(slower)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
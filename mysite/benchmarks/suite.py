@@ -0,0 +1,230 @@
+"""Benchmark suite: optionslib hot paths and end-to-end views, results saved as JSON.
+
+    python -m benchmarks.suite [--out bench.json] [--filter bsm] [--repeat 7] [--min-time 0.2]
+    python -m benchmarks.report base.json bench.json
+
+Every case reports seconds per call (median and best of ``--repeat`` timed runs,
+each run looping for at least ``--min-time`` seconds), plus the environment it ran in,
+so two result files from different commits can be compared with ``benchmarks.report``.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from options.optionslib import OptionStrat
+from options.optionslib.black_scholes import bsm_price, bsm_price_greeks, greeks
+from options.optionslib.plotting import plot_payoff, render_payoff_png
+
+SCHEMA = 1
+LEG_SETS = {
+    1: [("call", 1, 100.0, 5.0)],
+    4: [("call", 1, 95.0, 7.5), ("call", -1, 105.0, 3.1), ("put", 1, 90.0, 2.2), ("put", -1, 80.0, 0.9)],
+}
+LEG_SETS[16] = [(t, s, K + 2.5 * i, p) for i in range(4) for t, s, K, p in LEG_SETS[4]]
+GRID_POINTS = (1_000, 100_000)
+HTTP_LEGS = [
+    {"type": "call", "side": "long", "K": 95, "price": 7.5},
+    {"type": "call", "side": "short", "K": 105, "price": 3.1},
+    {"type": "put", "side": "long", "K": 90, "price": 2.2},
+]
+
+
+def _strategy(legs, points):
+    strat = OptionStrat("bench", 100.0, {"start": 0.0, "stop": 200.0, "by": 200.0 / points})
+    for type_, side, K, price in legs:
+        getattr(strat, f"{'long' if side == 1 else 'short'}_{type_}")(K, price)
+    return strat
+
+
+# each case factory returns a zero-argument callable; the callable is what gets timed
+
+def _case_build(legs, points):
+    def run():
+        _strategy(LEG_SETS[legs], points).payoffs
+    return run
+
+
+def _case_metrics(legs):
+    strat = _strategy(LEG_SETS[legs], 1_000)
+
+    def run():
+        strat._pw = strat._metrics = None
+        strat.metrics()
+    return run
+
+
+def _case_breakevens(legs):
+    strat = _strategy(LEG_SETS[legs], 1_000)
+
+    def run():
+        strat._pw = None
+        strat._breakevens()
+    return run
+
+
+def _case_scalar(fn):
+    return lambda: fn(100.0, 105.0, 0.5, 0.03, 0.2, 0.01, "C")
+
+
+def _case_png(renderer):
+    strat = _strategy(LEG_SETS[4], 1_000)
+    if renderer == "canvas":
+        return lambda: render_payoff_png(strat, color="white", linewidth=2)
+
+    import io
+    import matplotlib.pyplot as plt
+
+    def run():
+        fig = plot_payoff(strat, color="white", linewidth=2)
+        fig.savefig(io.BytesIO(), format="png", bbox_inches="tight")
+        plt.close(fig)
+    return run
+
+
+_client = None
+
+
+def _http_client():
+    global _client
+    if _client is None:
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mysite.settings")
+        import django
+        django.setup()
+        from django.test import Client
+        from django.test.utils import setup_test_environment
+        setup_test_environment()
+        _client = Client()
+    return _client
+
+
+def _case_http(path):
+    client = _http_client()
+    from options.viewslib.cache import payoff_png_cache, strategy_cache
+
+    query = {"S0": 100, "start": 0, "stop": 200, "by": 0.5, "legs": json.dumps(HTTP_LEGS)}
+    counter = iter(range(10 ** 9))
+
+    def run():
+        # unique name per call so every request rebuilds and re-renders
+        if path == "pricing/":
+            resp = client.post("/pricing/", {"spot": 100, "strike": 105, "vol": 20, "rate": 3,
+                                             "days_to_expiry": 180, "kind": "call"})
+        else:
+            payoff_png_cache.local.clear()
+            strategy_cache.clear()
+            resp = client.get(f"/{path}", {**query, "name": f"bench {next(counter)}"})
+        if resp.status_code != 200:
+            raise RuntimeError(f"/{path}: HTTP {resp.status_code}")
+    return run
+
+
+def cases():
+    """``{name: factory}``; factories are only called for selected cases."""
+    out = {}
+    for legs in LEG_SETS:
+        for points in GRID_POINTS:
+            out[f"strategy.build[legs={legs},points={points}]"] = lambda l=legs, p=points: _case_build(l, p)
+        out[f"strategy.metrics[legs={legs}]"] = lambda l=legs: _case_metrics(l)
+        out[f"strategy.breakevens[legs={legs}]"] = lambda l=legs: _case_breakevens(l)
+    for fn in (bsm_price, greeks, bsm_price_greeks):
+        out[f"black_scholes.{fn.__name__}"] = lambda f=fn: _case_scalar(f)
+    out["plotting.png[canvas]"] = lambda: _case_png("canvas")
+    out["plotting.png[pyplot]"] = lambda: _case_png("pyplot")
+    for path in ("payoff.json", "payoff.png", "pricing/"):
+        out[f"http.{path.rstrip('/')}"] = lambda p=path: _case_http(p)
+    return out
+
+
+def measure(fn, repeat, min_time):
+    """Seconds per call: calibrate a loop count that lasts ``min_time``, then time ``repeat`` runs."""
+    fn()  # warm-up (imports, caches, first figure)
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.1))
+    runs = [elapsed / number]
+    for _ in range(repeat - 1):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        runs.append((time.perf_counter() - t0) / number)
+    return {"median": statistics.median(runs), "min": min(runs), "number": number, "repeat": len(runs)}
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True, timeout=5).stdout.strip()
+        return out.stdout.strip() + ("-dirty" if dirty else "") if out.returncode == 0 else None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment():
+    import matplotlib
+    import django
+    return {
+        "commit": _git_commit(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "matplotlib": matplotlib.__version__,
+        "django": django.get_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--out", help="write results JSON here (default: print only)")
+    ap.add_argument("--filter", action="append", default=[], help="substring of case names; repeatable")
+    ap.add_argument("--repeat", type=int, default=7)
+    ap.add_argument("--min-time", type=float, default=0.2, help="seconds per timed run")
+    ap.add_argument("--list", action="store_true", help="list case names and exit")
+    args = ap.parse_args(argv)
+
+    selected = {name: f for name, f in cases().items() if not args.filter or any(s in name for s in args.filter)}
+    if args.list:
+        print("\n".join(selected))
+        return
+    if not selected:
+        sys.exit("no benchmark matches --filter")
+
+    results = {}
+    print(f"{'case':<42} {'median':>12} {'best':>12} {'calls':>8}")
+    for name, factory in selected.items():
+        r = measure(factory(), max(1, args.repeat), args.min_time)
+        results[name] = r
+        print(f"{name:<42} {_fmt(r['median']):>12} {_fmt(r['min']):>12} {r['number']:>8}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"schema": SCHEMA, "env": environment(), "unit": "s/call", "results": results}, f, indent=2)
+        print(f"wrote {args.out}")
+
+
+def _fmt(seconds):
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds * 1e9:.0f} ns"
+
+
+if __name__ == "__main__":
+    main()
@@ -44,6 +44,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'options.instrumentation.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -128,3 +129,82 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Rendered payoff.png cache (options/viewslib/cache.py). Set BACKEND_ALIAS to a
+# key of CACHES to share rendered charts between worker processes.
+OPTIONS_PAYOFF_PNG_CACHE = {
+    "MAX_ENTRIES": 256,
+    "MAX_BYTES": 64 * 1024 * 1024,
+    "BACKEND_ALIAS": None,
+    "TIMEOUT": 3600,
+}
+
+# payoff.png renderer: "canvas" redraws one pre-styled Agg figure per worker
+# thread, "pyplot" builds a fresh pyplot figure per request, "svg" skips
+# Matplotlib entirely and serves image/svg+xml.
+OPTIONS_PAYOFF_RENDERER = "canvas"
+
+# Payoff grid guard (options/viewslib/utils.py): requests whose start/stop/by
+# would exceed MAX_POINTS get a coarser 'by', or a 400 when COARSEN is False.
+# Mark-to-market curves x distinct strikes x points drawn are capped at
+# MAX_MTM_VALUES.
+OPTIONS_GRID_LIMITS = {
+    "MAX_POINTS": 200_000,
+    "COARSEN": True,
+    "MAX_MTM_VALUES": 5_000_000,
+}
+
+# Built strategies (payoff arrays + metrics + description) shared by the home
+# page, payoff.json and payoff.png for the same params (options/viewslib/cache.py).
+OPTIONS_STRATEGY_CACHE = {
+    "MAX_ENTRIES": 128,
+    "MAX_BYTES": 64 * 1024 * 1024,
+    "TTL": 300,
+}
+
+# Request/stage latency histograms (options/instrumentation.py), served as
+# Prometheus text at /metrics and as Server-Timing headers. When disabled the
+# middleware drops out of the chain and the stage timers are no-ops.
+OPTIONS_INSTRUMENTATION = {
+    "ENABLED": False,
+    "SERVER_TIMING": True,
+}
+
+# Async variants of payoff.png / payoff.json / pricing (options/viewslib/offload.py),
+# for serving through mysite/asgi.py. CPU work runs on bounded "render" and
+# "compute" lanes (KIND "thread" or "process"); a full lane answers 503 with
+# Retry-After, a job over TIMEOUT seconds 504. The pyplot renderer is not
+# thread-safe: use "canvas"/"svg" with a thread render lane.
+OPTIONS_OFFLOAD = {
+    "ASYNC_VIEWS": False,
+    "RETRY_AFTER": 1,
+    "LANES": {
+        "render": {"KIND": "thread", "WORKERS": 2, "QUEUE": 8, "TIMEOUT": 10.0},
+        "compute": {"KIND": "thread", "WORKERS": 4, "QUEUE": 32, "TIMEOUT": 5.0},
+    },
+}
+
+# Memory-mapped option chain history (options/optionslib/chainstore.py), filled by
+# "manage.py ingest_chains". Legs in payoff/risk requests and pricing.json rows may
+# then name a quote by its chain "id" instead of repeating strike, price and expiry;
+# GET /chain.json browses the store. Nothing is served until a store exists at PATH.
+OPTIONS_CHAIN_STORE = {
+    "PATH": BASE_DIR / "chainstore",
+}
+
+# Historical backtests (options/optionslib/backtest.py) served at /backtest.json.
+# PRICE_DIR holds one "<SYMBOL>.csv" of daily closes (date,close[,...]) per
+# underlying. Runs starting more often than MAX_STARTS times are thinned out;
+# holding periods ('days') are capped at MAX_DAYS, strategies at MAX_LEGS legs,
+# date ranges at MAX_DATES closes and the leg marks priced (dates x closes held x
+# legs) at MAX_MARKS. Encoded results are cached per strategy, price file version
+# and date range.
+OPTIONS_BACKTEST = {
+    "PRICE_DIR": BASE_DIR / "prices",
+    "MAX_STARTS": 500,
+    "MAX_DAYS": 3 * 366,
+    "MAX_LEGS": 12,
+    "MAX_DATES": 7500,
+    "MAX_MARKS": 10_000_000,
+    "CACHE": {"MAX_ENTRIES": 64, "MAX_BYTES": 32 * 1024 * 1024, "TTL": 3600},
+}
@@ -1,3 +1,22 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import PricingSnapshot, SavedStrategy, StrategyLeg
+
+
+class StrategyLegInline(admin.TabularInline):
+    model = StrategyLeg
+    extra = 0
+
+
+@admin.register(SavedStrategy)
+class SavedStrategyAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "underlying", "owner", "S0", "updated_at")
+    list_filter = ("underlying",)
+    search_fields = ("name", "underlying")
+    inlines = [StrategyLegInline]
+
+
+@admin.register(PricingSnapshot)
+class PricingSnapshotAdmin(admin.ModelAdmin):
+    list_display = ("strategy", "as_of", "spot", "vol", "value", "pnl")
+    list_select_related = ("strategy",)
@@ -0,0 +1,162 @@
+import bisect
+import contextvars
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .optionslib import timing
+
+_conf = getattr(settings, "OPTIONS_INSTRUMENTATION", {})
+ENABLED = bool(_conf.get("ENABLED", False))
+SERVER_TIMING = bool(_conf.get("SERVER_TIMING", True))
+# seconds; upper bounds of the histogram buckets (+Inf is implicit)
+BUCKETS = tuple(sorted(_conf.get("BUCKETS", (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+))))
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram (Prometheus semantics), thread-safe."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        i = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += seconds
+
+    def snapshot(self):
+        with self._lock:
+            counts, total = list(self.counts), self.sum
+        cumulative, running = [], 0
+        for n in counts:
+            running += n
+            cumulative.append(running)
+        return cumulative, total
+
+
+class Registry:
+    """Histograms keyed by (metric name, sorted label items)."""
+
+    def __init__(self):
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        hist = self._series.get(key)
+        if hist is None:
+            with self._lock:
+                hist = self._series.setdefault(key, Histogram())
+        hist.observe(seconds)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def exposition(self):
+        """Prometheus text format (version 0.0.4) for every series."""
+        with self._lock:
+            series = sorted(self._series.items())
+        lines, seen = [], set()
+        for (name, labels), hist in series:
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# TYPE {name} histogram")
+            cumulative, total = hist.snapshot()
+            base = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+            sep = "," if base else ""
+            for bound, n in zip(hist.buckets + (float("inf"),), cumulative):
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f'{name}_bucket{{{base}{sep}le="{le}"}} {n}')
+            suffix = f"{{{base}}}" if base else ""
+            lines.append(f"{name}_sum{suffix} {total:.9g}")
+            lines.append(f"{name}_count{suffix} {cumulative[-1]}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = Registry()
+
+
+# (stage, seconds) list of the request being served; stages outside a request go straight
+# to the registry
+_current = contextvars.ContextVar("options_request_timings", default=None)
+
+
+def _record_stage(name, seconds):
+    stages = _current.get()
+    if stages is None:
+        registry.observe("options_stage_seconds", seconds, stage=name, view="")
+    else:
+        stages.append((name, seconds))
+
+
+class InstrumentationMiddleware:
+    """Per-view request latency and per-stage timings (``optionslib.timing.stage``).
+
+    Histograms are served by the ``metrics`` view; with SERVER_TIMING each response also
+    carries a ``Server-Timing`` header. Disabled (the default) the middleware removes
+    itself from the chain and stage timers stay no-ops. Works for sync and async views.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        timing.set_sink(_record_stage)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stages = []
+        token = _current.set(stages)
+        t0 = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, stages, response, time.perf_counter() - t0)
+
+    async def __acall__(self, request):
+        stages = []
+        token = _current.set(stages)
+        t0 = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, stages, response, time.perf_counter() - t0)
+
+    def _finish(self, request, stages, response, elapsed):
+        # resolver_match is set once the URL resolves, so the view is known by now
+        match = getattr(request, "resolver_match", None)
+        view = (match.url_name or match.view_name if match is not None else "") or "unresolved"
+        registry.observe("options_request_seconds", elapsed, view=view, status=str(response.status_code)[0] + "xx")
+        for name, seconds in stages:
+            registry.observe("options_stage_seconds", seconds, stage=name, view=view)
+        if SERVER_TIMING:
+            # repeated stages (e.g. two JSON encodes) are summed into one entry
+            totals = {}
+            for name, seconds in stages:
+                totals[name] = totals.get(name, 0.0) + seconds
+            parts = [f"{name};dur={1e3 * s:.3f}" for name, s in totals.items()]
+            parts.append(f"total;dur={1e3 * elapsed:.3f}")
+            response["Server-Timing"] = ", ".join(parts)
+        return response
@@ -0,0 +1,172 @@
+import csv
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from options.optionslib.chainstore import FIELDS, MAX_DAY, ChainStore, to_day
+
+# CSV header (lower-cased) -> store column; the vendor spellings seen so far
+ALIASES = {
+    "underlying": "underlying", "symbol": "underlying", "root": "underlying", "ticker": "underlying",
+    "date": "date", "quote_date": "date", "trade_date": "date", "asof": "date",
+    "expiry": "expiry", "expiration": "expiry", "expiration_date": "expiry", "expiry_date": "expiry",
+    "strike": "strike", "strike_price": "strike",
+    "type": "type", "kind": "type", "option_type": "type", "call_put": "type", "cp": "type", "right": "type",
+    "bid": "bid", "ask": "ask", "last": "last", "last_price": "last",
+    "iv": "iv", "implied_volatility": "iv", "implied_vol": "iv",
+    "underlying_price": "underlying_price", "spot": "underlying_price", "underlying_last": "underlying_price",
+    "volume": "volume", "open_interest": "open_interest", "oi": "open_interest",
+}
+REQUIRED = ("underlying", "date", "expiry", "strike", "type")
+MAX_REPORTED_ERRORS = 10
+
+
+def _floats(values):
+    try:
+        return np.array(values, dtype=float)
+    except ValueError:
+        # blanks or junk in the chunk: NaN for those cells only
+        out = np.full(len(values), np.nan)
+        for i, v in enumerate(values):
+            try:
+                out[i] = float(v)
+            except ValueError:
+                pass
+        return out
+
+
+def _by_unique(values, convert):
+    """Apply ``convert`` once per distinct string (dates, symbols and types repeat a lot)."""
+    uniq, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    return np.array([convert(u) for u in uniq.tolist()])[inverse]
+
+
+def _is_call(s):
+    s = s.strip().lower()
+    if s in ("c", "call"):
+        return True
+    if s in ("p", "put"):
+        return False
+    raise ValueError(f"option type {s!r} is not call/put")
+
+
+class Command(BaseCommand):
+    help = ("Convert option chain CSV files into the columnar, memory-mapped chain store "
+            "(options.optionslib.chainstore) used by chain ids in legs and pricing.json.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="+", help="CSV files with a header row")
+        parser.add_argument("--store", help="store directory (default: OPTIONS_CHAIN_STORE['PATH'])")
+        parser.add_argument("--underlying", help="symbol for files without an underlying column")
+        parser.add_argument("--date", help="quote date (YYYY-MM-DD) for files without a date column")
+        parser.add_argument("--chunk-rows", type=int, default=200_000,
+                            help="rows parsed and sorted in memory at a time")
+
+    def handle(self, *args, **opts):
+        path = opts["store"] or getattr(settings, "OPTIONS_CHAIN_STORE", {}).get("PATH")
+        if not path:
+            raise CommandError("pass --store or set OPTIONS_CHAIN_STORE['PATH']")
+        store = ChainStore.create(path)
+        # chains stored before this run are skipped, so re-ingesting a file is harmless; a
+        # chain split over chunks of an unsorted file is still appended (and merged on read)
+        before = ChainStore(path)
+        self._errors = 0
+        t0 = time.perf_counter()
+        rows = chains = skipped = 0
+        for csv_path in opts["paths"]:
+            with open(csv_path, newline="", encoding="utf-8") as f:
+                for chunk in self._chunks(csv_path, f, opts):
+                    n, c, s = self._write(store, before, chunk)
+                    rows += n
+                    chains += c
+                    skipped += s
+        elapsed = time.perf_counter() - t0
+        self.stdout.write(self.style.SUCCESS(
+            f"{rows} quotes ({chains} chain segments) appended to {path} in {elapsed:.2f}s "
+            f"({rows / max(elapsed, 1e-9):,.0f} quotes/s); store holds {len(store)} quotes"))
+        if skipped:
+            self.stdout.write(self.style.WARNING(f"{skipped} quotes skipped: chain already stored"))
+        if self._errors:
+            self.stdout.write(self.style.WARNING(f"{self._errors} rows skipped: unparseable"))
+
+    def _chunks(self, csv_path, f, opts):
+        """Stream ``{column: [str, ...]}`` chunks of at most ``--chunk-rows`` rows."""
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        cols = {}
+        for i, name in enumerate(header):
+            target = ALIASES.get(name.strip().lower())
+            if target is not None and target not in cols:
+                cols[target] = i
+        constants = {"underlying": opts["underlying"], "date": opts["date"]}
+        missing = [c for c in REQUIRED if c not in cols and not constants.get(c)]
+        if missing:
+            raise CommandError(f"{csv_path}: no column for {', '.join(missing)}")
+        width = max(cols.values()) + 1
+        limit = max(1, opts["chunk_rows"])
+        chunk = {name: [] for name in cols}
+        count = 0
+        for lineno, row in enumerate(reader, 2):
+            if len(row) < width:
+                if row:
+                    self._error(f"{csv_path}:{lineno}: expected {width} columns, got {len(row)}")
+                continue
+            for name, i in cols.items():
+                chunk[name].append(row[i])
+            count += 1
+            if count == limit:
+                yield self._fill(chunk, count, constants)
+                chunk = {name: [] for name in cols}
+                count = 0
+        if count:
+            yield self._fill(chunk, count, constants)
+
+    @staticmethod
+    def _fill(chunk, count, constants):
+        for name, value in constants.items():
+            if name not in chunk and value:
+                chunk[name] = [value] * count
+        return chunk
+
+    def _error(self, message, count=1):
+        self._errors += count
+        if self._errors - count < MAX_REPORTED_ERRORS:
+            self.stderr.write(message)
+
+    def _write(self, store, before, chunk):
+        try:
+            underlying = _by_unique(chunk["underlying"], lambda s: s.strip().upper())
+            date = _by_unique(chunk["date"], lambda s: to_day(s.strip()))
+            expiry = _by_unique(chunk["expiry"], lambda s: to_day(s.strip()))
+            is_call = _by_unique(chunk["type"], _is_call)
+        except ValueError as ex:
+            raise CommandError(f"bad date or option type: {ex}")
+        columns = {"strike": _floats(chunk["strike"]), "is_call": is_call}
+        for name, dtype in FIELDS.items():
+            if name in chunk and name not in columns:
+                values = _floats(chunk[name])
+                if np.dtype(dtype).kind == "i":
+                    values = np.nan_to_num(values, nan=0.0)
+                columns[name] = values
+
+        keep = np.isfinite(columns["strike"]) & (columns["strike"] > 0)
+        if not keep.all():
+            self._error(f"{int((~keep).sum())} rows without a positive strike", int((~keep).sum()))
+        dated = (date >= 0) & (date <= MAX_DAY) & (expiry >= 0) & (expiry <= MAX_DAY)
+        if not dated.all():
+            self._error(f"{int((~dated).sum())} rows dated before 1970 or after the store's range",
+                        int((~dated).sum()))
+            keep &= dated
+        new = ~before.contains(underlying, date, expiry)
+        skipped = int((keep & ~new).sum())
+        keep &= new
+        n = int(keep.sum())
+        if n == 0:
+            return 0, 0, skipped
+        chains = store.append(underlying[keep], date[keep], expiry[keep],
+                              {name: values[keep] for name, values in columns.items()})
+        return n, chains, skipped
@@ -0,0 +1,105 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from options.models import PricingSnapshot, SavedStrategy, StrategyLeg
+from options.optionslib.black_scholes import GREEK_NAMES, bsm_price_greeks_batch
+from options.optionslib.strategy import DAYS_PER_YEAR
+from options.optionslib.volsurface import VolSurface
+from options.viewslib.pricing import _parse_percent_maybe
+
+
+class Command(BaseCommand):
+    help = "Reprice saved strategies under new market inputs and store a PricingSnapshot for each."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--spot", type=float, required=True)
+        parser.add_argument("--vol", help="flat vol, e.g. 20 or 0.2; a leg's own vol takes precedence")
+        parser.add_argument("--surface", help="VolSurface file (VolSurface.save) to use instead of --vol")
+        parser.add_argument("--rate", default="0", help="risk-free rate, e.g. 5 or 0.05")
+        parser.add_argument("--div-yield", default="0", help="dividend yield, e.g. 1 or 0.01")
+        parser.add_argument("--days", type=float, help="days to expiry for legs without their own")
+        parser.add_argument("--underlying", help="only strategies on this underlying")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--metrics", action="store_true", help="also refresh the stored expiry metrics")
+
+    def handle(self, *args, **opts):
+        spot = opts["spot"]
+        if spot <= 0:
+            raise CommandError("--spot must be > 0")
+        vol = _parse_percent_maybe(opts["vol"])
+        surface = VolSurface.load(opts["surface"]) if opts["surface"] else None
+        r = _parse_percent_maybe(opts["rate"]) or 0.0
+        q = _parse_percent_maybe(opts["div_yield"]) or 0.0
+        batch = max(1, opts["batch_size"])
+
+        qs = SavedStrategy.objects.order_by("pk")
+        if opts["underlying"]:
+            qs = qs.filter(underlying=opts["underlying"].strip().upper())
+
+        t0 = time.perf_counter()
+        done = skipped = 0
+        last_pk = 0
+        while True:
+            # keyset pagination + one prefetch query for the legs of the whole batch
+            chunk = list(qs.filter(pk__gt=last_pk).prefetch_related("legs")[:batch])
+            if not chunk:
+                break
+            last_pk = chunk[-1].pk
+            n, s = self._reprice(chunk, spot, vol, surface, r, q, opts["days"], opts["metrics"])
+            done += n
+            skipped += s
+
+        elapsed = time.perf_counter() - t0
+        self.stdout.write(self.style.SUCCESS(f"{done} snapshots written in {elapsed:.2f}s"))
+        if skipped:
+            self.stdout.write(self.style.WARNING(
+                f"{skipped} strategies skipped: a leg has no days/vol (pass --days and --vol or --surface)"))
+
+    def _reprice(self, chunk, spot, vol, surface, r, q, days, refresh_metrics):
+        """Price every leg of the batch in one vectorized call, then sum per strategy."""
+        priced, legs, owner = [], [], []
+        skipped = 0
+        for strategy in chunk:
+            rows = list(strategy.legs.all())
+            if any((leg.days is None and days is None) or
+                   (leg.vol is None and vol is None and surface is None) for leg in rows):
+                skipped += 1
+                continue
+            owner += [len(priced)] * len(rows)
+            legs += rows
+            priced.append(strategy)
+        if not priced:
+            return 0, skipped
+
+        arr = StrategyLeg.to_array(legs)
+        t = np.array([days if leg.days is None else leg.days for leg in legs], dtype=float) / DAYS_PER_YEAR
+        own_vol = np.array([np.nan if leg.vol is None else leg.vol for leg in legs], dtype=float)
+        fallback = surface.vol(arr["K"], t) if surface is not None else np.full(len(legs), vol or np.nan)
+        sigma = np.where(np.isnan(own_vol), fallback, own_vol)
+
+        price, g = bsm_price_greeks_batch(spot, arr["K"], t, r, sigma, q, arr["is_call"])
+        w = (arr["side"] * arr["Q"]).astype(float)
+        owner = np.asarray(owner)
+        m = len(priced)
+        value = np.bincount(owner, weights=price * w, minlength=m)
+        premium = np.bincount(owner, weights=arr["price"] * w, minlength=m)
+        greeks = {name: np.bincount(owner, weights=g[name] * w, minlength=m) for name in GREEK_NAMES}
+
+        snapshots = [
+            PricingSnapshot(
+                strategy=strategy, spot=spot, vol=None if surface is not None else vol, rate=r, div_yield=q,
+                value=float(value[i]), pnl=float(value[i] - premium[i]),
+                greeks={name: float(greeks[name][i]) for name in GREEK_NAMES},
+            )
+            for i, strategy in enumerate(priced)
+        ]
+        with transaction.atomic():
+            PricingSnapshot.objects.bulk_create(snapshots)
+            if refresh_metrics:
+                for strategy in priced:
+                    strategy.refresh_metrics(list(strategy.legs.all()), save=False)
+                SavedStrategy.objects.bulk_update(priced, ["metrics", "description"])
+        return len(priced), skipped
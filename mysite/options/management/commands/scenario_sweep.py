@@ -0,0 +1,255 @@
+import csv
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from options.optionslib.black_scholes import GREEK_NAMES
+from options.optionslib.risk import grouped_risk
+from options.optionslib.strategy import DAYS_PER_YEAR
+from options.viewslib.pricing import _parse_percent_maybe
+from options.viewslib.utils import build_strategy_from_params, parse_query
+
+METRIC_COLUMNS = ["max_profit", "max_loss", "net_premium", "breakevens"]
+
+
+def _init_worker():
+    # spawn-based pools start from a bare interpreter
+    import django
+    django.setup()
+
+
+def _read_rows(path, fmt):
+    """Stream ``(line number, dict)`` from a JSONL or CSV file (``-`` is stdin)."""
+    f = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+    try:
+        if fmt == "csv":
+            for lineno, row in enumerate(csv.DictReader(f), 2):
+                yield lineno, row
+        else:
+            for lineno, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = {"_error": "invalid JSON"}
+                yield lineno, row if isinstance(row, dict) else {"_error": "line must be a JSON object"}
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def _pnl_columns(cfg):
+    return [f"pnl[spot{ds:+g},vol{dv:+g}]" for ds in cfg["spot_shifts"] for dv in cfg["vol_shifts"]]
+
+
+def _columns(cfg):
+    return ["line", "name", "S0"] + METRIC_COLUMNS + list(GREEK_NAMES) + _pnl_columns(cfg) + ["error"]
+
+
+def _evaluate(lineno, row, cfg):
+    """One output record; the same parsing and build path as the web views.
+
+    Rows that can be valued before expiry come back as ``(record, book)`` where ``book``
+    is (legs, S0, t, vols, r, q) for ``_evaluate_chunk`` to price.
+    """
+    rec = {"line": lineno, "name": "", "error": row.get("_error", "")}
+    if rec["error"]:
+        return rec
+    q = {k: v for k, v in row.items() if v not in (None, "")}
+    if "legs" in q and not isinstance(q["legs"], str):
+        q["legs"] = json.dumps(q["legs"])
+    try:
+        S0 = float(q.get("S0"))
+    except (TypeError, ValueError):
+        S0 = 0.0
+    # metrics don't depend on the plot grid, so the grid is optional here
+    q.setdefault("start", 0)
+    q.setdefault("stop", 2 * S0 if S0 > 0 else 1)
+
+    params, errors = parse_query(q)
+    rec["name"], rec["S0"] = params["name"], params["S0"]
+    if errors:
+        rec["error"] = "; ".join(errors)
+        return rec
+
+    strat = build_strategy_from_params(params)
+    m = strat.metrics()
+    rec.update(max_profit=m["max_profit"], max_loss=m["max_loss"], net_premium=m["net_premium"],
+               breakevens=";".join(f"{b:g}" for b in m["breakevens"]))
+
+    # greeks / scenarios need an expiry and vol for every leg (leg, row or command default)
+    days = [leg.get("days", q.get("days", cfg["days"])) for leg in params["legs"]]
+    vols = [leg.get("vol", _parse_percent_maybe(q.get("vol")) or cfg["vol"]) for leg in params["legs"]]
+    if not params["legs"] or params["S0"] <= 0 or None in days or None in vols:
+        return rec
+    try:
+        days = np.array(days, dtype=float)
+    except ValueError:
+        rec["error"] = "invalid 'days'"
+        return rec
+    vols = np.broadcast_to(np.array(vols, dtype=float), days.shape)
+    r = _parse_percent_maybe(q.get("rate")) or cfg["rate"]
+    div = _parse_percent_maybe(q.get("div_yield")) or cfg["div_yield"]
+
+    t = np.maximum(days, 0.0) / DAYS_PER_YEAR
+    return rec, (strat.leg_array(), params["S0"], t, vols, r, div)
+
+
+def _evaluate_chunk(args):
+    """Parse/metrics per row, then greeks and scenarios for the whole chunk in one call."""
+    rows, cfg = args
+    records, books = [], []
+    for lineno, row in rows:
+        try:
+            rec = _evaluate(lineno, row, cfg)
+        except Exception as ex:
+            # one malformed strategy must not abort the whole sweep
+            rec = {"line": lineno, "name": str(row.get("name") or ""), "error": f"{type(ex).__name__}: {ex}"}
+        if isinstance(rec, tuple):
+            rec, book = rec
+            books.append((rec, book))
+        records.append(rec)
+    if not books:
+        return records
+
+    legs = np.concatenate([b[0] for _, b in books])
+    counts = [len(b[0]) for _, b in books]
+    per_leg = [np.repeat([b[i] for _, b in books], counts) for i in (1, 4, 5)]
+    t = np.concatenate([b[2] for _, b in books])
+    sigma = np.concatenate([b[3] for _, b in books])
+    starts = np.cumsum([0] + counts[:-1])
+    greeks, pnl = grouped_risk(legs, starts, per_leg[0], t, per_leg[1], sigma, per_leg[2],
+                               spot_shifts=cfg["spot_shifts"], vol_shifts=cfg["vol_shifts"])
+    labels = _pnl_columns(cfg)
+    for k, (rec, _) in enumerate(books):
+        rec.update({name: float(greeks[name][k]) for name in GREEK_NAMES})
+        rec.update(zip(labels, pnl[k].ravel().tolist()))
+    return records
+
+
+class _CsvSink:
+    def __init__(self, path, columns):
+        self.f = sys.stdout if path == "-" else open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.DictWriter(self.f, fieldnames=columns, extrasaction="ignore")
+        self.writer.writeheader()
+
+    def write(self, records):
+        self.writer.writerows(records)
+        self.f.flush()
+
+    def close(self):
+        if self.f is not sys.stdout:
+            self.f.close()
+
+
+class _ParquetSink:
+    """One row group per chunk; needs pyarrow (optional dependency)."""
+
+    def __init__(self, path, columns):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise CommandError("--format parquet needs pyarrow (pip install pyarrow); use csv otherwise")
+        self.pa = pa
+        self.columns = columns
+        text = {"name", "breakevens", "error"}
+        self.schema = pa.schema([(c, pa.string() if c in text else pa.float64()) for c in columns])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, records):
+        arrays = {c: [r.get(c) for r in records] for c in self.columns}
+        self.writer.write_table(self.pa.Table.from_pydict(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+def _shift_list(raw, name):
+    try:
+        return [float(x) / 100.0 for x in raw.split(",") if x.strip()]
+    except ValueError:
+        raise CommandError(f"--{name} must be comma-separated percentages, e.g. -10,0,10")
+
+
+class Command(BaseCommand):
+    help = ("Revalue a file of strategies (JSONL or CSV; same fields as the payoff page query) "
+            "on a process pool and stream metrics, greeks and scenario P&L to CSV or Parquet.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="JSONL/CSV file of strategies, or - for stdin")
+        parser.add_argument("output", help="output file, or - for stdout (csv only)")
+        parser.add_argument("--input-format", choices=["jsonl", "csv"],
+                            help="default: from the input file extension")
+        parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--chunk-size", type=int, default=500, help="strategies per task")
+        parser.add_argument("--days", type=float, help="days to expiry for legs/rows without their own")
+        parser.add_argument("--vol", help="vol (percent or decimal) for legs/rows without their own")
+        parser.add_argument("--rate", default="0")
+        parser.add_argument("--div-yield", default="0")
+        parser.add_argument("--spot-shifts", default="-20,-10,0,10,20", help="percent")
+        parser.add_argument("--vol-shifts", default="-10,0,10", help="vol points")
+
+    def handle(self, *args, **opts):
+        fmt = opts["input_format"] or ("csv" if opts["input"].lower().endswith(".csv") else "jsonl")
+        if opts["format"] == "parquet" and opts["output"] == "-":
+            raise CommandError("parquet output needs a file path")
+        cfg = {
+            "days": opts["days"],
+            "vol": _parse_percent_maybe(opts["vol"]),
+            "rate": _parse_percent_maybe(opts["rate"]) or 0.0,
+            "div_yield": _parse_percent_maybe(opts["div_yield"]) or 0.0,
+            "spot_shifts": _shift_list(opts["spot_shifts"], "spot-shifts"),
+            "vol_shifts": _shift_list(opts["vol_shifts"], "vol-shifts"),
+        }
+        chunk_size = max(1, opts["chunk_size"])
+        workers = max(1, opts["workers"])
+        columns = _columns(cfg)
+        sink = (_ParquetSink if opts["format"] == "parquet" else _CsvSink)(opts["output"], columns)
+
+        rows = _read_rows(opts["input"], fmt)
+        chunks = iter(lambda: list(islice(rows, chunk_size)), [])
+        t0 = time.perf_counter()
+        done = failed = 0
+        try:
+            if workers == 1:
+                results = (_evaluate_chunk((chunk, cfg)) for chunk in chunks)
+                for records in results:
+                    done, failed = self._emit(sink, records, done, failed, t0)
+            else:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                    # keep a bounded number of chunks in flight so memory stays flat
+                    pending = []
+                    for chunk in chunks:
+                        pending.append(pool.submit(_evaluate_chunk, (chunk, cfg)))
+                        if len(pending) >= 2 * workers:
+                            done, failed = self._emit(sink, pending.pop(0).result(), done, failed, t0)
+                    for fut in pending:
+                        done, failed = self._emit(sink, fut.result(), done, failed, t0)
+        finally:
+            sink.close()
+
+        elapsed = time.perf_counter() - t0
+        rate = done / elapsed if elapsed > 0 else math.inf
+        self.stderr.write("")
+        self.stderr.write(self.style.SUCCESS(
+            f"{done} strategies in {elapsed:.1f}s ({rate:,.0f}/s, {workers} workers), {failed} with errors"))
+
+    def _emit(self, sink, records, done, failed, t0):
+        sink.write(records)
+        done += len(records)
+        failed += sum(1 for r in records if r.get("error"))
+        elapsed = time.perf_counter() - t0
+        self.stderr.write(f"\r{done} strategies, {done / max(elapsed, 1e-9):,.0f}/s", ending="")
+        self.stderr.flush()
+        return done, failed
@@ -0,0 +1,86 @@
+# Generated by Django 5.0.13 on 2026-10-18 08:32
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedStrategy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(blank=True, max_length=120)),
+                ('underlying', models.CharField(blank=True, max_length=32)),
+                ('S0', models.FloatField()),
+                ('start', models.FloatField(default=0.0)),
+                ('stop', models.FloatField()),
+                ('by', models.FloatField(default=1.0)),
+                ('metrics', models.JSONField(blank=True, null=True)),
+                ('description', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('owner', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='option_strategies', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-updated_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PricingSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('as_of', models.DateTimeField(default=django.utils.timezone.now)),
+                ('spot', models.FloatField()),
+                ('vol', models.FloatField(blank=True, null=True)),
+                ('rate', models.FloatField(default=0.0)),
+                ('div_yield', models.FloatField(default=0.0)),
+                ('value', models.FloatField()),
+                ('pnl', models.FloatField()),
+                ('greeks', models.JSONField()),
+                ('strategy', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='options.savedstrategy')),
+            ],
+            options={
+                'ordering': ['-as_of'],
+                'get_latest_by': 'as_of',
+            },
+        ),
+        migrations.CreateModel(
+            name='StrategyLeg',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(choices=[('call', 'Call'), ('put', 'Put')], max_length=4)),
+                ('side', models.SmallIntegerField(choices=[(1, 'Long'), (-1, 'Short')])),
+                ('K', models.FloatField()),
+                ('price', models.FloatField()),
+                ('Q', models.PositiveIntegerField(default=1)),
+                ('days', models.FloatField(blank=True, null=True)),
+                ('vol', models.FloatField(blank=True, null=True)),
+                ('strategy', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='legs', to='options.savedstrategy')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='savedstrategy',
+            index=models.Index(fields=['owner', '-updated_at'], name='strategy_owner_recent'),
+        ),
+        migrations.AddIndex(
+            model_name='savedstrategy',
+            index=models.Index(fields=['underlying', '-updated_at'], name='strategy_underlying_recent'),
+        ),
+        migrations.AddIndex(
+            model_name='pricingsnapshot',
+            index=models.Index(fields=['strategy', '-as_of'], name='snapshot_strategy_recent'),
+        ),
+    ]
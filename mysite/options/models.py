@@ -1,3 +1,149 @@
-from django.db import models
+import json
 
-# Create your models here.
+import numpy as np
+from django.conf import settings
+from django.db import models, transaction
+from django.http import QueryDict
+from django.utils import timezone
+
+from .optionslib import OptionStrat
+from .optionslib.instruments import LEG_DTYPE
+
+
+class SavedStrategy(models.Model):
+    """A strategy saved from the payoff page, with its expiry metrics stored alongside."""
+
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True,
+                              on_delete=models.CASCADE, related_name="option_strategies")
+    name = models.CharField(max_length=120, blank=True)
+    underlying = models.CharField(max_length=32, blank=True)
+    S0 = models.FloatField()
+    start = models.FloatField(default=0.0)
+    stop = models.FloatField()
+    by = models.FloatField(default=1.0)
+    # OptionStrat.metrics() / describe_text(), filled on save so pages render without rebuilding
+    metrics = models.JSONField(null=True, blank=True)
+    description = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-updated_at"]
+        indexes = [
+            models.Index(fields=["owner", "-updated_at"], name="strategy_owner_recent"),
+            models.Index(fields=["underlying", "-updated_at"], name="strategy_underlying_recent"),
+        ]
+
+    def __str__(self):
+        return self.name or f"strategy #{self.pk}"
+
+    @classmethod
+    def create_with_legs(cls, legs, **fields):
+        """Create the strategy and all its legs (one bulk insert) with metrics precomputed.
+
+        ``legs`` are dicts as produced by ``parse_params`` (type, side, K, price, Q, days?, vol?).
+        """
+        with transaction.atomic():
+            strategy = cls(**fields)
+            rows = [StrategyLeg.from_params(leg) for leg in legs]
+            strategy.refresh_metrics(rows, save=False)
+            strategy.save()
+            for row in rows:
+                row.strategy = strategy
+            StrategyLeg.objects.bulk_create(rows)
+        return strategy
+
+    def build(self, legs=None):
+        """The ``OptionStrat``; pass ``legs`` when they are already loaded (e.g. prefetched)."""
+        strat = OptionStrat(self.name, self.S0, {"start": self.start, "stop": self.stop, "by": self.by})
+        for leg in self.legs.all() if legs is None else legs:
+            add = getattr(strat, f"{'long' if leg.side == 1 else 'short'}_{leg.type}")
+            add(leg.K, leg.price, leg.Q)
+        return strat
+
+    def refresh_metrics(self, legs=None, save=True):
+        strat = self.build(legs)
+        self.metrics = strat.metrics()
+        self.description = strat.describe_text()
+        if save:
+            self.save(update_fields=["metrics", "description", "updated_at"])
+
+    def to_params(self, legs=None):
+        """Same shape as ``parse_params`` output, so the chart/JSON views can serve it."""
+        return {
+            "name": self.name,
+            "S0": self.S0,
+            "start": self.start,
+            "stop": self.stop,
+            "by": self.by,
+            "requested_by": None,
+            "legs": [leg.to_params() for leg in (self.legs.all() if legs is None else legs)],
+            "valuation": None,
+        }
+
+    def query_string(self, legs=None):
+        p = self.to_params(legs)
+        q = QueryDict(mutable=True)
+        q.update({k: p[k] for k in ("name", "S0", "start", "stop", "by")})
+        q["legs"] = json.dumps([{**leg, "side": "long" if leg["side"] == 1 else "short"} for leg in p["legs"]])
+        return q
+
+
+class StrategyLeg(models.Model):
+    CALL, PUT = "call", "put"
+
+    strategy = models.ForeignKey(SavedStrategy, on_delete=models.CASCADE, related_name="legs")
+    type = models.CharField(max_length=4, choices=[(CALL, "Call"), (PUT, "Put")])
+    side = models.SmallIntegerField(choices=[(1, "Long"), (-1, "Short")])
+    K = models.FloatField()
+    price = models.FloatField()
+    Q = models.PositiveIntegerField(default=1)
+    # optional per-leg expiry / vol for valuation before expiry
+    days = models.FloatField(null=True, blank=True)
+    vol = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+
+    @classmethod
+    def from_params(cls, leg):
+        return cls(type=leg["type"], side=leg["side"], K=leg["K"], price=leg["price"],
+                   Q=leg.get("Q", 1), days=leg.get("days"), vol=leg.get("vol"))
+
+    def to_params(self):
+        leg = {"type": self.type, "side": self.side, "K": self.K, "price": self.price, "Q": self.Q}
+        if self.days is not None:
+            leg["days"] = self.days
+        if self.vol is not None:
+            leg["vol"] = self.vol
+        return leg
+
+    @staticmethod
+    def to_array(legs):
+        """LEG_DTYPE rows without going through Option objects."""
+        arr = np.empty(len(legs), dtype=LEG_DTYPE)
+        arr["is_call"] = [leg.type == StrategyLeg.CALL for leg in legs]
+        arr["K"] = [leg.K for leg in legs]
+        arr["price"] = [leg.price for leg in legs]
+        arr["side"] = [leg.side for leg in legs]
+        arr["Q"] = [leg.Q for leg in legs]
+        return arr
+
+
+class PricingSnapshot(models.Model):
+    """Black-Scholes value and greeks of a saved strategy under one set of market inputs."""
+
+    strategy = models.ForeignKey(SavedStrategy, on_delete=models.CASCADE, related_name="snapshots")
+    as_of = models.DateTimeField(default=timezone.now)
+    spot = models.FloatField()
+    vol = models.FloatField(null=True, blank=True)  # flat vol; null when legs carry their own
+    rate = models.FloatField(default=0.0)
+    div_yield = models.FloatField(default=0.0)
+    value = models.FloatField()
+    pnl = models.FloatField()  # value - net premium
+    greeks = models.JSONField()
+
+    class Meta:
+        ordering = ["-as_of"]
+        get_latest_by = "as_of"
+        indexes = [models.Index(fields=["strategy", "-as_of"], name="snapshot_strategy_recent")]
@@ -1,5 +1,12 @@
 from .instruments import Option
 from .strategy import OptionStrat
-from .plotting import plot_payoff
 
 __all__ = ["Option", "OptionStrat", "plot_payoff"]
+
+
+def __getattr__(name):
+    # plotting pulls in Matplotlib; load it on first use, not on package import
+    if name == "plot_payoff":
+        from .plotting import plot_payoff
+        return plot_payoff
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
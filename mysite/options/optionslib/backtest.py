@@ -0,0 +1,193 @@
+import csv
+
+import numpy as np
+
+from .black_scholes import bsm_price_batch
+from .strategy import DAYS_PER_YEAR
+
+TRADING_DAYS = 252  # annualizes realized vol from daily closes
+# leg marks priced per block (entry dates x closes held x legs): bounds the temporaries
+BLOCK_ELEMENTS = 1 << 18
+# header spellings, in order of preference
+DATE_COLUMNS = ("date", "day", "timestamp")
+CLOSE_COLUMNS = ("adj_close", "adj close", "close", "price", "last")
+
+
+def _column(header, names, path):
+    for name in names:
+        if name in header:
+            return header.index(name)
+    raise ValueError(f"{path}: no {names[0]!r} column (looked for {', '.join(names)})")
+
+
+def load_prices(path, start=None, end=None, columns=()):
+    """Stream a ``date,close[,...]`` CSV into ``(dates, close, extra)``.
+
+    Rows outside ``start``..``end`` (ISO dates, inclusive) are dropped while reading, so
+    only the requested range is held in memory. ``extra`` maps each name in ``columns``
+    (e.g. an implied vol index) to its values. Rows without a close are skipped; a
+    repeated date keeps its last row.
+    """
+    dates, closes, extra = [], [], {name: [] for name in columns}
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = [h.strip().lower() for h in next(reader, [])]
+        i_date = _column(header, DATE_COLUMNS, path)
+        i_close = _column(header, CLOSE_COLUMNS, path)
+        i_extra = {name: _column(header, (name.lower(),), path) for name in columns}
+        for lineno, row in enumerate(reader, 2):
+            if len(row) <= max(i_date, i_close) or not row[i_close].strip():
+                continue
+            day = row[i_date].strip()[:10]
+            if (start and day < start) or (end and day > end):
+                continue
+            try:
+                closes.append(float(row[i_close]))
+                for name, i in i_extra.items():
+                    extra[name].append(float(row[i]) if i < len(row) and row[i].strip() else np.nan)
+            except ValueError:
+                raise ValueError(f"{path}:{lineno}: not a number") from None
+            dates.append(day)
+    try:
+        dates = np.array(dates, dtype="datetime64[D]")
+    except ValueError:
+        raise ValueError(f"{path}: dates must be YYYY-MM-DD") from None
+    close = np.array(closes)
+    extra = {name: np.array(values) for name, values in extra.items()}
+    order = np.argsort(dates, kind="stable")
+    last = np.ones(len(order), dtype=bool)  # keep the last row of each date
+    last[:-1] = dates[order][1:] != dates[order][:-1]
+    order = order[last]
+    return dates[order], close[order], {name: values[order] for name, values in extra.items()}
+
+
+def realized_vol(close, window=21):
+    """Trailing annualized close-to-close vol known at each day's close.
+
+    The first ``window`` days, which have no full window yet, reuse the first full one.
+    """
+    returns = np.diff(np.log(np.asarray(close, dtype=float)))
+    if window < 2 or len(returns) < window:
+        raise ValueError(f"need more than {window} closes for a {window}-day realized vol")
+    s = np.concatenate(([0.0], np.cumsum(returns)))
+    s2 = np.concatenate(([0.0], np.cumsum(returns * returns)))
+    total, squares = s[window:] - s[:-window], s2[window:] - s2[:-window]
+    var = np.maximum(squares - total * total / window, 0.0) / (window - 1)
+    vol = np.sqrt(var * TRADING_DAYS)
+    return np.concatenate((np.full(window, vol[0]), vol))
+
+
+def cycle_marks(dates, held):
+    """Leg marks ``backtest`` prices for ``held`` calendar days per leg: entry dates x
+    closes in the longest cycle x legs. Cheap, for sizing a run before starting it."""
+    day = np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+    held = np.atleast_1d(np.asarray(held, dtype=float))
+    if not len(day) or not len(held):
+        return 0
+    exit_ = np.minimum(np.searchsorted(day, day + held.max()), len(day) - 1)
+    return len(day) * (int((exit_ - np.arange(len(day))).max()) + 1) * len(held)
+
+
+def _cycle_pnl(legs, weight, moneyness, day, close, sigma, expiry, leg_exit, exit_, r, q, block):
+    """P&L[i, h] of the cycle opened at the close of day i, h trading days later (NaN past its exit)."""
+    n = len(day)
+    entries = np.arange(n)
+    H = int((exit_ - entries).max())
+    h = np.arange(H + 1)
+    if block is None:
+        block = max(1, BLOCK_ELEMENTS // ((H + 1) * len(legs)))
+    pnl = np.full((n, H + 1), np.nan)
+    entry_value = np.empty(n)
+    for lo in range(0, n, block):
+        i = entries[lo:lo + block]
+        j = i[:, None] + h
+        live = j <= exit_[i][:, None]
+        # each leg freezes at its own settlement (the first close on/after its expiry)
+        jl = np.minimum(np.minimum(j, n - 1)[:, :, None], np.minimum(leg_exit[i], n - 1)[:, None, :])
+        T = np.maximum(expiry[i][:, None, :] - day[jl], 0.0) / DAYS_PER_YEAR
+        K = close[i][:, None, None] * moneyness
+        value = bsm_price_batch(close[jl], K, T, r, sigma[jl], q, legs["is_call"]) @ weight
+        entry_value[i] = value[:, 0]
+        pnl[i] = np.where(live, value - value[:, :1], np.nan)
+    return pnl, entry_value
+
+
+def backtest(strat, dates, close, days, sigma, r=0.0, q=0.0, starts=None, roll=True, leg_days=None,
+             block=None):
+    """Run ``strat`` over a daily close history from every index in ``starts`` at once.
+
+    A cycle opens at a day's close with the strikes scaled by close / ``strat.S0`` (same
+    moneyness), is priced with ``bsm_price_batch`` at that day's ``sigma`` (scalar or one
+    per date), marked at every close and settled at expiry, ``days`` calendar days later
+    (or ``leg_days`` per leg). With ``roll`` the next cycle opens at the close the last
+    leg settles. Every entry date's cycle is priced once, in blocks of ``block`` entry
+    dates (default: ``BLOCK_ELEMENTS`` leg marks per block), and shared by all starts;
+    values are per share times each leg's Q.
+
+    Returns a dict: ``equity`` and ``drawdown`` (starts x dates, NaN before a start),
+    per start ``final``, ``max_drawdown`` and ``cycles``, and per entry date ``entry_value``
+    (net debit > 0) and ``cycle_pnl`` (NaN for a cycle still open at the end).
+    """
+    legs = strat.leg_array()
+    if not len(legs):
+        raise ValueError("strategy has no legs")
+    day = np.asarray(dates, dtype="datetime64[D]").astype(np.int64).astype(float)
+    close = np.asarray(close, dtype=float)
+    n = len(day)
+    if n < 2 or np.any(np.diff(day) <= 0):
+        raise ValueError("need at least two closes with strictly increasing dates")
+    if np.any(~np.isfinite(close)) or np.any(close <= 0):
+        raise ValueError("closes must be positive")
+    sigma = np.broadcast_to(np.asarray(sigma, dtype=float), (n,))
+    if np.any(~np.isfinite(sigma)) or np.any(sigma <= 0):
+        raise ValueError("vol must be positive at every date")
+    held = np.broadcast_to(np.asarray(days if leg_days is None else leg_days, dtype=float), (len(legs),))
+    if np.any(~np.isfinite(held)) or np.any(held <= 0):
+        raise ValueError("days to expiry must be > 0")
+
+    weight = (legs["side"] * legs["Q"]).astype(float)
+    moneyness = legs["K"] / strat.S0
+    expiry = day[:, None] + held                            # (dates, legs)
+    leg_exit = np.searchsorted(day, expiry)                 # == n: not settled within the history
+    exit_ = leg_exit.max(axis=1)
+    still_open = exit_ >= n
+    exit_ = np.minimum(exit_, n - 1)
+    pnl, entry_value = _cycle_pnl(legs, weight, moneyness, day, close, sigma, expiry, leg_exit, exit_, r, q,
+                                  block)
+    span = exit_ - np.arange(n)
+    cycle_pnl = np.where(still_open, np.nan, pnl[np.arange(n), span])
+
+    starts = np.arange(n) if starts is None else np.asarray(starts, dtype=np.int64)
+    equity = np.full((len(starts), n), np.nan)
+    base = np.zeros(len(starts))
+    cycles = np.zeros(len(starts), dtype=np.int64)
+    current = starts.copy()
+    active = np.ones(len(starts), dtype=bool)
+    h = np.arange(pnl.shape[1])
+    # all starts advance one cycle per pass
+    while active.any():
+        rows = np.flatnonzero(active)
+        e = current[rows]
+        live = h <= span[e][:, None]
+        cols = e[:, None] + h
+        equity[np.broadcast_to(rows[:, None], cols.shape)[live], cols[live]] = (base[rows, None] + pnl[e])[live]
+        cycles[rows] += 1
+        base[rows] += pnl[e, span[e]]
+        current[rows] = exit_[e]
+        active[rows[still_open[e] | (exit_[e] >= n - 1) | (not roll)]] = False
+    if not roll:
+        # flat after the single cycle closes
+        equity = np.where(np.arange(n) > exit_[starts][:, None], base[:, None], equity)
+
+    drawdown = equity - np.fmax.accumulate(equity, axis=1)
+    return {
+        "dates": np.asarray(dates, dtype="datetime64[D]"),
+        "starts": starts,
+        "equity": equity,
+        "drawdown": drawdown,
+        "final": equity[:, -1],
+        "max_drawdown": np.nanmin(drawdown, axis=1),
+        "cycles": cycles,
+        "entry_value": entry_value,
+        "cycle_pnl": cycle_pnl,
+    }
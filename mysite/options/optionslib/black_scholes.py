@@ -1,52 +1,268 @@
 
 import math
 
+import numpy as np
+
+_SQRT2 = math.sqrt(2.0)
+_INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
+GREEK_NAMES = ("delta", "gamma", "vega", "theta", "rho")
+
+
 def _norm_cdf(x: float) -> float:
-    
-    return 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
+    # erfc form: 1 + erf(x) cancels to 0 in the lower tail, erfc keeps full relative precision
+    return 0.5 * math.erfc(-x / _SQRT2)
 
 def _norm_pdf(x: float) -> float:
-    return math.exp(-0.5 * x * x) / math.sqrt(2.0 * math.pi)
+    return math.exp(-0.5 * x * x) * _INV_SQRT_2PI
 
 def bsm_price(spot: float, strike: float, t: float, r: float, sigma: float, q: float = 0.0, kind: str = "C") -> float:
+    call = kind.upper() == "C"
     if t <= 0 or sigma <= 0 or spot <= 0 or strike <= 0:
-        
-        intrinsic = max(0.0, (spot - strike) if kind.upper() == "C" else (strike - spot))
-        return float(intrinsic)
-
-    d1 = (math.log(spot / strike) + (r - q + 0.5 * sigma * sigma) * t) / (sigma * math.sqrt(t))
-    d2 = d1 - sigma * math.sqrt(t)
+        return float(max(0.0, (spot - strike) if call else (strike - spot)))
 
-    if kind.upper() == "C":
+    vol_sqrt_t = sigma * math.sqrt(t)
+    d1 = (math.log(spot / strike) + (r - q + 0.5 * sigma * sigma) * t) / vol_sqrt_t
+    d2 = d1 - vol_sqrt_t
+    if call:
         return spot * math.exp(-q * t) * _norm_cdf(d1) - strike * math.exp(-r * t) * _norm_cdf(d2)
-    else:
-        return strike * math.exp(-r * t) * _norm_cdf(-d2) - spot * math.exp(-q * t) * _norm_cdf(-d1)
+    return strike * math.exp(-r * t) * _norm_cdf(-d2) - spot * math.exp(-q * t) * _norm_cdf(-d1)
 
 def greeks(spot: float, strike: float, t: float, r: float, sigma: float, q: float = 0.0, kind: str = "C"):
-    
-    if t <= 0 or sigma <= 0 or spot <= 0 or strike <= 0:
-        return {"delta": 0.0, "gamma": 0.0, "vega": 0.0, "theta": 0.0, "rho": 0.0}
+    return bsm_price_greeks(spot, strike, t, r, sigma, q, kind)[1]
 
-    d1 = (math.log(spot / strike) + (r - q + 0.5 * sigma * sigma) * t) / (sigma * math.sqrt(t))
-    d2 = d1 - sigma * math.sqrt(t)
+def bsm_price_greeks(spot: float, strike: float, t: float, r: float, sigma: float, q: float = 0.0, kind: str = "C"):
+    """``(bsm_price(...), greeks(...))`` with d1/d2, discounting and N(.) evaluated once."""
+    call = kind.upper() == "C"
+    if t <= 0 or sigma <= 0 or spot <= 0 or strike <= 0:
+        intrinsic = float(max(0.0, (spot - strike) if call else (strike - spot)))
+        return intrinsic, dict.fromkeys(GREEK_NAMES, 0.0)
 
-    pdf = _norm_pdf(d1)
+    sqrt_t = math.sqrt(t)
+    vol_sqrt_t = sigma * sqrt_t
+    d1 = (math.log(spot / strike) + (r - q + 0.5 * sigma * sigma) * t) / vol_sqrt_t
+    d2 = d1 - vol_sqrt_t
     disc_q = math.exp(-q * t)
-    disc_r = math.exp(-r * t)
-
-    if kind.upper() == "C":
-        delta = disc_q * _norm_cdf(d1)
-        rho   = t * strike * disc_r * _norm_cdf(d2)
-        theta = (-disc_q * spot * pdf * sigma / (2 * math.sqrt(t))
-                 - r * strike * disc_r * _norm_cdf(d2)
-                 + q * spot * disc_q * _norm_cdf(d1))
-    else:
-        delta = -disc_q * _norm_cdf(-d1)
-        rho   = -t * strike * disc_r * _norm_cdf(-d2)
-        theta = (-disc_q * spot * pdf * sigma / (2 * math.sqrt(t))
-                 + r * strike * disc_r * _norm_cdf(-d2)
-                 - q * spot * disc_q * _norm_cdf(-d1))
-
-    gamma = disc_q * pdf / (spot * sigma * math.sqrt(t))
-    vega  = spot * disc_q * pdf * math.sqrt(t)  
-    return {"delta": delta, "gamma": gamma, "vega": vega, "theta": theta, "rho": rho}
+    disc_k = strike * math.exp(-r * t)
+    fwd_s = spot * disc_q
+    sign = 1.0 if call else -1.0
+    nd1 = _norm_cdf(sign * d1)
+    nd2 = _norm_cdf(sign * d2)
+    pdf = _norm_pdf(d1)
+
+    price = sign * (fwd_s * nd1 - disc_k * nd2)
+    vega = fwd_s * pdf * sqrt_t
+    return price, {
+        "delta": sign * disc_q * nd1,
+        "gamma": vega / (spot * spot * sigma * t),
+        "vega": vega,
+        "theta": -fwd_s * pdf * sigma / (2 * sqrt_t) - sign * (r * disc_k * nd2 - q * fwd_s * nd1),
+        "rho": sign * t * disc_k * nd2,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Vectorized (batch) pricing: arrays in, arrays out.
+# ---------------------------------------------------------------------------
+
+# Cephes ndtr/erfc rational approximations (double precision).
+_ERF_T = (9.60497373987051638749E0, 9.00260197203842689217E1, 2.23200534594684319226E3,
+          7.00332514112805075473E3, 5.55923013010394962768E4)
+_ERF_U = (3.35617141647503099647E1, 5.21357949780152679795E2, 4.59432382970980127987E3,
+          2.26290000613890934246E4, 4.92673942608635921086E4)
+_ERFC_P = (2.46196981473530512524E-10, 5.64189564831068821977E-1, 7.46321056442269912687E0,
+           4.86371970985681366614E1, 1.96520832956077098242E2, 5.26445194995477358631E2,
+           9.34528527171957607540E2, 1.02755188689515710272E3, 5.57535335369399327526E2)
+_ERFC_Q = (1.32281951154744992508E1, 8.67072140885989742329E1, 3.54937778887819891062E2,
+           9.75708501743205489753E2, 1.82390916687909736289E3, 2.24633760818710981792E3,
+           1.65666309194161350182E3, 5.57535340817727675546E2)
+_ERFC_R = (5.64189583547755073984E-1, 1.27536670759978104416E0, 5.01905042251180477414E0,
+           6.16021097993053585195E0, 7.40974269950448939160E0, 2.97886665372100240670E0)
+_ERFC_S = (2.26052863220117276590E0, 9.39603524938001434673E0, 1.20489539808096656605E1,
+           1.70814450747565897222E1, 9.60896809063285878198E0, 3.36907645100081516050E0)
+
+GREEK_DTYPE = np.dtype([("delta", "f8"), ("gamma", "f8"), ("vega", "f8"), ("theta", "f8"), ("rho", "f8")])
+
+
+def _polevl(x, coefs):
+    y = np.full_like(x, coefs[0])
+    for c in coefs[1:]:
+        y = y * x + c
+    return y
+
+
+def _p1evl(x, coefs):
+    y = x + coefs[0]
+    for c in coefs[1:]:
+        y = y * x + c
+    return y
+
+
+def _erfc_vec(x: np.ndarray) -> np.ndarray:
+    a = np.abs(x)
+    z = a * a
+    with np.errstate(over="ignore", under="ignore"):
+        ez = np.exp(-z)
+        tail = ez * _polevl(a, _ERFC_P) / _p1evl(a, _ERFC_Q)
+        far = a >= 8.0
+        if np.any(far):
+            tail = np.where(far, ez * _polevl(a, _ERFC_R) / _p1evl(a, _ERFC_S), tail)
+    tail = np.where(x < 0, 2.0 - tail, tail)
+    core = 1.0 - x * _polevl(z, _ERF_T) / _p1evl(z, _ERF_U)
+    return np.where(a < 1.0, core, tail)
+
+
+def _norm_cdf_vec(x: np.ndarray) -> np.ndarray:
+    # erfc form keeps full relative precision in the lower tail
+    return 0.5 * _erfc_vec(-x / _SQRT2)
+
+
+def _norm_pdf_vec(x: np.ndarray) -> np.ndarray:
+    return np.exp(-0.5 * x * x) * _INV_SQRT_2PI
+
+
+def _is_call(kind) -> np.ndarray:
+    """Same rule as the scalar path: only 'C' (any case) is a call."""
+    if isinstance(kind, str):
+        return np.asarray(kind.upper() == "C")
+    k = np.asarray(kind)
+    if k.dtype == bool:
+        return k
+    return (k == "C") | (k == "c")
+
+
+def _broadcast_inputs(spot, strike, t, r, sigma, q, kind):
+    if hasattr(sigma, "vol"):
+        # a VolSurface: look up sigma per contract (sticky strike)
+        sigma = sigma.vol(strike, t)
+    call = _is_call(kind)
+    S, K, T, R, V, Q, call = np.broadcast_arrays(
+        np.asarray(spot, dtype=float), np.asarray(strike, dtype=float),
+        np.asarray(t, dtype=float), np.asarray(r, dtype=float),
+        np.asarray(sigma, dtype=float), np.asarray(q, dtype=float), call,
+    )
+    valid = (T > 0) & (V > 0) & (S > 0) & (K > 0)
+    return S, K, T, R, V, Q, call, valid
+
+
+def _d1_d2(S, K, T, R, V, Q, valid):
+    # Park invalid lanes on harmless values so log/sqrt/divide stay quiet.
+    S_ = np.where(valid, S, 1.0)
+    K_ = np.where(valid, K, 1.0)
+    T_ = np.where(valid, T, 1.0)
+    V_ = np.where(valid, V, 1.0)
+    sqrt_t = np.sqrt(T_)
+    vol_sqrt_t = V_ * sqrt_t
+    d1 = (np.log(S_ / K_) + (R - Q + 0.5 * V_ * V_) * T_) / vol_sqrt_t
+    d2 = d1 - vol_sqrt_t
+    return S_, K_, T_, V_, sqrt_t, d1, d2
+
+
+def bsm_price_batch(spot, strike, t, r, sigma, q=0.0, kind="C") -> np.ndarray:
+    """Vectorized ``bsm_price``; all arguments broadcast (``kind`` may be an array of 'C'/'P',
+    ``sigma`` a ``VolSurface``)."""
+    S, K, T, R, V, Q, call, valid = _broadcast_inputs(spot, strike, t, r, sigma, q, kind)
+    S_, K_, T_, V_, _, d1, d2 = _d1_d2(S, K, T, R, V, Q, valid)
+
+    # call: S e^{-qt} N(d1) - K e^{-rt} N(d2); put is the same with d -> -d and the sign flipped
+    sign = np.where(call, 1.0, -1.0)
+    price = sign * (S_ * np.exp(-Q * T_) * _norm_cdf_vec(sign * d1)
+                    - K_ * np.exp(-R * T_) * _norm_cdf_vec(sign * d2))
+
+    intrinsic = np.maximum(0.0, np.where(call, S - K, K - S))
+    return np.where(valid, price, intrinsic)
+
+
+def greeks_batch(spot, strike, t, r, sigma, q=0.0, kind="C") -> np.ndarray:
+    """Vectorized ``greeks``; returns a structured array with fields delta, gamma, vega, theta, rho."""
+    return bsm_price_greeks_batch(spot, strike, t, r, sigma, q, kind)[1]
+
+
+def bsm_price_greeks_batch(spot, strike, t, r, sigma, q=0.0, kind="C"):
+    """Vectorized ``bsm_price_greeks``: ``(price array, GREEK_DTYPE array)`` from one pass."""
+    S, K, T, R, V, Q, call, valid = _broadcast_inputs(spot, strike, t, r, sigma, q, kind)
+    S_, K_, T_, V_, sqrt_t, d1, d2 = _d1_d2(S, K, T, R, V, Q, valid)
+
+    sign = np.where(call, 1.0, -1.0)
+    fwd_s = S_ * np.exp(-Q * T_)
+    disc_k = K_ * np.exp(-R * T_)
+    nd1 = _norm_cdf_vec(sign * d1)
+    nd2 = _norm_cdf_vec(sign * d2)
+    pdf = _norm_pdf_vec(d1)
+
+    price = sign * (fwd_s * nd1 - disc_k * nd2)
+    intrinsic = np.maximum(0.0, np.where(call, S - K, K - S))
+
+    out = np.zeros(S.shape, dtype=GREEK_DTYPE)
+    vega = fwd_s * pdf * sqrt_t
+    out["delta"] = sign * (fwd_s / S_) * nd1
+    out["gamma"] = vega / (S_ * S_ * V_ * T_)
+    out["vega"] = vega
+    out["theta"] = -fwd_s * pdf * V_ / (2 * sqrt_t) - sign * (R * disc_k * nd2 - Q * fwd_s * nd1)
+    out["rho"] = sign * T_ * disc_k * nd2
+    out[~valid] = 0.0
+    return np.where(valid, price, intrinsic), out
+
+
+# ---------------------------------------------------------------------------
+# Curve kernel: many strikes x a whole S grid at once (mark-to-market plots).
+# ---------------------------------------------------------------------------
+
+# Phi tabulated on [-9, 9] with linear interpolation: |error| < 3e-8, plenty
+# for P&L curves and ~6x cheaper than the erfc path on large blocks.
+_CDF_H = 1.0 / 1024
+_CDF_LO = -9.0
+_CDF_TAB = _norm_cdf_vec(np.arange(_CDF_LO, -_CDF_LO + _CDF_H, _CDF_H))
+_CDF_STEP = np.diff(_CDF_TAB)
+_CDF_TOP = len(_CDF_TAB) - 1.000001
+
+
+def _norm_cdf_table(u: np.ndarray, idx: np.ndarray) -> np.ndarray:
+    """Phi at table coordinates ``u = (x - _CDF_LO) / _CDF_H``; ``u`` and ``idx`` are scratch."""
+    np.clip(u, 0.0, _CDF_TOP, out=u)
+    np.copyto(idx, u, casting="unsafe")
+    u -= idx
+    u *= _CDF_STEP.take(idx)
+    u += _CDF_TAB.take(idx)
+    return u
+
+
+def call_value_sums(spot, strikes, weights, ts, sigmas, r: float = 0.0, q: float = 0.0) -> np.ndarray:
+    """``sum_k weights[k] * C(spot, strikes[k])`` over a spot grid, one row per (t, sigma) pair.
+
+    ``sigmas`` is one vol per row, or one row of per-strike vols (rows x strikes) for a smile.
+    log(S/K) for the spot x strike block is computed once and reused for every pair.
+    Rows with t <= 0 or any sigma <= 0 fall back to intrinsic value, like ``bsm_price``.
+    """
+    S = np.asarray(spot, dtype=float)
+    K = np.asarray(strikes, dtype=float)
+    w = np.asarray(weights, dtype=float)
+    ts = np.atleast_1d(np.asarray(ts, dtype=float))
+    sigmas = np.asarray(sigmas, dtype=float)
+    if sigmas.ndim < 2:
+        ts, sigmas = np.broadcast_arrays(ts, np.atleast_1d(sigmas))
+    out = np.empty((len(ts), len(S)))
+
+    tiny = 1e-300
+    log_moneyness = np.subtract.outer(np.log(np.maximum(S, tiny)), np.log(np.maximum(K, tiny)))
+    u1 = np.empty_like(log_moneyness)
+    u2 = np.empty_like(log_moneyness)
+    idx = np.empty(log_moneyness.shape, dtype=np.intp)
+    wk = w * K
+    intrinsic = None
+
+    for row, (t, sigma) in enumerate(zip(ts, sigmas)):
+        if t <= 0 or np.any(sigma <= 0):
+            if intrinsic is None:
+                intrinsic = np.maximum(S[:, None] - K[None, :], 0.0) @ w
+            out[row] = intrinsic
+            continue
+        b = sigma * math.sqrt(t)
+        a = (r - q + 0.5 * sigma * sigma) * t
+        # table coordinates of d1; d2 = d1 - b is a constant shift (per strike)
+        np.multiply(log_moneyness, 1.0 / (b * _CDF_H), out=u1)
+        u1 += (a / b - _CDF_LO) / _CDF_H
+        np.subtract(u1, b / _CDF_H, out=u2)
+        n1 = _norm_cdf_table(u1, idx) @ w
+        n2 = _norm_cdf_table(u2, idx) @ wk
+        out[row] = S * (math.exp(-q * t) * n1) - math.exp(-r * t) * n2
+    return out
@@ -0,0 +1,332 @@
+import json
+import mmap
+import os
+
+import numpy as np
+
+from .implied_vol import implied_vol_batch
+from .strategy import DAYS_PER_YEAR
+
+FORMAT = "optionchain/1"
+# one raw little-endian <field>.bin per column; quotes missing from the source are NaN / 0
+FIELDS = {
+    "strike": "<f8",
+    "is_call": "|b1",
+    "bid": "<f8",
+    "ask": "<f8",
+    "last": "<f8",
+    "iv": "<f8",
+    "underlying_price": "<f8",
+    "volume": "<i8",
+    "open_interest": "<i8",
+}
+# one entry per run of rows sharing (underlying, quote date, expiry), in row order;
+# dates are days since 1970-01-01
+SEGMENT_DTYPE = np.dtype([
+    ("underlying", "<i4"), ("date", "<i4"), ("expiry", "<i4"), ("start", "<i8"), ("stop", "<i8"),
+])
+_META = "chain.json"
+_SEGMENTS = "segments.bin"
+_BITS = 21  # symbol codes and day numbers each get 21 bits of the int64 lookup key
+# storable quote/expiry dates: 1970-01-01 .. 7711-10-22
+MAX_DAY = (1 << _BITS) - 1
+
+
+def to_day(value):
+    """Days since 1970-01-01 for a ``date``, ``datetime64`` or ISO ``YYYY-MM-DD`` string."""
+    return int(np.datetime64(value, "D").astype(np.int64))
+
+
+def from_day(day):
+    return np.datetime64(int(day), "D").item()
+
+
+def _key(underlying, date, expiry):
+    return ((np.asarray(underlying, dtype=np.int64) << 2 * _BITS)
+            | (np.asarray(date, dtype=np.int64) << _BITS) | np.asarray(expiry, dtype=np.int64))
+
+
+def _map(path, dtype, n):
+    if n == 0:
+        return np.empty(0, dtype=dtype)
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(mmap, "MADV_RANDOM"):
+        # lookups jump between chains; readahead would only fill the page cache
+        mm.madvise(mmap.MADV_RANDOM)
+    return np.frombuffer(mm, dtype=dtype, count=n)
+
+
+def _append(path, arr, offset):
+    # drop whatever a crashed writer left past the committed end, then append
+    with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+        f.truncate(offset)
+        f.seek(offset)
+        f.write(np.ascontiguousarray(arr).tobytes())
+
+
+def _mid(bid, ask, last):
+    quoted = np.isfinite(bid) & np.isfinite(ask) & (ask >= bid) & (ask > 0)
+    with np.errstate(invalid="ignore"):
+        return np.where(quoted, 0.5 * (bid + ask), last)
+
+
+class Chain:
+    """One underlying / quote date / expiry, strikes ascending (the put first at a strike).
+
+    ``chain["bid"]`` etc. are views into the store's memory maps, so a chain costs no
+    I/O until a column is touched. ``ids`` are the store-wide chain ids legs refer to.
+    """
+
+    def __init__(self, store, underlying, date, expiry, rows):
+        self.store = store
+        self.underlying = underlying
+        self.date = date
+        self.expiry = expiry
+        self.days = (expiry - date).days
+        self.t = self.days / DAYS_PER_YEAR
+        # a slice (zero-copy) or, for a chain appended in several batches, sorted row ids
+        self._rows = rows
+
+    def __len__(self):
+        rows = self._rows
+        return rows.stop - rows.start if isinstance(rows, slice) else len(rows)
+
+    def __getitem__(self, field):
+        return self.store.columns[field][self._rows]
+
+    def __repr__(self):
+        return f"<Chain {self.underlying} {self.date} -> {self.expiry}: {len(self)} quotes>"
+
+    @property
+    def ids(self):
+        rows = self._rows
+        return np.arange(rows.start, rows.stop) if isinstance(rows, slice) else rows
+
+    @property
+    def strike(self):
+        return self["strike"]
+
+    @property
+    def is_call(self):
+        return self["is_call"]
+
+    @property
+    def mid(self):
+        """(bid + ask) / 2 where both sides are quoted, else the last trade."""
+        return _mid(self["bid"], self["ask"], self["last"])
+
+    @property
+    def spot(self):
+        prices = self["underlying_price"]
+        finite = prices[np.isfinite(prices)]
+        return float(finite[0]) if finite.size else float("nan")
+
+    def find(self, strike, kind="call"):
+        """Chain id of the ``kind`` ('call'/'put') quote at ``strike``; KeyError if absent."""
+        strikes = self.strike
+        want_call = kind == "call"
+        i = int(np.searchsorted(strikes, strike - 1e-9))
+        while i < len(strikes) and strikes[i] <= strike + 1e-9:
+            if bool(self.is_call[i]) == want_call:
+                return int(self.ids[i])
+            i += 1
+        raise KeyError(f"{self.underlying} {self.expiry}: no {kind} at strike {strike:g}")
+
+    def implied_vols(self, spot=None, r=0.0, q=0.0, price=None):
+        """``implied_vol_batch`` over the chain (mid prices unless ``price`` is given)."""
+        spot = self.spot if spot is None else spot
+        return implied_vol_batch(self.mid if price is None else price, spot, self.strike, self.t, r, q,
+                                 self.is_call)
+
+
+class ChainStore:
+    """Columnar, memory-mapped option chain history (written by ``ingest_chains``).
+
+    The directory holds ``chain.json`` (row and segment counts, underlying symbols, field
+    dtypes), one ``<field>.bin`` per column and ``segments.bin``, the (underlying, date,
+    expiry) -> row range index. Rows are only appended and ``chain.json`` is replaced
+    last, so readers never see a half-written batch. Opening maps the files: only the
+    segment index is read up front, quotes are paged in as slices are used.
+    """
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self._load()
+
+    @classmethod
+    def create(cls, path):
+        """Open the store at ``path``, initializing an empty one if there is none."""
+        os.makedirs(path, exist_ok=True)
+        if not os.path.exists(os.path.join(path, _META)):
+            cls._write_meta(os.fspath(path), rows=0, segments=0, symbols=[])
+        return cls(path)
+
+    @staticmethod
+    def _write_meta(path, rows, segments, symbols):
+        meta = {"format": FORMAT, "rows": int(rows), "segments": int(segments), "symbols": symbols,
+                "fields": FIELDS}
+        tmp = os.path.join(path, _META + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(path, _META))
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _load(self):
+        meta_path = self._file(_META)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            self._mtime = os.stat(meta_path).st_mtime_ns
+        except FileNotFoundError:
+            raise ValueError(f"{self.path}: not a chain store (no {_META})") from None
+        if meta.get("format") != FORMAT:
+            raise ValueError(f"{self.path}: unsupported chain store format {meta.get('format')!r}")
+        self.rows = meta["rows"]
+        self.symbols = meta["symbols"]
+        self._codes = {s: i for i, s in enumerate(self.symbols)}
+        self.columns = {name: _map(self._file(f"{name}.bin"), dtype, self.rows)
+                        for name, dtype in meta["fields"].items()}
+        self.segments = _map(self._file(_SEGMENTS), SEGMENT_DTYPE, meta["segments"])
+        keys = _key(self.segments["underlying"], self.segments["date"], self.segments["expiry"])
+        self._order = np.argsort(keys, kind="stable")
+        self._keys = keys[self._order]
+        self._starts = np.ascontiguousarray(self.segments["start"])
+
+    def refresh(self):
+        """Pick up batches appended since opening; True when there were any."""
+        if os.stat(self._file(_META)).st_mtime_ns == self._mtime:
+            return False
+        self._load()
+        return True
+
+    def __len__(self):
+        return self.rows
+
+    def _code(self, underlying):
+        try:
+            return self._codes[underlying.upper()]
+        except KeyError:
+            raise KeyError(f"no chains for {underlying!r}") from None
+
+    def _segments_between(self, lo, hi):
+        i, j = np.searchsorted(self._keys, [lo, hi])
+        return self.segments[self._order[i:j]]
+
+    def dates(self, underlying):
+        """Quote dates stored for ``underlying``, ascending."""
+        u = self._code(underlying)
+        segs = self._segments_between(u << 2 * _BITS, (u + 1) << 2 * _BITS)
+        return [from_day(d) for d in np.unique(segs["date"])]
+
+    def expiries(self, underlying, date):
+        """Expiries quoted for ``underlying`` on ``date``, ascending."""
+        lo = int(_key(self._code(underlying), to_day(date), 0))
+        segs = self._segments_between(lo, lo + (1 << _BITS))
+        return [from_day(d) for d in np.unique(segs["expiry"])]
+
+    def chain(self, underlying, date, expiry):
+        """The ``Chain`` for one underlying, quote date and expiry; KeyError if not stored."""
+        u, d, e = self._code(underlying), to_day(date), to_day(expiry)
+        key = int(_key(u, d, e))
+        segs = self._segments_between(key, key + 1)
+        if not len(segs):
+            raise KeyError(f"no {underlying} chain quoted on {from_day(d)} for {from_day(e)}")
+        if len(segs) == 1:
+            rows = slice(int(segs["start"][0]), int(segs["stop"][0]))
+        else:
+            rows = np.concatenate([np.arange(a, b) for a, b in zip(segs["start"], segs["stop"])])
+            rows = rows[np.lexsort((self.columns["is_call"][rows], self.columns["strike"][rows]))]
+        return Chain(self, self.symbols[u], from_day(d), from_day(e), rows)
+
+    def contains(self, underlying, date, expiry):
+        """Per-quote flags: is this (symbol, date day, expiry day) chain already stored?"""
+        codes = np.array([self._codes.get(s, -1) for s in underlying], dtype=np.int64)
+        found = np.zeros(len(codes), dtype=bool)
+        known = codes >= 0
+        if known.any() and len(self._keys):
+            keys = _key(codes[known], np.asarray(date)[known], np.asarray(expiry)[known])
+            i = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+            found[known] = self._keys[i] == keys
+        return found
+
+    def quote(self, chain_id):
+        """Every field of one quote plus its underlying, dates, ``days`` and ``mid``."""
+        chain_id = int(chain_id)
+        if not 0 <= chain_id < self.rows:
+            raise KeyError(f"unknown chain id {chain_id}")
+        seg = self.segments[int(np.searchsorted(self._starts, chain_id, side="right")) - 1]
+        out = {name: col[chain_id].item() for name, col in self.columns.items()}
+        date, expiry = from_day(seg["date"]), from_day(seg["expiry"])
+        out.update(id=chain_id, underlying=self.symbols[int(seg["underlying"])], date=date, expiry=expiry,
+                   days=(expiry - date).days, kind="call" if out["is_call"] else "put",
+                   mid=float(_mid(out["bid"], out["ask"], out["last"])))
+        return out
+
+    def vol_surface(self, underlying, date, r=0.0, q=0.0, spot=None, **kwargs):
+        """``VolSurface.from_quotes`` on the out-of-the-money mids of every expiry quoted on ``date``."""
+        from .volsurface import VolSurface
+
+        chains = [self.chain(underlying, date, e) for e in self.expiries(underlying, date)]
+        chains = [c for c in chains if c.days > 0]
+        if not chains:
+            raise ValueError(f"no {underlying} chains with days to expiry on {date}")
+        spot = chains[0].spot if spot is None else spot
+        K = np.concatenate([c.strike for c in chains])
+        T = np.concatenate([np.full(len(c), c.t) for c in chains])
+        call = np.concatenate([c.is_call for c in chains])
+        price = np.concatenate([c.mid for c in chains])
+        otm = np.where(call, K >= spot, K < spot)
+        return VolSurface.from_quotes(spot, K[otm], T[otm], prices=price[otm], kind=call[otm], r=r, q=q, **kwargs)
+
+    def append(self, underlying, date, expiry, columns):
+        """Append a batch of quotes: ``underlying`` symbols, ``date``/``expiry`` day numbers
+        (``to_day``) and ``columns`` with ``strike``, ``is_call`` and any other FIELDS.
+
+        Rows are sorted into chains before writing. A chain already stored gets a second
+        segment and is merged on read (no longer zero-copy), so callers that may see the
+        same chain twice should filter with ``contains``. Single writer only.
+        Returns the number of chains written.
+        """
+        n = len(underlying)
+        if n == 0:
+            return 0
+        symbols, codes = list(self.symbols), dict(self._codes)
+        names, inverse = np.unique(np.char.upper(np.asarray(underlying, dtype=str)), return_inverse=True)
+        for s in names.tolist():
+            if s not in codes:
+                codes[s] = len(symbols)
+                symbols.append(s)
+        u = np.array([codes[s] for s in names.tolist()], dtype=np.int64)[inverse]
+        date = np.asarray(date, dtype=np.int64)
+        expiry = np.asarray(expiry, dtype=np.int64)
+        if np.any((date < 0) | (date > MAX_DAY) | (expiry < 0) | (expiry > MAX_DAY)):
+            # a negative day would spill into the symbol bits of the lookup key
+            raise ValueError(f"append: dates must fall within 1970-01-01..{from_day(MAX_DAY)}")
+
+        cols = {}
+        for name, dtype in FIELDS.items():
+            if name in columns:
+                cols[name] = np.asarray(columns[name]).astype(dtype, copy=False)
+            elif name in ("strike", "is_call"):
+                raise ValueError(f"append: '{name}' is required")
+            else:
+                cols[name] = np.full(n, np.nan if np.dtype(dtype).kind == "f" else 0, dtype=dtype)
+
+        order = np.lexsort((cols["is_call"], cols["strike"], expiry, date, u))
+        u, date, expiry = u[order], date[order], expiry[order]
+        keys = _key(u, date, expiry)
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1))
+        segs = np.empty(len(starts), dtype=SEGMENT_DTYPE)
+        segs["underlying"], segs["date"], segs["expiry"] = u[starts], date[starts], expiry[starts]
+        segs["start"] = self.rows + starts
+        segs["stop"] = self.rows + np.append(starts[1:], n)
+
+        for name, dtype in FIELDS.items():
+            _append(self._file(f"{name}.bin"), cols[name][order], self.rows * np.dtype(dtype).itemsize)
+        _append(self._file(_SEGMENTS), segs, len(self.segments) * SEGMENT_DTYPE.itemsize)
+        self._write_meta(self.path, self.rows + n, len(self.segments) + len(segs), symbols)
+        self._load()
+        return len(segs)
@@ -0,0 +1,128 @@
+import math
+
+import numpy as np
+
+from .black_scholes import _broadcast_inputs, _norm_cdf_vec, _norm_pdf_vec
+
+# per-contract status codes returned next to the vols
+IV_OK = 0
+IV_NO_CONVERGENCE = 1
+IV_BELOW_INTRINSIC = 2   # market price under the no-arbitrage lower bound
+IV_ABOVE_MAX = 3         # market price at/over the upper bound (or needs sigma > SIGMA_MAX)
+IV_INVALID = 4           # t <= 0, spot/strike <= 0 or non-finite price
+IV_NO_TIME_VALUE = 5     # price within rounding of intrinsic: any sigma would match it
+
+IV_STATUS = {
+    IV_OK: "ok",
+    IV_NO_CONVERGENCE: "no_convergence",
+    IV_BELOW_INTRINSIC: "below_intrinsic",
+    IV_ABOVE_MAX: "above_max",
+    IV_INVALID: "invalid",
+    IV_NO_TIME_VALUE: "no_time_value",
+}
+
+SIGMA_MIN = 1e-6
+SIGMA_MAX = 10.0
+# time value below this fraction of the price is float noise (deep ITM)
+MIN_TIME_VALUE = 1e-12
+
+
+def _price_vega(S, K, T, R, Q, sign, sigma):
+    sqrt_t = np.sqrt(T)
+    vol_sqrt_t = sigma * sqrt_t
+    d1 = (np.log(S / K) + (R - Q + 0.5 * sigma * sigma) * T) / vol_sqrt_t
+    d2 = d1 - vol_sqrt_t
+    fwd_s = S * np.exp(-Q * T)
+    price = sign * (fwd_s * _norm_cdf_vec(sign * d1) - K * np.exp(-R * T) * _norm_cdf_vec(sign * d2))
+    vega = fwd_s * _norm_pdf_vec(d1) * sqrt_t
+    return price, vega
+
+
+def implied_vol_batch(price, spot, strike, t, r, q=0.0, kind="C", tol=1e-8, max_iter=100):
+    """Invert ``bsm_price`` for arrays of market prices.
+
+    Safeguarded Newton: each contract keeps a [lo, hi] vol bracket and falls back to
+    bisection whenever the Newton step leaves it or vega is too small (deep ITM/OTM,
+    near expiry). A contract converges once its price error is within ``tol`` of its
+    time value (price less intrinsic) or the implied vol is within ``tol`` (price error /
+    vega), so a deep OTM or ITM quote is not "matched" by any vol that also prices
+    within 1e-8 of its intrinsic value. Returns
+    ``(sigma, status)``; sigma is NaN wherever status != IV_OK.
+    """
+    S, K, T, R, _, Q, call, valid = _broadcast_inputs(spot, strike, t, r, 1.0, q, kind)
+    P = np.broadcast_to(np.asarray(price, dtype=float), S.shape)
+    shape = S.shape
+    S, K, T, R, Q, P, call, valid = (np.ravel(a) for a in (S, K, T, R, Q, P, call, valid))
+    valid = valid & np.isfinite(P)
+    n = S.size
+
+    sigma = np.full(n, np.nan)
+    status = np.full(n, IV_INVALID, dtype=np.int8)
+
+    idx = np.flatnonzero(valid)
+    S, K, T, R, Q, P = S[idx], K[idx], T[idx], R[idx], Q[idx], P[idx]
+    sign = np.where(call[idx], 1.0, -1.0)
+
+    fwd_s = S * np.exp(-Q * T)
+    disc_k = K * np.exp(-R * T)
+    lower = np.maximum(0.0, sign * (fwd_s - disc_k))
+    upper = np.where(sign > 0, fwd_s, disc_k)
+    price_tol = tol * np.maximum(1.0, P)
+
+    below = P < lower - price_tol
+    above = P >= upper
+    status[idx[below]] = IV_BELOW_INTRINSIC
+    status[idx[above]] = IV_ABOVE_MAX
+
+    ok = ~(below | above)
+    # the part of the price that depends on sigma at all
+    time_value = np.maximum(P - lower, 0.0)
+    flat = ok & (time_value <= MIN_TIME_VALUE * P)
+    status[idx[flat]] = IV_NO_TIME_VALUE
+    ok &= ~flat
+    hi_px, _ = _price_vega(S, K, T, R, Q, sign, np.full(S.shape, SIGMA_MAX))
+    too_high = ok & (P > hi_px)
+    status[idx[too_high]] = IV_ABOVE_MAX
+    ok &= ~too_high
+
+    # Brenner-Subrahmanyam seed, clipped into the bracket
+    seed = np.sqrt(2.0 * math.pi / T) * P / np.maximum(fwd_s, 1e-300)
+    vol = np.clip(seed, 0.05, 2.0)
+    lo = np.full(S.shape, SIGMA_MIN)
+    hi = np.full(S.shape, SIGMA_MAX)
+
+    act = np.flatnonzero(ok)
+    done = np.zeros(S.shape, dtype=bool)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for _ in range(max_iter):
+            if act.size == 0:
+                break
+            v = vol[act]
+            px, vega = _price_vega(S[act], K[act], T[act], R[act], Q[act], sign[act], v)
+            diff = px - P[act]
+
+            conv = np.abs(diff) <= tol * np.maximum(time_value[act], vega)
+            done[act[conv]] = True
+
+            lo[act] = np.where(diff < 0, v, lo[act])
+            hi[act] = np.where(diff > 0, v, hi[act])
+            newton = v - diff / vega
+            inside = (vega > 1e-12) & (newton > lo[act]) & (newton < hi[act])
+            vol[act] = np.where(conv, v, np.where(inside, newton, 0.5 * (lo[act] + hi[act])))
+
+            # a collapsed bracket means we've pinned the root as well as floats allow
+            pinned = (hi[act] - lo[act]) <= 1e-12 * np.maximum(1.0, hi[act])
+            done[act[pinned]] = True
+            act = act[~(conv | pinned)]
+
+    sigma[idx[done]] = vol[done]
+    status[idx[done]] = IV_OK
+    status[idx[ok & ~done]] = IV_NO_CONVERGENCE
+    return sigma.reshape(shape), status.reshape(shape)
+
+
+def implied_vol(price: float, spot: float, strike: float, t: float, r: float, q: float = 0.0, kind: str = "C"):
+    """Scalar convenience wrapper; returns ``(sigma or None, status string)``."""
+    sigma, status = implied_vol_batch(price, spot, strike, t, r, q, kind)
+    code = int(status)
+    return (float(sigma) if code == IV_OK else None), IV_STATUS[code]
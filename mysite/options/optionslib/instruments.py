@@ -1,13 +1,24 @@
 import numpy as np
 
 class Option:
-    """side: +1 long, -1 short; type_: 'call' | 'put'."""
-    def __init__(self, type_, K, price, side):
+    """side: +1 long, -1 short; type_: 'call' | 'put'; Q: contract count."""
+    __slots__ = ("type", "K", "price", "side", "Q")
+
+    def __init__(self, type_, K, price, side, Q=1):
         self.type = type_
         self.K = float(K)
         self.price = float(price)
         self.side = int(side)
+        self.Q = int(Q)
 
     def __repr__(self):
         side = 'long' if self.side == 1 else 'short'
-        return f'Option(type={self.type}, K={self.K}, price={self.price}, side={side})'
+        return f'Option(type={self.type}, K={self.K}, price={self.price}, side={side}, Q={self.Q})'
+
+
+LEG_DTYPE = np.dtype([("is_call", "?"), ("K", "f8"), ("price", "f8"), ("side", "i1"), ("Q", "i8")])
+
+
+def legs_to_array(instruments):
+    """Pack Option records into a LEG_DTYPE structured array."""
+    return np.array([(o.type == 'call', o.K, o.price, o.side, o.Q) for o in instruments], dtype=LEG_DTYPE)
@@ -0,0 +1,153 @@
+import math
+
+import numpy as np
+
+from .black_scholes import _is_call, bsm_price_batch
+
+LATTICE_METHODS = ("crr", "trinomial")
+DEFAULT_STEPS = 128
+MAX_STEPS = 8192
+
+
+def _tree(method, dt, r, sigma, q):
+    """Log-spacing of the nodes, node stride per level and branch probabilities (down .. up)."""
+    if method == "crr":
+        dx = sigma * math.sqrt(dt)
+        u = math.exp(dx)
+        p = (math.exp((r - q) * dt) - 1.0 / u) / (u - 1.0 / u)
+        dx, stride, probs = dx, 2, (1.0 - p, p)
+    elif method == "trinomial":
+        # Kamrad-Ritchken spacing dx = sigma * sqrt(3 dt)
+        nu = r - q - 0.5 * sigma * sigma
+        dx = sigma * math.sqrt(3.0 * dt)
+        a = (sigma * sigma * dt + nu * nu * dt * dt) / (dx * dx)
+        b = nu * dt / dx
+        dx, stride, probs = dx, 1, (0.5 * (a - b), 1.0 - a, 0.5 * (a + b))
+    else:
+        raise ValueError(f"unknown lattice method {method!r}; expected one of {LATTICE_METHODS}")
+    if not all(0.0 <= p <= 1.0 for p in probs):
+        # backward induction would amplify instead of average: prices blow up
+        raise ValueError(f"{method} branch probabilities outside [0, 1] (dt={dt:g} too coarse for sigma={sigma:g})")
+    return dx, stride, probs
+
+
+def _min_steps(method, t, r, sigma, q):
+    """Fewest steps whose branch probabilities stay in [0, 1] (drift small next to the spacing)."""
+    if method == "crr":
+        # e^{(r-q) dt} must lie in [1/u, u]: |r - q| dt < sigma sqrt(dt)
+        drift = r - q
+        limit = 1.0
+    else:
+        # trinomial middle branch 1 - a >= 0: nu^2 dt <= 2 sigma^2
+        drift = r - q - 0.5 * sigma * sigma
+        limit = 2.0
+    return int(t * drift * drift / (limit * sigma * sigma)) + 1
+
+
+def _induct(S0, K, call, t, r, sigma, q, n, method, american, smooth):
+    """Backward induction for every strike at once; K/call are 1-D, returns one value per strike."""
+    dt = t / n
+    dx, stride, probs = _tree(method, dt, r, sigma, q)
+    m = len(probs)
+    disc = math.exp(-r * dt)
+    pd = [disc * p for p in probs]
+    sign = np.where(call, 1.0, -1.0)[:, None]
+    Kc = K[:, None]
+
+    # every node price of the tree; level i spans S0 e^{-i dx} .. S0 e^{i dx} with ``stride``
+    S_all = S0 * np.exp(dx * np.arange(-n, n + 1))
+
+    def level(i):
+        return S_all[n - i: n + i + 1: stride]
+
+    last = n - 1 if smooth else n
+    S = level(last)
+    exercise = np.maximum(sign * (S - Kc), 0.0)
+    if smooth:
+        # European value over the final step instead of the payoff (Broadie-Detemple):
+        # removes the odd/even oscillation so Richardson extrapolation is effective.
+        V = bsm_price_batch(S[None, :], Kc, dt, r, sigma, q, call[:, None])
+        if american:
+            np.maximum(V, exercise, out=V)
+    else:
+        V = exercise
+
+    for i in range(last - 1, -1, -1):
+        cnt = i * (m - 1) + 1
+        nxt = pd[0] * V[:, :cnt]
+        for j in range(1, m):
+            nxt += pd[j] * V[:, j:j + cnt]
+        V = nxt
+        if american:
+            np.maximum(V, sign * (level(i) - Kc), out=V)
+    return V[:, 0]
+
+
+def lattice_price_batch(spot, strike, t, r, sigma, q=0.0, kind="C", steps=DEFAULT_STEPS, method="crr",
+                        american=True, richardson=True, tol=None):
+    """Lattice (CRR binomial or trinomial) prices for many strikes sharing one tree.
+
+    ``spot``, ``t``, ``r``, ``sigma`` and ``q`` are scalars; ``strike`` and ``kind`` broadcast
+    together. With ``richardson`` the result is ``2 P(steps) - P(steps / 2)`` on smoothed trees.
+    With ``tol`` the step count doubles from ``steps`` until successive estimates agree
+    to within ``tol`` (capped at ``MAX_STEPS``).
+    """
+    K, call = np.broadcast_arrays(np.asarray(strike, dtype=float), _is_call(kind))
+    shape = K.shape
+    K, call = K.ravel(), call.ravel()
+    S0, t, r, sigma, q = float(spot), float(t), float(r), float(sigma), float(q)
+
+    if t <= 0 or sigma <= 0 or S0 <= 0:
+        return np.maximum(np.where(call, S0 - K, K - S0), 0.0).reshape(shape)
+
+    def estimate(n):
+        if not richardson:
+            return _induct(S0, K, call, t, r, sigma, q, n, method, american, False)
+        fine = _induct(S0, K, call, t, r, sigma, q, n, method, american, True)
+        coarse = _induct(S0, K, call, t, r, sigma, q, max(n // 2, 1), method, american, True)
+        return 2.0 * fine - coarse
+
+    # low vol next to |r - q| needs fine steps; Richardson's coarse tree has half of them
+    needed = _min_steps(method, t, r, sigma, q) * (2 if richardson else 1)
+    if needed > MAX_STEPS:
+        raise ValueError(f"volatility {sigma:g} is too low for a lattice with |r - q| = {abs(r - q):g} "
+                         f"(needs {needed} > {MAX_STEPS} steps)")
+    n = max(int(steps), 2, needed)
+    price = estimate(n)
+    if tol is not None:
+        while n < MAX_STEPS:
+            n *= 2
+            prev, price = price, estimate(n)
+            if np.max(np.abs(price - prev)) <= tol:
+                break
+    return price.reshape(shape)
+
+
+def lattice_price(spot: float, strike: float, t: float, r: float, sigma: float, q: float = 0.0,
+                  kind: str = "C", **kwargs) -> float:
+    """Scalar convenience wrapper around ``lattice_price_batch``."""
+    return float(lattice_price_batch(spot, strike, t, r, sigma, q, kind, **kwargs))
+
+
+def lattice_greeks(spot: float, strike: float, t: float, r: float, sigma: float, q: float = 0.0,
+                   kind: str = "C", **kwargs):
+    """Greeks of ``lattice_price`` by central differences (same keys as ``greeks``)."""
+    if t <= 0 or sigma <= 0 or spot <= 0 or strike <= 0:
+        return {"delta": 0.0, "gamma": 0.0, "vega": 0.0, "theta": 0.0, "rho": 0.0}
+
+    def px(s=spot, tt=t, rr=r, v=sigma):
+        return lattice_price(s, strike, tt, rr, v, q, kind, **kwargs)
+
+    hs = 0.01 * spot
+    hv = min(1e-3, 0.1 * sigma)  # a fixed bump would push low vols towards zero
+    hr = 1e-4
+    ht = min(1.0 / 365.25, 0.5 * t)
+    mid = px()
+    up, dn = px(s=spot + hs), px(s=spot - hs)
+    return {
+        "delta": (up - dn) / (2 * hs),
+        "gamma": (up - 2 * mid + dn) / (hs * hs),
+        "vega": (px(v=sigma + hv) - px(v=sigma - hv)) / (2 * hv),
+        "theta": (px(tt=t - ht) - mid) / ht,
+        "rho": (px(rr=r + hr) - px(rr=r - hr)) / (2 * hr),
+    }
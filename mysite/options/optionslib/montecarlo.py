@@ -0,0 +1,176 @@
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .black_scholes import bsm_price_batch
+
+DAYS_PER_YEAR = 365.25
+DEFAULT_CHUNK = 50_000
+
+
+# ---------------------------------------------------------------------------
+# GBM simulation
+# ---------------------------------------------------------------------------
+
+def _normals(rng, n, shape_tail=(), antithetic=True):
+    if not antithetic:
+        return rng.standard_normal((n,) + shape_tail)
+    half = rng.standard_normal((n // 2,) + shape_tail)
+    return np.concatenate((half, -half))
+
+
+def gbm_terminal(S0, t, mu, sigma, q, n, rng, antithetic=True):
+    """Exact GBM terminal prices; antithetic draws are laid out as [Z, -Z] (n must be even)."""
+    z = _normals(rng, n, antithetic=antithetic)
+    return S0 * np.exp((mu - q - 0.5 * sigma * sigma) * t + sigma * math.sqrt(t) * z)
+
+
+def gbm_paths(S0, t, mu, sigma, q, n, n_steps, rng, antithetic=True):
+    """Exact GBM paths on an even time grid, shape (n, n_steps + 1) including S0."""
+    dt = t / n_steps
+    z = _normals(rng, n, (n_steps,), antithetic=antithetic)
+    log_inc = (mu - q - 0.5 * sigma * sigma) * dt + sigma * math.sqrt(dt) * z
+    paths = np.empty((n, n_steps + 1))
+    paths[:, 0] = S0
+    np.cumsum(log_inc, axis=1, out=paths[:, 1:])
+    np.exp(paths[:, 1:], out=paths[:, 1:])
+    paths[:, 1:] *= S0
+    return paths
+
+
+# ---------------------------------------------------------------------------
+# Chunk scheduling: the seed of chunk i never depends on the worker count
+# ---------------------------------------------------------------------------
+
+def _chunks(n_paths, chunk_size, seed, antithetic):
+    if int(n_paths) != n_paths or n_paths < 1:
+        raise ValueError(f"n_paths must be a positive integer, got {n_paths!r}")
+    if int(chunk_size) != chunk_size or chunk_size < 1:
+        raise ValueError(f"chunk_size must be a positive integer, got {chunk_size!r}")
+    n_paths, chunk_size = int(n_paths), int(chunk_size)
+    if antithetic:
+        # whole antithetic pairs per chunk
+        n_paths += n_paths % 2
+        chunk_size += chunk_size % 2
+    sizes = [chunk_size] * (n_paths // chunk_size)
+    if n_paths % chunk_size:
+        sizes.append(n_paths % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    return list(zip(sizes, seeds))
+
+
+def _run(fn, args_list, workers):
+    if workers and workers > 1 and len(args_list) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(fn, args_list))
+    return [fn(a) for a in args_list]
+
+
+def _gather(arrays, antithetic):
+    """Concatenate chunk results; antithetic chunks [Z_i, -Z_i] become [Z_1.., -Z_1..]."""
+    if not antithetic:
+        return np.concatenate(arrays)
+    return np.concatenate([a[: len(a) // 2] for a in arrays] + [a[len(a) // 2:] for a in arrays])
+
+
+def _cv_estimate(y, x, x_mean, antithetic):
+    """Mean and standard error of y with optional control variate x (known mean x_mean)."""
+    if x is not None:
+        xc = x - x.mean()
+        var_x = float(xc @ xc)
+        beta = float(xc @ (y - y.mean())) / var_x if var_x > 0 else 0.0
+        y = y - beta * (x - x_mean)
+    if antithetic:
+        # pairs are correlated; the independent samples are the pair means
+        h = len(y) // 2
+        y = 0.5 * (y[:h] + y[h:2 * h])
+    return float(y.mean()), float(y.std(ddof=1) / math.sqrt(len(y))) if len(y) > 1 else 0.0
+
+
+# ---------------------------------------------------------------------------
+# Strategy P&L distribution at expiry
+# ---------------------------------------------------------------------------
+
+def _leg_payoff(legs, ST):
+    sign = np.where(legs["is_call"], 1.0, -1.0)
+    w = (legs["side"] * legs["Q"]).astype(float)
+    return np.maximum(sign * (ST[:, None] - legs["K"]), 0.0) @ w
+
+
+def _strategy_chunk(args):
+    (n, seed), legs, premium, S0, t, mu, sigma, q, antithetic = args
+    rng = np.random.default_rng(seed)
+    ST = gbm_terminal(S0, t, mu, sigma, q, n, rng, antithetic)
+    return _leg_payoff(legs, ST) - premium, ST
+
+
+def strategy_pnl_distribution(strat, S0, days, sigma, r=0.0, q=0.0, mu=None, n_paths=200_000,
+                              seed=0, antithetic=True, control_variate=True, alpha=0.95,
+                              chunk_size=DEFAULT_CHUNK, workers=1):
+    """Monte Carlo expiry P&L of an ``OptionStrat`` under GBM with drift ``mu`` (default ``r``).
+
+    Returns expected P&L (+ standard error), VaR/ES at ``alpha`` (as positive losses) and
+    the probability of profit. The control variate is the terminal price, whose mean
+    ``S0 * exp((mu - q) t)`` is known; the strategy's own payoff would cancel every sample
+    and report a zero standard error. Results are identical for any ``workers``.
+    """
+    mu = r if mu is None else mu
+    t = max(float(days), 0.0) / DAYS_PER_YEAR
+    legs = strat.leg_array()
+    premium = strat._net_premium()
+
+    jobs = [(c, legs, premium, S0, t, mu, sigma, q, antithetic)
+            for c in _chunks(n_paths, chunk_size, seed, antithetic)]
+    parts = _run(_strategy_chunk, jobs, workers)
+    pnl = _gather([p[0] for p in parts], antithetic)
+    ST = _gather([p[1] for p in parts], antithetic)
+
+    x_mean = S0 * math.exp((mu - q) * t) if control_variate and len(legs) else None
+    mean, stderr = _cv_estimate(pnl, ST if x_mean is not None else None, x_mean, antithetic)
+
+    cutoff = np.quantile(pnl, 1.0 - alpha)
+    tail = pnl[pnl <= cutoff]
+    return {
+        "expected_pnl": mean,
+        "std_error": stderr,
+        "var": float(-cutoff),
+        "es": float(-tail.mean()) if len(tail) else float(-cutoff),
+        "prob_profit": float(np.mean(pnl > 0)),
+        "alpha": alpha,
+        "n_paths": int(len(pnl)),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Path-dependent pricing
+# ---------------------------------------------------------------------------
+
+def _path_chunk(args):
+    (n, seed), payoff, S0, t, r, sigma, q, n_steps, antithetic, control_strike = args
+    rng = np.random.default_rng(seed)
+    paths = gbm_paths(S0, t, r, sigma, q, n, n_steps, rng, antithetic)
+    y = np.asarray(payoff(paths), dtype=float)
+    x = np.maximum(paths[:, -1] - control_strike, 0.0) if control_strike is not None else None
+    return y, x
+
+
+def price_path_payoff(payoff, S0, t, r, sigma, q=0.0, n_paths=100_000, n_steps=252, seed=0,
+                      antithetic=True, control_strike=None, chunk_size=DEFAULT_CHUNK // 5, workers=1):
+    """Risk-neutral price of ``payoff(paths) -> per-path payoff`` (paths: n x (n_steps + 1)).
+
+    ``control_strike`` uses a European call on the terminal price, priced by ``bsm_price``,
+    as control variate. With ``workers > 1`` the payoff must be a picklable top-level function.
+    """
+    jobs = [(c, payoff, S0, t, r, sigma, q, n_steps, antithetic, control_strike)
+            for c in _chunks(n_paths, chunk_size, seed, antithetic)]
+    parts = _run(_path_chunk, jobs, workers)
+    y = _gather([p[0] for p in parts], antithetic)
+    x = x_mean = None
+    if control_strike is not None:
+        x = _gather([p[1] for p in parts], antithetic)
+        x_mean = float(bsm_price_batch(S0, control_strike, t, r, sigma, q, "C")) * math.exp(r * t)
+
+    mean, stderr = _cv_estimate(y, x, x_mean, antithetic)
+    disc = math.exp(-r * t)
+    return {"price": disc * mean, "std_error": disc * stderr, "n_paths": int(len(y))}
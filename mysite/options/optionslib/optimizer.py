@@ -0,0 +1,289 @@
+import math
+
+import numpy as np
+
+from .black_scholes import _CDF_H, _CDF_LO, _norm_cdf_table, _norm_cdf_vec
+from .strategy import DAYS_PER_YEAR, OptionStrat
+
+# name -> (option type, long strike is the lower one, profits when S_T ends above the breakeven)
+VERTICALS = {
+    "bull_call": ("call", True, True),
+    "bear_call": ("call", False, False),
+    "bull_put": ("put", True, True),
+    "bear_put": ("put", False, False),
+}
+STRUCTURES = tuple(VERTICALS) + ("iron_condor",)
+OBJECTIVES = ("expected_pnl", "pop", "return_on_risk", "max_profit")
+# objectives that add up over the two halves of a condor, so a half plus its best partner
+# bounds every condor built on it
+_ADDITIVE = ("expected_pnl", "max_profit")
+# elements per evaluated condor block (candidates x metrics stay a few tens of MB)
+BLOCK = 1 << 20
+
+
+class LognormalView:
+    """The user's view of S_T: lognormal with drift ``mu`` and vol ``sigma`` over ``days``.
+
+    Quotes are priced under the market's vol; a different ``sigma`` (or a drift) is what
+    makes some spreads better than others in expectation.
+    """
+
+    def __init__(self, S0, days, sigma, mu=0.0):
+        T = max(float(days), 0.0) / DAYS_PER_YEAR
+        self.F = float(S0) * math.exp(mu * T)
+        self.s = max(float(sigma) * math.sqrt(T), 1e-12)
+
+    def _z(self, x):
+        with np.errstate(divide="ignore"):
+            z = (np.log(np.maximum(x, 0.0) / self.F) + 0.5 * self.s * self.s) / self.s
+        return np.clip(z, -40.0, 40.0)  # x = 0 / inf
+
+    def cdf(self, x):
+        """P(S_T < x), vectorized (0 for x <= 0, 1 for x = inf)."""
+        return _norm_cdf_vec(self._z(np.asarray(x, dtype=float)))
+
+    def cdf_fast(self, x):
+        """``cdf`` through the tabulated Phi (|error| < 3e-8), for large candidate blocks."""
+        u = self._z(x)
+        u -= _CDF_LO
+        u /= _CDF_H
+        return _norm_cdf_table(u, np.empty(u.shape, dtype=np.intp))
+
+    def expected_payoffs(self, K):
+        """E[(S_T - K)+] and E[(K - S_T)+] per strike."""
+        d1 = (np.log(self.F / K) + 0.5 * self.s * self.s) / self.s
+        call = self.F * _norm_cdf_vec(d1) - K * _norm_cdf_vec(d1 - self.s)
+        return call, call - self.F + K
+
+
+def _score(objective, expected_pnl, pop, max_profit, risk):
+    if objective == "expected_pnl":
+        return expected_pnl
+    if objective == "pop":
+        return pop
+    if objective == "max_profit":
+        return max_profit
+    return max_profit / risk
+
+
+def _verticals(structure, K, calls, puts, view, max_width, tick):
+    """Every i < j spread of ``structure`` with its metrics, as arrays.
+
+    Spreads whose max profit or risk is under one ``tick`` are dropped up front: they are
+    untradeable (or, past zero, arbitrage from stale quotes) and would otherwise dominate
+    the pop and return-on-risk rankings.
+    """
+    type_, long_low, bullish = VERTICALS[structure]
+    prem = calls if type_ == "call" else puts
+    expected = view.expected_payoffs(K)[0 if type_ == "call" else 1]
+
+    i, j = np.triu_indices(len(K), 1)
+    width = K[j] - K[i]
+    keep = np.isfinite(prem[i]) & np.isfinite(prem[j])
+    if max_width is not None:
+        keep &= width <= max_width
+    i, j, width = i[keep], j[keep], width[keep]
+    lo, hi = (i, j) if long_low else (j, i)  # long, short strike indices
+    cash = prem[hi] - prem[lo]  # > 0: credit received
+    expected_pnl = cash + expected[lo] - expected[hi]
+    credit = (type_ == "call") != bullish
+    keep = (cash >= tick if credit else cash <= -tick) & (np.abs(cash) <= width - tick)
+    i, j, width, cash, expected_pnl = i[keep], j[keep], width[keep], cash[keep], expected_pnl[keep]
+
+    # calls break even above the lower strike, puts below the upper one
+    be = K[i] + np.abs(cash) if type_ == "call" else K[j] - np.abs(cash)
+    below = view.cdf(be)
+    return {
+        "i": i, "j": j, "width": width, "cash": cash,
+        "expected_pnl": expected_pnl,
+        "pop": 1.0 - below if bullish else below,
+        "max_profit": cash if credit else width + cash,
+        "risk": width - cash if credit else -cash,
+        "breakeven": be,
+    }
+
+
+def _top(scores, n):
+    """Indices of the ``n`` largest finite scores, best first."""
+    ok = np.flatnonzero(np.isfinite(scores))
+    if len(ok) > n:
+        ok = ok[np.argpartition(scores[ok], -n)[-n:]]
+    return ok[np.argsort(-scores[ok], kind="stable")]
+
+
+def _vertical_search(structure, K, calls, puts, view, objective, max_loss, top_n, max_width, tick):
+    c = _verticals(structure, K, calls, puts, view, max_width, tick)
+    scores = _score(objective, c["expected_pnl"], c["pop"], c["max_profit"], c["risk"])
+    if max_loss is not None:
+        scores = np.where(c["risk"] <= max_loss, scores, -np.inf)
+    type_, long_low, _ = VERTICALS[structure]
+    out = []
+    for n in _top(scores, top_n):
+        i, j = int(c["i"][n]), int(c["j"][n])
+        lo, hi = (i, j) if long_low else (j, i)
+        prem = calls if type_ == "call" else puts
+        out.append({
+            "structure": structure,
+            "legs": [_leg(type_, 1, K[lo], prem[lo]), _leg(type_, -1, K[hi], prem[hi])],
+            "score": float(scores[n]),
+            "expected_pnl": float(c["expected_pnl"][n]),
+            "pop": float(c["pop"][n]),
+            "max_profit": float(c["max_profit"][n]),
+            "risk": float(c["risk"][n]),
+            "breakevens": [float(c["breakeven"][n])],
+        })
+    return out
+
+
+def _condor_block(p, rows, c, cols, view, objective, max_loss, tick):
+    """Metrics for put halves ``rows`` x call halves ``cols`` (one broadcast per metric)."""
+    cash = p["cash"][rows, None] + c["cash"][None, cols]
+    wp, wc = p["width"][rows, None], c["width"][None, cols]
+    risk = np.maximum(wp, wc) - cash
+    expected_pnl = p["expected_pnl"][rows, None] + c["expected_pnl"][None, cols]
+    score = None
+    if objective == "pop":
+        # profit between the breakevens; a side whose credit covers its width never loses
+        lo = np.where(cash >= wp, 0.0, p["K_short"][rows, None] - cash)
+        hi = np.where(cash >= wc, np.inf, c["K_short"][None, cols] + cash)
+        score = view.cdf_fast(hi) - view.cdf_fast(lo)
+    else:
+        score = _score(objective, expected_pnl, None, cash, risk)
+    ok = risk >= tick
+    if max_loss is not None:
+        ok &= risk <= max_loss
+    return np.where(ok, score, -np.inf)
+
+
+def _condor_search(K, calls, puts, view, objective, max_loss, top_n, max_width, tick):
+    """Branch and bound over (bull put, bear call) pairs with the put's short strike below
+    the call's short strike.
+
+    Put halves are grouped by short strike, so each group pairs with a suffix of the call
+    halves (sorted by short strike). A group is skipped when it cannot beat the current
+    top-N (additive objectives) or when even its best-paying partner leaves the risk over
+    ``max_loss``.
+    """
+    p = _verticals("bull_put", K, calls, puts, view, max_width, tick)
+    c = _verticals("bear_call", K, calls, puts, view, max_width, tick)
+    p["K_short"], c["K_short"] = K[p["j"]], K[c["i"]]
+    order = np.argsort(c["i"], kind="stable")
+    c = {k: v[order] for k, v in c.items()}
+    if not len(p["i"]) or not len(c["i"]):
+        return []
+
+    additive = objective in _ADDITIVE
+    p_key = p["expected_pnl"] if objective == "expected_pnl" else p["cash"]
+    c_key = c["expected_pnl"] if objective == "expected_pnl" else c["cash"]
+    # best partner value / cash over every call-half suffix
+    suffix_best = np.maximum.accumulate(c_key[::-1])[::-1]
+    suffix_cash = np.maximum.accumulate(c["cash"][::-1])[::-1]
+
+    groups = []
+    for j in np.unique(p["j"]):
+        start = int(np.searchsorted(c["i"], j, side="right"))
+        if start == len(c["i"]):
+            continue
+        rows = np.flatnonzero(p["j"] == j)
+        if max_loss is not None:
+            # risk >= wp - (cash_p + best call cash)
+            rows = rows[p["width"][rows] - p["cash"][rows] - suffix_cash[start] <= max_loss]
+        if len(rows):
+            bound = float(p_key[rows].max() + suffix_best[start]) if additive else 0.0
+            groups.append((bound, start, rows))
+    if additive:
+        groups.sort(key=lambda g: -g[0])
+
+    best_score = np.empty(0)
+    best_p = np.empty(0, dtype=np.intp)
+    best_c = np.empty(0, dtype=np.intp)
+    threshold = -np.inf
+    for bound, start, rows in groups:
+        if additive and bound <= threshold:
+            break  # groups are sorted by bound: nothing left can enter the top-N
+        cols = np.arange(start, len(c["i"]))
+        if additive and np.isfinite(threshold):
+            rows = rows[p_key[rows] + suffix_best[start] > threshold]
+            cols = cols[c_key[cols] + p_key[rows].max(initial=-np.inf) > threshold]
+        if max_loss is not None and len(rows):
+            cols = cols[c["width"][cols] - c["cash"][cols] - p["cash"][rows].max() <= max_loss]
+        if not len(rows) or not len(cols):
+            continue
+        step = max(1, BLOCK // len(cols))
+        for r0 in range(0, len(rows), step):
+            r = rows[r0:r0 + step]
+            scores = _condor_block(p, r, c, cols, view, objective, max_loss, tick).ravel()
+            top = _top(scores, top_n)
+            best_score = np.concatenate((best_score, scores[top]))
+            best_p = np.concatenate((best_p, r[top // len(cols)]))
+            best_c = np.concatenate((best_c, cols[top % len(cols)]))
+            keep = _top(best_score, top_n)
+            best_score, best_p, best_c = best_score[keep], best_p[keep], best_c[keep]
+            if len(best_score) == top_n:
+                threshold = best_score[-1]
+
+    out = []
+    for score, a, b in zip(best_score, best_p, best_c):
+        i, j, k, l = (int(p["i"][a]), int(p["j"][a]), int(c["i"][b]), int(c["j"][b]))
+        cash = p["cash"][a] + c["cash"][b]
+        risk = max(p["width"][a], c["width"][b]) - cash
+        lo = 0.0 if cash >= p["width"][a] else K[j] - cash
+        hi = math.inf if cash >= c["width"][b] else K[k] + cash
+        out.append({
+            "structure": "iron_condor",
+            "legs": [_leg("put", 1, K[i], puts[i]), _leg("put", -1, K[j], puts[j]),
+                     _leg("call", -1, K[k], calls[k]), _leg("call", 1, K[l], calls[l])],
+            "score": float(score),
+            "expected_pnl": float(p["expected_pnl"][a] + c["expected_pnl"][b]),
+            "pop": float(view.cdf(hi) - view.cdf(lo)),
+            "max_profit": float(cash),
+            "risk": float(risk),
+            "breakevens": [float(x) for x in (lo, hi) if 0.0 < x < math.inf],
+        })
+    return out
+
+
+def _leg(type_, side, K, price, Q=1):
+    return {"type": type_, "side": side, "K": float(K), "price": float(price), "Q": Q}
+
+
+def optimize_chain(S0, strikes, calls, puts, structure="iron_condor", objective="expected_pnl",
+                   max_loss=None, top_n=10, days=30.0, sigma=0.2, mu=0.0, max_width=None, tick=0.01):
+    """Best ``structure`` spreads on a chain, ranked by ``objective``.
+
+    ``strikes`` with their ``calls``/``puts`` premiums (NaN = no quote). Expiry P&L is
+    taken under ``LognormalView(S0, days, sigma, mu)``; ``max_loss`` caps the worst-case
+    loss per structure and ``max_width`` the distance between a spread's strikes; spreads
+    paying or risking less than ``tick`` are skipped.
+
+    Every candidate's payoff is piecewise linear with kinks at its own strikes, so its
+    metrics come in closed form from the strikes and premiums: candidates are scored as
+    whole arrays and no ``OptionStrat`` is built. Returns up to ``top_n`` dicts (best
+    first) with ``legs`` in ``parse_params`` form, ``score``, ``expected_pnl``, ``pop``,
+    ``max_profit``, ``risk`` (worst-case loss, positive) and ``breakevens``.
+    """
+    if structure not in STRUCTURES:
+        raise ValueError(f"structure must be one of {', '.join(STRUCTURES)}")
+    if objective not in OBJECTIVES:
+        raise ValueError(f"objective must be one of {', '.join(OBJECTIVES)}")
+    K = np.asarray(strikes, dtype=float)
+    calls = np.broadcast_to(np.asarray(calls, dtype=float), K.shape)
+    puts = np.broadcast_to(np.asarray(puts, dtype=float), K.shape)
+    if not np.isfinite(K).all() or np.any(K <= 0) or np.any(np.diff(K) <= 0):
+        raise ValueError("strikes must be finite, positive and strictly increasing")
+    if not all(math.isfinite(v) and v > 0 for v in (S0, sigma, days)):
+        raise ValueError("S0, sigma and days must be finite and > 0")
+    top_n = max(1, int(top_n))
+
+    view = LognormalView(S0, days, sigma, mu)
+    if structure == "iron_condor":
+        return _condor_search(K, calls, puts, view, objective, max_loss, top_n, max_width, tick)
+    return _vertical_search(structure, K, calls, puts, view, objective, max_loss, top_n, max_width, tick)
+
+
+def candidate_strategy(candidate, S0, name=None):
+    """An ``OptionStrat`` for one ``optimize_chain`` result (for plotting / full metrics)."""
+    strat = OptionStrat(name or candidate["structure"].replace("_", " "), S0)
+    for leg in candidate["legs"]:
+        getattr(strat, f"{'long' if leg['side'] == 1 else 'short'}_{leg['type']}")(leg["K"], leg["price"], leg["Q"])
+    return strat
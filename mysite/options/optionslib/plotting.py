@@ -1,15 +1,23 @@
-import matplotlib.pyplot as plt
+import io
+import threading
 
+import numpy as np
 
-def plot_payoff(obj, **params):
-    fig, ax = plt.subplots(figsize=(7, 4))
-    fig.patch.set_facecolor('#002b36')
-    ax.set_facecolor('#002b36')
+from .timing import stage
 
-    ax.plot(obj.STs, obj.payoffs, **params)
-    ax.set_title(f"Payoff Diagram: {obj.name}", color='white')
+# Matplotlib is imported inside the functions that draw with it: importing this module
+# (e.g. for the SVG renderer) must not pay for pyplot in every web worker.
 
-    ax.axhline(0, color='white', linestyle='--', linewidth=1)
+BG = '#002b36'
+MTM_COLORS = ('#2aa198', '#b58900', '#d33682', '#6c71c4', '#cb4b16', '#859900')
+FIGSIZE = (7, 4)
+# smooth mark-to-market curves need ~2 points per pixel of a 700 px wide chart, not the grid
+MTM_POINTS = 1400
+
+
+def _style(fig, ax):
+    fig.patch.set_facecolor(BG)
+    ax.set_facecolor(BG)
     ax.set_xlabel(r'$S_T$', color="white")
     ax.set_ylabel('Profit in $', color="white")
 
@@ -17,4 +25,173 @@ def plot_payoff(obj, **params):
     ax.tick_params(axis='y', colors='white')
     for spine in ax.spines.values():
         spine.set_color('white')
+
+
+def _mtm_curves(obj):
+    """``(S, [(label, values)])``: pre-expiry P&L curves when the strategy has a valuation
+    set (OptionStrat.set_valuation), at ``MTM_POINTS`` sampled spots."""
+    curves = getattr(obj, "mtm_curves", None)
+    if not curves or not getattr(obj, "valuation", None) or not len(obj.STs):
+        return obj.STs, []
+    S = obj.sample(MTM_POINTS)[0] if hasattr(obj, "sample") else obj.STs
+    return S, curves(S)
+
+
+def _draw(ax, obj, **params):
+    ax.plot(obj.STs, obj.payoffs, **params)
+    cx, curves = _mtm_curves(obj)
+    for i, (label, values) in enumerate(curves):
+        ax.plot(cx, values, color=MTM_COLORS[i % len(MTM_COLORS)], linewidth=1.2, label=label)
+    if curves:
+        ax.legend(loc="upper left", fontsize=8, facecolor=BG, edgecolor='white', labelcolor='white')
+    ax.set_title(f"Payoff Diagram: {obj.name}", color='white')
+    ax.axhline(0, color='white', linestyle='--', linewidth=1)
+
+
+def plot_payoff(obj, **params):
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=FIGSIZE)
+    _style(fig, ax)
+    _draw(ax, obj, **params)
     return fig
+
+
+class PayoffCanvas:
+    """One pre-styled Figure + Agg canvas, redrawn in place for every chart.
+
+    Skips pyplot's figure manager and the per-request figure/axes/ticker setup;
+    the output matches ``plot_payoff`` + ``savefig``.
+    """
+
+    def __init__(self):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        self.fig = Figure(figsize=FIGSIZE)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot()
+        _style(self.fig, self.ax)
+
+    def render_png(self, obj, **params):
+        ax = self.ax
+        for line in list(ax.lines):
+            line.remove()
+        if ax.get_legend() is not None:
+            ax.get_legend().remove()
+        ax.set_prop_cycle(None)
+        with stage("plot"):
+            _draw(ax, obj, **params)
+            ax.relim()
+            ax.autoscale_view()
+
+        buf = io.BytesIO()
+        with stage("savefig"):
+            self.fig.savefig(buf, format="png", bbox_inches="tight")
+        return buf.getvalue()
+
+
+_local = threading.local()
+
+
+def render_payoff_png(obj, **params):
+    """PNG bytes for ``obj`` using this thread's reusable canvas."""
+    canvas = getattr(_local, "canvas", None)
+    if canvas is None:
+        canvas = _local.canvas = PayoffCanvas()
+    return canvas.render_png(obj, **params)
+
+
+# ---------------------------------------------------------------------------
+# Matplotlib-free SVG renderer (same dark theme, no figure/text layout engine)
+# ---------------------------------------------------------------------------
+
+SVG_SIZE = (700, 400)
+_SVG_MARGIN = (70, 20, 45, 55)  # left, right, top, bottom (px)
+
+
+def _nice_ticks(lo, hi, max_ticks=8):
+    if not hi > lo:
+        lo, hi = lo - 1.0, hi + 1.0
+    raw = (hi - lo) / max_ticks
+    mag = 10.0 ** np.floor(np.log10(raw))
+    step = next(m * mag for m in (1, 2, 2.5, 5, 10) if m * mag >= raw)
+    first = np.ceil(lo / step) * step
+    ticks = np.arange(first, hi + step * 1e-9, step)
+    return [0.0 if abs(t) < step * 1e-9 else float(t) for t in ticks]
+
+
+def _vertices(x, y):
+    """Drop interior points that lie on a straight segment; payoffs are piecewise linear."""
+    if len(x) <= 2:
+        return x, y
+    slope = np.diff(y) / np.diff(x)
+    bend = np.abs(np.diff(slope)) > 1e-9 * (1.0 + np.abs(slope[1:]))
+    keep = np.concatenate(([True], bend, [True]))
+    return x[keep], y[keep]
+
+
+def render_payoff_svg(obj, color='white', linewidth=2, **_ignored):
+    """SVG bytes for ``obj`` drawn without Matplotlib."""
+    from html import escape
+
+    W, H = SVG_SIZE
+    ml, mr, mt, mb = _SVG_MARGIN
+    pw, ph = W - ml - mr, H - mt - mb
+
+    x = np.asarray(obj.STs, dtype=float)
+    y = np.asarray(obj.payoffs, dtype=float)
+    if x.size == 0:
+        x, y = np.array([0.0, 1.0]), np.zeros(2)
+    xmin, xmax = float(x.min()), float(x.max())
+    cx, curves = _mtm_curves(obj)
+    ymin = min([float(y.min()), 0.0] + [float(c.min()) for _, c in curves])
+    ymax = max([float(y.max()), 0.0] + [float(c.max()) for _, c in curves])
+    # matplotlib's default 5% data margins
+    dx = (xmax - xmin) * 0.05 or 0.5
+    dy = (ymax - ymin) * 0.05 or 0.5
+    xmin, xmax, ymin, ymax = xmin - dx, xmax + dx, ymin - dy, ymax + dy
+
+    def px(v):
+        return ml + (v - xmin) / (xmax - xmin) * pw
+
+    def py(v):
+        return mt + (ymax - v) / (ymax - ymin) * ph
+
+    vx, vy = _vertices(x, y)
+    points = " ".join(f"{a:.2f},{b:.2f}" for a, b in zip(px(vx), py(vy)))
+
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{W}" height="{H}" viewBox="0 0 {W} {H}" '
+        f'font-family="DejaVu Sans, sans-serif" font-size="13" fill="white">',
+        f'<rect width="{W}" height="{H}" fill="{BG}"/>',
+        f'<text x="{ml + pw / 2}" y="{mt - 14}" text-anchor="middle" font-size="16">'
+        f'Payoff Diagram: {escape(obj.name)}</text>',
+    ]
+    for t in _nice_ticks(xmin, xmax):
+        X = px(t)
+        out.append(f'<line x1="{X:.2f}" y1="{mt + ph}" x2="{X:.2f}" y2="{mt + ph + 4}" stroke="white"/>'
+                   f'<text x="{X:.2f}" y="{mt + ph + 18}" text-anchor="middle">{t:g}</text>')
+    for t in _nice_ticks(ymin, ymax):
+        Y = py(t)
+        out.append(f'<line x1="{ml - 4}" y1="{Y:.2f}" x2="{ml}" y2="{Y:.2f}" stroke="white"/>'
+                   f'<text x="{ml - 7}" y="{Y + 4:.2f}" text-anchor="end">{t:g}</text>')
+    out += [
+        f'<svg x="{ml}" y="{mt}" width="{pw}" height="{ph}" viewBox="{ml} {mt} {pw} {ph}" overflow="hidden">',
+        *(f'<polyline points="{" ".join(f"{a:.2f},{b:.2f}" for a, b in zip(px(cx), py(c)))}" fill="none" '
+          f'stroke="{MTM_COLORS[i % len(MTM_COLORS)]}" stroke-width="1.67"/>'
+          for i, (_, c) in enumerate(curves)),
+        f'<polyline points="{points}" fill="none" stroke="{escape(str(color))}" stroke-width="{linewidth * 1.39:.2f}" '
+        f'stroke-linejoin="round"/>',
+        f'<line x1="{ml}" y1="{py(0.0):.2f}" x2="{ml + pw}" y2="{py(0.0):.2f}" stroke="white" '
+        f'stroke-width="1.39" stroke-dasharray="5,2"/>',
+        '</svg>',
+        f'<rect x="{ml}" y="{mt}" width="{pw}" height="{ph}" fill="none" stroke="white" stroke-width="1.1"/>',
+        f'<text x="{ml + pw / 2}" y="{H - 12}" text-anchor="middle" font-style="italic">S<tspan baseline-shift="sub" '
+        f'font-size="10">T</tspan></text>',
+        f'<text transform="translate(16 {mt + ph / 2}) rotate(-90)" text-anchor="middle">Profit in $</text>',
+        *(f'<text x="{ml + 8}" y="{mt + 16 + 14 * i}" font-size="11" fill="{MTM_COLORS[i % len(MTM_COLORS)]}">'
+          f'{escape(label)}</text>' for i, (label, _) in enumerate(curves)),
+        '</svg>',
+    ]
+    return "".join(out).encode()
@@ -0,0 +1,72 @@
+import numpy as np
+
+from .black_scholes import GREEK_DTYPE, bsm_price_batch, bsm_price_greeks_batch, greeks_batch
+
+
+def _leg_inputs(legs, t, sigma):
+    kind = legs["is_call"]
+    if hasattr(sigma, "vol"):
+        sigma = sigma.vol(legs["K"], t)
+    w = (legs["side"] * legs["Q"]).astype(float)
+    t, sigma = np.broadcast_arrays(np.asarray(t, dtype=float), np.asarray(sigma, dtype=float))
+    return kind, w, np.broadcast_to(t, w.shape), np.broadcast_to(sigma, w.shape)
+
+
+def portfolio_value(legs, spot, t, r, sigma, q=0.0):
+    """Black-Scholes value of all legs (side and quantity applied)."""
+    kind, w, t, sigma = _leg_inputs(legs, t, sigma)
+    return float(bsm_price_batch(spot, legs["K"], t, r, sigma, q, kind) @ w)
+
+
+def portfolio_greeks(legs, spot, t, r, sigma, q=0.0):
+    """Aggregated delta/gamma/vega/theta/rho of a LEG_DTYPE array.
+
+    ``t`` and ``sigma`` are scalars or one value per leg.
+    """
+    kind, w, t, sigma = _leg_inputs(legs, t, sigma)
+    g = greeks_batch(spot, legs["K"], t, r, sigma, q, kind)
+    return {name: float(g[name] @ w) for name in GREEK_DTYPE.names}
+
+
+def risk_grid(legs, spot, t, r, sigma, q=0.0, spot_shifts=(-0.2, -0.1, 0.0, 0.1, 0.2),
+              vol_shifts=(-0.1, 0.0, 0.1)):
+    """P&L versus today for every (relative spot shift, absolute vol shift) scenario.
+
+    All scenarios are priced in one broadcast (spots x vols x legs) call; vols are
+    floored at zero, where pricing falls back to intrinsic value.
+    """
+    kind, w, t, sigma = _leg_inputs(legs, t, sigma)
+    ds = np.asarray(spot_shifts, dtype=float)
+    dv = np.asarray(vol_shifts, dtype=float)
+
+    spots = (spot * (1.0 + ds))[:, None, None]
+    vols = np.maximum(sigma[None, None, :] + dv[None, :, None], 0.0)
+    values = bsm_price_batch(spots, legs["K"], t, r, vols, q, kind) @ w
+    base = bsm_price_batch(spot, legs["K"], t, r, sigma, q, kind) @ w
+    return values - base
+
+
+def grouped_risk(legs, starts, spot, t, r, sigma, q=0.0, spot_shifts=(-0.2, -0.1, 0.0, 0.1, 0.2),
+                 vol_shifts=(-0.1, 0.0, 0.1)):
+    """``portfolio_greeks`` + ``risk_grid`` for many portfolios in one pass.
+
+    ``legs`` holds the portfolios back to back, portfolio ``i`` starting at ``starts[i]``
+    (each non-empty); ``spot``, ``t``, ``r``, ``sigma`` and ``q`` are per-leg arrays.
+    Returns greeks as a GREEK_DTYPE array (one row per portfolio) and the P&L grid,
+    shape (portfolios, spot shifts, vol shifts).
+    """
+    kind = legs["is_call"]
+    w = (legs["side"] * legs["Q"]).astype(float)
+    spot, t, r, sigma, q = (np.broadcast_to(np.asarray(a, dtype=float), w.shape) for a in (spot, t, r, sigma, q))
+    starts = np.asarray(starts, dtype=np.intp)
+
+    base, g = bsm_price_greeks_batch(spot, legs["K"], t, r, sigma, q, kind)
+    greeks = np.empty(len(starts), dtype=GREEK_DTYPE)
+    for name in GREEK_DTYPE.names:
+        greeks[name] = np.add.reduceat(g[name] * w, starts)
+
+    ds = np.asarray(spot_shifts, dtype=float)[:, None, None]
+    dv = np.asarray(vol_shifts, dtype=float)[None, :, None]
+    values = bsm_price_batch(spot * (1.0 + ds), legs["K"], t, r, np.maximum(sigma + dv, 0.0), q, kind)
+    pnl = np.add.reduceat((values - base) * w, starts, axis=-1)
+    return greeks, np.moveaxis(pnl, -1, 0)
@@ -1,90 +1,261 @@
 import numpy as np
-from .instruments import Option
-from .plotting import plot_payoff
+from .black_scholes import call_value_sums
+from .instruments import Option, legs_to_array
+from .risk import portfolio_greeks, risk_grid
+
+DAYS_PER_YEAR = 365.25
 
 class OptionStrat:
+    """Expiry payoff of a set of option legs.
+
+    The payoff is piecewise linear with kinks at the strikes, so metrics are computed
+    exactly from the kinks; ``STs``/``payoffs`` are only materialised when read.
+    """
+
     def __init__(self, name, S0, range_kwargs=None):
         self.name = str(name)
         self.S0 = float(S0)
 
         if range_kwargs:
-            start = float(range_kwargs.get('start', 0))
-            stop  = float(range_kwargs.get('stop', 2 * S0))
-            by    = float(range_kwargs.get('by', 1))
-            self.STs = np.arange(start, stop, by)
+            self.start = float(range_kwargs.get('start', 0))
+            self.stop  = float(range_kwargs.get('stop', 2 * S0))
+            self.by    = float(range_kwargs.get('by', 1))
         else:
-            self.STs = np.arange(0, self.S0 * 2, 1)
+            self.start, self.stop, self.by = 0.0, self.S0 * 2, 1.0
+
+        self.instruments = []  # one Option per leg, quantity in Option.Q
+        self.valuation = None  # set_valuation(): pre-expiry curves to draw
+        self._invalidate()
 
-        self.payoffs = np.zeros_like(self.STs, dtype=float)
-        self.instruments = []
+    def _invalidate(self):
+        self._STs = None
+        self._payoffs = None
+        self._pw = None
+        self._arr = None
+        self._metrics = None
+
+    # lazily evaluated grid view (plotting / payoff_json)
+    @property
+    def STs(self):
+        if self._STs is None:
+            self._STs = np.arange(self.start, self.stop, self.by)
+        return self._STs
+
+    def grid_size(self):
+        """Length of ``STs`` without allocating it (same rule as ``np.arange``)."""
+        if self._STs is not None:
+            return len(self._STs)
+        return max(0, int(np.ceil((self.stop - self.start) / self.by)))
+
+    @property
+    def payoffs(self):
+        if self._payoffs is None:
+            self._payoffs = self.payoff_at(self.STs)
+        return self._payoffs
 
     # legs
     def long_call(self, K, C, Q=1):
-        self.payoffs += (np.maximum(self.STs - float(K), 0.0) - float(C)) * int(Q)
         self._add('call', K, C, +1, Q)
 
     def short_call(self, K, C, Q=1):
-        self.payoffs += (-(np.maximum(self.STs - float(K), 0.0)) + float(C)) * int(Q)
         self._add('call', K, C, -1, Q)
 
     def long_put(self, K, P, Q=1):
-        self.payoffs += (np.maximum(float(K) - self.STs, 0.0) - float(P)) * int(Q)
         self._add('put', K, P, +1, Q)
 
     def short_put(self, K, P, Q=1):
-        self.payoffs += (-(np.maximum(float(K) - self.STs, 0.0)) + float(P)) * int(Q)
         self._add('put', K, P, -1, Q)
 
     def _add(self, type_, K, price, side, Q):
-        o = Option(type_, K, price, side)
-        for _ in range(int(Q)):
-            self.instruments.append(o)
+        self.instruments.append(Option(type_, K, price, side, Q))
+        self._invalidate()
+
+    def leg_array(self):
+        """Legs as a structured array (is_call, K, price, side, Q)."""
+        if self._arr is None:
+            self._arr = legs_to_array(self.instruments)
+        return self._arr
+
+    # piecewise-linear model
+    def _piecewise(self):
+        """Knots ``xs`` (ascending), payoff ``ys`` at the knots, and the slopes left of
+        the first / right of the last knot. O(legs log legs)."""
+        if self._pw is not None:
+            return self._pw
+        legs = self.leg_array()
+        if not len(legs):
+            self._pw = (np.zeros(1), np.zeros(1), 0.0, 0.0)
+            return self._pw
+
+        is_call, K, price = legs["is_call"], legs["K"], legs["price"]
+        w = (legs["side"] * legs["Q"]).astype(float)
+
+        x0 = min(0.0, float(K.min()))
+        y0 = float(np.sum(w * np.where(is_call, np.maximum(x0 - K, 0.0), np.maximum(K - x0, 0.0)))
+                   - np.sum(w * price))
+        left = -float(w[~is_call].sum())
+
+        # crossing a strike (call or put) bends the slope by side*Q
+        ks, inv = np.unique(K, return_inverse=True)
+        bend = np.bincount(inv, weights=w)
+        xs = np.concatenate(([x0], ks[ks > x0]))
+        slopes = left + np.cumsum(np.concatenate((bend[ks <= x0].sum(keepdims=True), bend[ks > x0])))
+        ys = y0 + np.concatenate(([0.0], np.cumsum(slopes[:-1] * np.diff(xs))))
+
+        self._pw = (xs, ys, left, float(slopes[-1]))
+        return self._pw
+
+    def payoff_at(self, S):
+        """Exact expiry payoff for any array of underlying prices."""
+        xs, ys, left, right = self._piecewise()
+        S = np.asarray(S, dtype=float)
+        y = np.interp(S, xs, ys)
+        y = y + np.where(S < xs[0], left * (S - xs[0]), 0.0)
+        y = y + np.where(S > xs[-1], right * (S - xs[-1]), 0.0)
+        return y
+
+    def sample(self, max_points=None):
+        """``(x, y)`` for drawing: the full grid, or at most ~``max_points`` of it.
+
+        Reduction keeps the grid endpoints, every strike kink and break-even inside the
+        range exactly (so the line shape is unchanged) and fills the rest of the budget
+        with evenly strided grid points.
+        """
+        n = self.grid_size()
+        if max_points is None or n <= max_points:
+            return self.STs, self.payoffs
+
+        # index the grid arithmetically instead of materialising it
+        lo, hi = self.start, self.start + (n - 1) * self.by
+        xs = self._piecewise()[0]
+        special = np.concatenate(([lo, hi], xs, self._breakevens()))
+        special = special[(special >= lo) & (special <= hi)]
+        budget = max(int(max_points) - len(special), 2)
+        strided = self.start + np.linspace(0, n - 1, budget).astype(np.intp) * self.by
+        x = np.unique(np.concatenate((strided, special)))
+        return x, self.payoff_at(x)
+
+    # mark-to-market before expiry
+    def set_valuation(self, days, sigmas, r=0.0, q=0.0):
+        """Also show theoretical P&L with ``days`` left to expiry for each vol in ``sigmas``
+        (a flat vol, or a ``VolSurface`` to price every strike off the smile)."""
+        self.valuation = {
+            "days": [float(d) for d in days],
+            "sigmas": [v if hasattr(v, "vol") else float(v) for v in sigmas],
+            "r": float(r),
+            "q": float(q),
+        }
+
+    def mtm_values(self, days, sigmas, r=0.0, q=0.0, S=None):
+        """Black-Scholes value of the position minus premium paid, shape (days, sigmas, S).
+
+        Puts are folded into calls by put-call parity and legs are netted per strike,
+        so every (date, vol) pair reuses one grid x strikes block in ``call_value_sums``.
+        """
+        S = self.STs if S is None else np.asarray(S, dtype=float)
+        days = np.atleast_1d(np.asarray(days, dtype=float))
+        sigmas = sigmas if isinstance(sigmas, (list, tuple)) else np.atleast_1d(sigmas)
+        legs = self.leg_array()
+        if not len(legs):
+            return np.zeros((len(days), len(sigmas), len(S)))
+
+        w = (legs["side"] * legs["Q"]).astype(float)
+        put = ~legs["is_call"]
+        ks, inv = np.unique(legs["K"], return_inverse=True)
+        kw = np.bincount(inv, weights=w)
+        put_w = float(w[put].sum())
+        put_wk = float((w * legs["K"])[put].sum())
+        premium = self._net_premium()
+
+        t = np.repeat(np.maximum(days, 0.0) / DAYS_PER_YEAR, len(sigmas))
+        if any(hasattr(v, "vol") for v in sigmas):
+            # smile: one vol per (row, strike)
+            vols = np.array([v.vol(ks, tt) if hasattr(v, "vol") else np.full(len(ks), v)
+                             for tt, v in zip(t, list(sigmas) * len(days))])
+        else:
+            vols = np.tile(np.asarray(sigmas, dtype=float), len(days))
+        calls = call_value_sums(S, ks, kw, t, vols, r, q)
+        # C - P = S e^{-qt} - K e^{-rt}
+        parity = put_wk * np.exp(-r * t)[:, None] - put_w * np.exp(-q * t)[:, None] * S
+        return (calls + parity - premium).reshape(len(days), len(sigmas), len(S))
+
+    def mtm_curves(self, S=None):
+        """``[(label, values)]`` for ``self.valuation``; empty when not set."""
+        v = self.valuation
+        if not v:
+            return []
+        vals = self.mtm_values(v["days"], v["sigmas"], v["r"], v["q"], S)
+        return [
+            (f"T-{d:g}d @ " + ("surface" if hasattr(sigma, "vol") else f"{100 * sigma:g}%"), vals[i, j])
+            for i, d in enumerate(v["days"])
+            for j, sigma in enumerate(v["sigmas"])
+        ]
+
+    # risk today
+    def greeks(self, S, days, sigma, r=0.0, q=0.0):
+        """Aggregated Black-Scholes greeks; ``days``/``sigma`` are scalars or one per leg."""
+        t = np.maximum(np.asarray(days, dtype=float), 0.0) / DAYS_PER_YEAR
+        return portfolio_greeks(self.leg_array(), S, t, r, sigma, q)
+
+    def risk_grid(self, S, days, sigma, r=0.0, q=0.0, **shifts):
+        """Spot x vol scenario P&L, see ``risk.risk_grid``."""
+        t = np.maximum(np.asarray(days, dtype=float), 0.0) / DAYS_PER_YEAR
+        return risk_grid(self.leg_array(), S, t, r, sigma, q, **shifts)
+
+    def _support(self):
+        """Payoff at S=0 and every kink above it, plus the slope beyond the last kink."""
+        xs, _, _, right = self._piecewise()
+        pts = np.concatenate(([0.0], xs[xs > 0]))
+        return pts, self.payoff_at(pts), right
 
     # metrics
     def _net_premium(self):
-        c = 0.0
-        for o in self.instruments:
-            c += o.price if o.side == 1 else -o.price
-        return float(c)
+        legs = self.leg_array()
+        return float(np.sum(legs["side"] * legs["Q"] * legs["price"]))
 
     def _breakevens(self):
-        x, y = self.STs, self.payoffs
-        bes = []
-        for i in range(1, len(x)):
-            if (y[i-1] <= 0 <= y[i]) or (y[i-1] >= 0 >= y[i]):
-                x0, x1 = x[i-1], x[i]
-                y0, y1 = y[i-1], y[i]
-                if y1 == y0:
-                    bes.append(float(x0))
-                else:
-                    xi = x0 + (0 - y0) * (x1 - x0) / (y1 - y0)
-                    bes.append(float(xi))
-        return sorted({round(b, 6) for b in bes})
+        x, y, right = self._support()
+        if not right and not np.any(y):
+            return []
+        bes = list(x[y == 0])
+        y0, y1 = y[:-1], y[1:]
+        cross = y0 * y1 < 0
+        bes += list(x[:-1][cross] - y0[cross] * (x[1:][cross] - x[:-1][cross]) / (y1[cross] - y0[cross]))
+        if right and y[-1] * right < 0:
+            bes.append(x[-1] - y[-1] / right)
+        return sorted({round(float(b), 6) for b in bes})
 
     def metrics(self):
-        return {
-            "max_profit": float(self.payoffs.max()),
-            "max_loss": float(self.payoffs.min()),
-            "net_premium": self._net_premium(),
-            "breakevens": self._breakevens(),
-        }
+        """Max profit / loss over S_T >= 0; ``None`` means unbounded. Memoized until a leg is added."""
+        if self._metrics is None:
+            _, y, right = self._support()
+            self._metrics = {
+                "max_profit": None if right > 0 else float(y.max()),
+                "max_loss": None if right < 0 else float(y.min()),
+                "net_premium": self._net_premium(),
+                "breakevens": self._breakevens(),
+            }
+        return self._metrics
 
     def describe_text(self):
         m = self.metrics()
         bes = ", ".join(f"{b:.2f}" for b in m["breakevens"]) if m["breakevens"] else "—"
+        fmt = lambda v: "unlimited" if v is None else f"{v:.2f}"
         return (
-            f"Max profit: {m['max_profit']:.2f}; "
-            f"Max loss: {m['max_loss']:.2f}; "
+            f"Max profit: {fmt(m['max_profit'])}; "
+            f"Max loss: {fmt(m['max_loss'])}; "
             f"Net premium: {m['net_premium']:.2f}; "
             f"Break-evens: {bes}."
         )
 
     def describe(self):
         m = self.metrics()
-        print(f"Max Profit: ${round(m['max_profit'], 3)}")
-        print(f"Max loss: ${round(m['max_loss'], 3)}")
+        fmt = lambda v: "unlimited" if v is None else f"${round(v, 3)}"
+        print(f"Max Profit: {fmt(m['max_profit'])}")
+        print(f"Max loss: {fmt(m['max_loss'])}")
         print(f"Cost of entering position ${round(m['net_premium'], 3)}")
 
     # keep the same .plot() API by delegating
     def plot(self, **params):
+        from .plotting import plot_payoff
         return plot_payoff(self, **params)
@@ -0,0 +1,47 @@
+import time
+
+# receives (stage name, seconds); None means timing is off and ``stage`` costs one check
+_sink = None
+
+
+def set_sink(sink):
+    """Install (or remove, with None) the callable that receives stage timings."""
+    global _sink
+    _sink = sink
+
+
+class _Null:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _Null()
+
+
+class _Timer:
+    __slots__ = ("name", "sink", "t0")
+
+    def __init__(self, name, sink):
+        self.name = name
+        self.sink = sink
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.sink(self.name, time.perf_counter() - self.t0)
+        return False
+
+
+def stage(name):
+    """``with stage("metrics"): ...`` reports the block's wall time to the sink, if any."""
+    sink = _sink
+    if sink is None:
+        return _NULL
+    return _Timer(name, sink)
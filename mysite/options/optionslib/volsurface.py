@@ -0,0 +1,184 @@
+import struct
+
+import numpy as np
+
+from .black_scholes import bsm_price_batch, greeks_batch
+from .implied_vol import IV_OK, implied_vol_batch
+
+# file layout: header, then float64 expiries, moneyness, total variance and spline coefficients
+_MAGIC = b"OVMEVS01"
+_HEADER = struct.Struct("<8sII3d")  # magic, n_expiries, n_moneyness, spot, r, q
+MIN_TOTAL_VARIANCE = 1e-12
+# quotes whose vega is below this fraction of spot barely move with sigma (deep ITM/OTM)
+MIN_QUOTE_VEGA = 1e-4
+
+
+def _spline_coefs(x, y):
+    """Natural cubic spline through each row of ``y``: (rows, len(x) - 1, 4) coefficients
+    ``c0 + c1 dx + c2 dx^2 + c3 dx^3`` on every interval."""
+    h = np.diff(x)
+    M = np.zeros_like(y)
+    if len(x) > 2:
+        A = np.diag(2.0 * (h[:-1] + h[1:])) + np.diag(h[1:-1], 1) + np.diag(h[1:-1], -1)
+        rhs = 6.0 * np.diff(np.diff(y, axis=1) / h, axis=1)
+        M[:, 1:-1] = np.linalg.solve(A, rhs.T).T
+    coefs = np.empty(y.shape[:1] + h.shape + (4,))
+    coefs[..., 0] = y[:, :-1]
+    coefs[..., 1] = np.diff(y, axis=1) / h - h * (2.0 * M[:, :-1] + M[:, 1:]) / 6.0
+    coefs[..., 2] = 0.5 * M[:, :-1]
+    coefs[..., 3] = np.diff(M, axis=1) / (6.0 * h)
+    return coefs
+
+
+class VolSurface:
+    """Implied vols on an expiry x log-forward-moneyness grid, k = ln(K / F(T)).
+
+    Total variance w = sigma^2 T is splined in k (coefficients precomputed per expiry)
+    and interpolated linearly in T, so ``vol(K, T)`` for any number of contracts is one
+    vectorized call. Beyond the grid the vol is held flat in k and in T.
+    """
+
+    def __init__(self, spot, expiries, moneyness, vols, r=0.0, q=0.0, _coefs=None):
+        self.spot = float(spot)
+        self.r = float(r)
+        self.q = float(q)
+        self.expiries = np.asarray(expiries, dtype=float)
+        self.moneyness = np.asarray(moneyness, dtype=float)
+        vols = np.asarray(vols, dtype=float).reshape(len(self.expiries), len(self.moneyness))
+
+        if self.spot <= 0:
+            raise ValueError("spot must be > 0")
+        if not len(self.expiries) or np.any(self.expiries <= 0) or np.any(np.diff(self.expiries) <= 0):
+            raise ValueError("expiries must be positive and strictly increasing")
+        if len(self.moneyness) < 2 or np.any(np.diff(self.moneyness) <= 0):
+            raise ValueError("moneyness must have >= 2 strictly increasing points")
+        if not np.all(np.isfinite(vols)) or np.any(vols <= 0):
+            raise ValueError("vols must be finite and > 0")
+
+        self.total_variance = vols * vols * self.expiries[:, None]
+        self._coefs = _spline_coefs(self.moneyness, self.total_variance) if _coefs is None else _coefs
+        # c0..c3 as contiguous planes indexed by expiry * intervals + interval
+        self._planes = np.ascontiguousarray(self._coefs.reshape(-1, 4).T)
+
+    @property
+    def vols(self):
+        return np.sqrt(self.total_variance / self.expiries[:, None])
+
+    @classmethod
+    def from_quotes(cls, spot, strikes, ts, vols=None, prices=None, kind="C", r=0.0, q=0.0,
+                    n_moneyness=25):
+        """Grid scattered quotes: pass implied ``vols`` or market ``prices`` (inverted with
+        ``implied_vol_batch``; quotes that do not invert, or whose price hardly depends on
+        sigma, are dropped)."""
+        K, T = np.broadcast_arrays(np.asarray(strikes, dtype=float), np.asarray(ts, dtype=float))
+        shape = K.shape
+        K, T = K.ravel(), T.ravel()
+        if vols is None:
+            if prices is None:
+                raise ValueError("pass either vols or prices")
+            prices = np.broadcast_to(np.asarray(prices, dtype=float), shape).ravel()
+            sigma, status = implied_vol_batch(prices, spot, K, T, r, q, kind)
+            ok = status == IV_OK
+            vega = greeks_batch(spot, K, T, r, np.where(ok, sigma, 1.0), q, kind)["vega"]
+            ok &= vega >= MIN_QUOTE_VEGA * spot
+        else:
+            sigma = np.broadcast_to(np.asarray(vols, dtype=float), shape).ravel()
+            ok = np.isfinite(sigma) & (sigma > 0)
+        ok &= (K > 0) & (T > 0)
+        if not np.any(ok):
+            raise ValueError("no usable quotes")
+
+        K, T, sigma = K[ok], T[ok], sigma[ok]
+        k = np.log(K / spot) - (r - q) * T
+        lo, hi = k.min(), k.max()
+        if hi - lo < 1e-6:
+            lo, hi = lo - 0.05, hi + 0.05
+        grid = np.linspace(lo, hi, n_moneyness)
+
+        expiries = np.unique(T)
+        rows = np.empty((len(expiries), len(grid)))
+        for i, t in enumerate(expiries):
+            at = T == t
+            order = np.argsort(k[at])
+            # flat total variance (= flat vol) outside the quoted strikes
+            rows[i] = np.interp(grid, k[at][order], (sigma[at] ** 2 * t)[order])
+        return cls(spot, expiries, grid, np.sqrt(rows / expiries[:, None]), r, q)
+
+    def total_variance_at(self, k, t):
+        """Interpolated sigma^2 T at log-forward-moneyness ``k`` and expiry ``t`` (broadcast)."""
+        k, t = np.broadcast_arrays(np.asarray(k, dtype=float), np.asarray(t, dtype=float))
+        x, ts = self.moneyness, self.expiries
+        k = np.clip(k, x[0], x[-1])
+        i = np.clip(np.searchsorted(x, k, side="right") - 1, 0, len(x) - 2)
+        dx = k - x[i]
+
+        j0 = np.clip(np.searchsorted(ts, t, side="right") - 1, 0, len(ts) - 1)
+        j1 = np.minimum(j0 + 1, len(ts) - 1)
+
+        def row(j):
+            f = j * (len(x) - 1) + i
+            c0, c1, c2, c3 = (c.take(f) for c in self._planes)
+            return c0 + dx * (c1 + dx * (c2 + dx * c3))
+
+        w0, w1 = row(j0), row(j1)
+        t0, t1 = ts[j0], ts[j1]
+        span = np.where(j1 > j0, t1 - t0, 1.0)
+        lam = np.clip((t - t0) / span, 0.0, 1.0)
+        w = w0 + lam * (w1 - w0)
+        # outside the expiry range keep the vol (not the variance) of the nearest slice
+        scale = np.where(t < ts[0], t / ts[0], np.where(t > ts[-1], t / ts[-1], 1.0))
+        return np.maximum(w * scale, MIN_TOTAL_VARIANCE * np.maximum(t, 0.0))
+
+    def vol(self, strike, t, spot=None):
+        """sigma for each (strike, t); sticky strike unless a different ``spot`` is passed."""
+        spot = self.spot if spot is None else spot
+        t = np.maximum(np.asarray(t, dtype=float), 1e-12)
+        k = np.log(np.asarray(strike, dtype=float) / spot) - (self.r - self.q) * t
+        return np.sqrt(self.total_variance_at(k, t) / t)
+
+    def arbitrage_violations(self, tol=1e-10):
+        """Static-arbitrage checks on the grid nodes.
+
+        ``calendar``: total variance decreasing in T at fixed k.
+        ``butterfly``: call prices not convex (or not decreasing) in strike.
+        Both are lists of ``(expiry, k)``; empty lists mean the grid is clean.
+        """
+        w = self.total_variance
+        out = {"calendar": [], "butterfly": []}
+        for j, i in zip(*np.nonzero(np.diff(w, axis=0) < -tol)):
+            out["calendar"].append((float(self.expiries[j + 1]), float(self.moneyness[i])))
+
+        T = self.expiries[:, None]
+        K = self.spot * np.exp(self.moneyness[None, :] + (self.r - self.q) * T)
+        C = bsm_price_batch(self.spot, K, T, self.r, self.vols, self.q, "C")
+        slope = np.diff(C, axis=1) / np.diff(K, axis=1)
+        scale = tol * np.maximum(1.0, self.spot)
+        bad = np.zeros(slope.shape, dtype=bool)
+        bad[:, 1:] |= np.diff(slope, axis=1) < -scale
+        bad |= (slope > scale) | (slope < -np.exp(-self.r * T) - scale)
+        for j, i in zip(*np.nonzero(bad)):
+            out["butterfly"].append((float(self.expiries[j]), float(self.moneyness[i + 1])))
+        return out
+
+    # persistence: raw little-endian float64, coefficients included so a load is a copy
+    def save(self, path):
+        n_t, n_k = len(self.expiries), len(self.moneyness)
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, n_t, n_k, self.spot, self.r, self.q))
+            for a in (self.expiries, self.moneyness, self.total_variance, self._coefs):
+                f.write(np.ascontiguousarray(a, dtype="<f8").tobytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            buf = f.read()
+        magic, n_t, n_k, spot, r, q = _HEADER.unpack_from(buf)
+        if magic != _MAGIC:
+            raise ValueError(f"{path}: not a vol surface file")
+        data = np.frombuffer(buf, dtype="<f8", offset=_HEADER.size)
+        sizes = (n_t, n_k, n_t * n_k, n_t * (n_k - 1) * 4)
+        if len(data) != sum(sizes):
+            raise ValueError(f"{path}: truncated vol surface file")
+        expiries, moneyness, w, coefs = np.split(data, np.cumsum(sizes)[:-1])
+        vols = np.sqrt(w.reshape(n_t, n_k) / expiries[:, None])
+        return cls(spot, expiries, moneyness, vols, r, q, _coefs=coefs.reshape(n_t, n_k - 1, 4))
@@ -2,6 +2,13 @@ import { qs } from "./utils.js";
 
 let payoffChart = null;
 
+function decodeF32(b64) {
+  const bin = atob(b64);
+  const bytes = new Uint8Array(bin.length);
+  for (let i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+  return Array.from(new Float32Array(bytes.buffer));
+}
+
 export function drawCanvasChart(ctx, data) {
   const ds = {
     label: data.name || "Payoff",
@@ -23,10 +30,21 @@ export function drawCanvasChart(ctx, data) {
     pointRadius: 0, hitRadius: 0, hoverRadius: 0
   };
 
+  const mtmColors = ["#2aa198", "#b58900", "#d33682", "#6c71c4", "#cb4b16", "#859900"];
+  const mtm = (data.mtm || []).map((c, i) => ({
+    label: c.label,
+    data: data.x.map((x, j) => ({ x, y: c.y[j] })),
+    borderColor: mtmColors[i % mtmColors.length],
+    borderWidth: 1.5,
+    fill: false,
+    tension: 0,
+    pointRadius: 0
+  }));
+
   if (payoffChart) payoffChart.destroy();
   payoffChart = new Chart(ctx, {
     type: "line",
-    data: { datasets: [zeroLine, ds] },
+    data: { datasets: [zeroLine, ...mtm, ds] },
     options: {
       responsive: true,
       maintainAspectRatio: false,
@@ -63,11 +81,14 @@ export function drawCanvasChart(ctx, data) {
             size: 18
           }
         },
-        legend: { display: false },
+        legend: {
+          display: mtm.length > 0,
+          labels: { color: "white", filter: (item) => item.text !== "Zero" && item.text !== ds.label }
+        },
         tooltip: {
           callbacks: {
             title: (items) => `S_T: ${items[0].parsed.x}`,
-            label: (ctx) => `Payoff: ${Number(ctx.parsed.y).toFixed(2)}`
+            label: (ctx) => `${ctx.dataset === ds ? "Payoff" : ctx.dataset.label}: ${Number(ctx.parsed.y).toFixed(2)}`
           }
         }
       },
@@ -84,7 +105,10 @@ export function fetchAndDrawChart() {
   const baseUrl = form.dataset.jsonUrl;
   if (!baseUrl) return;
 
-  const url = baseUrl + (location.search ? location.search + "&" : "?") + "cb=" + Date.now();
+  // one point per device pixel is all the canvas can show
+  const maxPoints = Math.ceil((canvas.clientWidth || canvas.width || 800) * (window.devicePixelRatio || 1));
+  const url = baseUrl + (location.search ? location.search + "&" : "?") +
+    "max_points=" + maxPoints + "&encoding=f32&cb=" + Date.now();
 
   fetch(url)
     .then(r => r.json())
@@ -93,6 +117,11 @@ export function fetchAndDrawChart() {
         console.warn("payoff.json errors:", d.errors);
         return;
       }
+      if (d.encoding === "f32") {
+        d.x = decodeF32(d.x);
+        d.y = decodeF32(d.y);
+        (d.mtm || []).forEach(c => { c.y = decodeF32(c.y); });
+      }
       drawCanvasChart(canvas.getContext("2d"), d);
     })
     .catch(err => console.error("payoff.json failed", err));
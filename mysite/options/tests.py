@@ -1,3 +1,683 @@
-from django.test import TestCase
+import csv
+import io
+import itertools
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+from urllib.parse import urlencode
 
-# Create your tests here.
+import numpy as np
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.urls import reverse
+
+from .models import SavedStrategy
+from .optionslib import OptionStrat
+from .optionslib.backtest import backtest, realized_vol
+from .optionslib.black_scholes import (
+    GREEK_NAMES, bsm_price, bsm_price_batch, bsm_price_greeks, bsm_price_greeks_batch, call_value_sums,
+)
+from .optionslib.chainstore import ChainStore, to_day
+from .optionslib.implied_vol import IV_NO_TIME_VALUE, IV_OK, implied_vol, implied_vol_batch
+from .optionslib.lattice import lattice_price
+from .optionslib.montecarlo import strategy_pnl_distribution
+from .optionslib.optimizer import LognormalView, candidate_strategy, optimize_chain
+from .optionslib.plotting import MTM_POINTS, render_payoff_svg
+from .optionslib.strategy import DAYS_PER_YEAR
+from .optionslib.volsurface import VolSurface
+from .viewslib.chains import chain_leg
+from .viewslib.chart_json import payoff_json, payoff_json_async
+from .viewslib.utils import (
+    MAX_GRID_POINTS, MAX_LEGS, MAX_QUANTITY, build_strategy_from_params, get_strategy_result, parse_query,
+)
+
+
+class LatticeTests(SimpleTestCase):
+    def test_matches_black_scholes(self):
+        for method in ("crr", "trinomial"):
+            for kind in ("C", "P"):
+                got = lattice_price(100, 95, 0.5, 0.03, 0.25, 0.01, kind, method=method, american=False)
+                self.assertAlmostEqual(got, bsm_price(100, 95, 0.5, 0.03, 0.25, 0.01, kind), delta=2e-3)
+
+    def test_low_vol_stays_bounded(self):
+        # drift dominating sigma * sqrt(dt) used to push branch probabilities outside [0, 1]
+        for sigma, r in ((0.005, 0.10), (0.003, 0.10), (0.001, 0.05)):
+            for method in ("crr", "trinomial"):
+                ref = bsm_price(100, 100, 1.0, r, sigma, 0.0, "C")
+                # no dividends: the American call is the European one
+                self.assertAlmostEqual(lattice_price(100, 100, 1.0, r, sigma, 0.0, "C", method=method), ref,
+                                       delta=1e-5 * ref)
+                put = lattice_price(100, 100, 1.0, r, sigma, 0.0, "P", method=method)
+                self.assertTrue(0.0 <= put < 0.01, put)
+                self.assertGreaterEqual(lattice_price(100, 100, 1.0, r, sigma, 0.0, "P", method=method,
+                                                      american=False), -1e-12)
+
+    def test_too_low_vol_is_rejected(self):
+        with self.assertRaises(ValueError):
+            lattice_price(100, 100, 1.0, 0.10, 1e-5, 0.0, "C")
+
+
+class PricingJsonTests(SimpleTestCase):
+    def post(self, body):
+        return self.client.post(reverse("pricing_json"), json.dumps(body), content_type="application/json")
+
+    def test_columns_grid(self):
+        res = self.post({"spot": 100, "strikes": [90, 100], "expiries": [30, 60], "kinds": ["call", "put"],
+                         "vol": 20})
+        self.assertEqual(res.status_code, 200)
+        rows = res.json()["results"]
+        self.assertEqual(len(rows), 8)
+        self.assertAlmostEqual(rows[0]["price"], bsm_price(100, 90, 30 / 365.25, 0.0, 0.2, 0.0, "C"), places=6)
+
+    def test_scalars_are_rejected(self):
+        for body in ({"spot": 100, "strikes": 100, "expiries": [30], "vol": 20},
+                     {"spot": 100, "strikes": [100], "expiries": 30, "vol": 20},
+                     {"spot": 100, "strikes": [100], "expiries": [30], "kinds": "call", "vol": 20}):
+            self.assertEqual(self.post(body).status_code, 400, body)
+
+    def test_oversized_grid_is_rejected(self):
+        with mock.patch("options.viewslib.pricing.MAX_CONTRACTS", 10):
+            res = self.post({"spot": 100, "strikes": list(range(1, 5)), "expiries": [30, 60],
+                             "kinds": ["call", "put"], "vol": 20})
+            self.assertEqual(res.json()["errors"], ["too many contracts (16 > 10)"])
+            res = self.post({"spot": 100, "vol": 20, "contracts": [{"strike": 100, "days_to_expiry": 30}] * 11})
+            self.assertEqual(res.json()["errors"], ["too many contracts (11 > 10)"])
+
+    def test_non_finite_and_non_positive_inputs_are_rejected(self):
+        grid = {"spot": 100, "strikes": [90, 100], "expiries": [30], "vol": 20}
+        for bad in ({"spot": "nan"}, {"spot": 0}, {"strikes": [90, "inf"]}, {"strikes": [-90]},
+                    {"vol": "inf"}, {"vols": [[20, float("nan")]]}, {"rate": "inf"}, {"div_yield": "-inf"}):
+            self.assertEqual(self.post(dict(grid, **bad)).status_code, 400, bad)
+        row = {"strike": 100, "days_to_expiry": 30}
+        for bad in ({"spot": "inf"}, {"spot": -1}, {"strike": "nan"}, {"strike": 0}, {"vol": "nan"},
+                    {"rate": "inf"}, {"days_to_expiry": "inf"}):
+            res = self.post({"spot": 100, "vol": 20, "contracts": [dict(row, **bad)]})
+            self.assertEqual(res.status_code, 400, bad)
+
+
+class BacktestTests(SimpleTestCase):
+    @staticmethod
+    def history(years, seed=0):
+        rng = np.random.default_rng(seed)
+        dates = np.arange(np.datetime64("2000-01-03"), np.datetime64("2000-01-03") + int(365.25 * years))
+        dates = dates[np.is_busday(dates)]
+        return dates, 100.0 * np.exp(np.cumsum(rng.normal(0.0003, 0.011, len(dates))))
+
+    @staticmethod
+    def condor():
+        strat = OptionStrat("iron condor", 100.0)
+        strat.long_put(90, 0.5)
+        strat.short_put(95, 1.2)
+        strat.short_call(105, 1.1)
+        strat.long_call(110, 0.4)
+        return strat
+
+    @staticmethod
+    def roll_one(strat, dates, close, days, sigma, r, start):
+        """Equity curve of one start, walking its cycles one after another."""
+        legs = strat.leg_array()
+        weight = (legs["side"] * legs["Q"]).astype(float)
+        day = dates.astype(np.int64)
+        n = len(day)
+        equity = np.full(n, np.nan)
+        base, i = 0.0, start
+        while True:
+            expiry = day[i] + days
+            exit_ = int(np.searchsorted(day, expiry))
+            end = min(exit_, n - 1)
+            j = np.arange(i, end + 1)
+            T = np.maximum(expiry - day[j], 0.0)[:, None] / DAYS_PER_YEAR
+            K = close[i] * legs["K"] / strat.S0
+            value = bsm_price_batch(close[j, None], K, T, r, sigma[j, None], 0.0, legs["is_call"]) @ weight
+            equity[i:end + 1] = base + value - value[0]
+            base = equity[end]
+            if exit_ >= n - 1:
+                return equity
+            i = exit_
+
+    def test_matches_a_cycle_by_cycle_loop(self):
+        dates, close = self.history(2)
+        strat = self.condor()
+        sigma = realized_vol(close)
+        starts = np.arange(0, len(dates), 37)
+        rolled = backtest(strat, dates, close, 30, sigma, 0.02, starts=starts, block=64)
+        want = [self.roll_one(strat, dates, close, 30, sigma, 0.02, s) for s in starts]
+        np.testing.assert_allclose(rolled["equity"], np.array(want), atol=1e-9)
+
+        once = backtest(strat, dates, close, 30, sigma, 0.02, starts=starts, roll=False)
+        self.assertTrue(np.all(once["cycles"] == 1))
+        # the first cycle is the same either way
+        first = ~np.isnan(once["equity"]) & (np.arange(len(dates)) <= starts[:, None] + 15)
+        np.testing.assert_allclose(once["equity"][first], rolled["equity"][first], atol=1e-9)
+
+    def test_realized_vol(self):
+        rng = np.random.default_rng(3)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 300)))
+        vol = realized_vol(close, 21)
+        returns = np.diff(np.log(close))
+        for i in (21, 100, 299):
+            self.assertAlmostEqual(vol[i], returns[i - 21:i].std(ddof=1) * math.sqrt(252), places=10)
+
+
+class BacktestJsonTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        dates = np.arange(np.datetime64("2020-01-01"), np.datetime64("2021-01-01"))
+        close = 100.0 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.01, len(dates))))
+        with open(os.path.join(tmp.name, "TEST.csv"), "w") as f:
+            f.write("date,close\n" + "".join(f"{d},{c:.4f}\n" for d, c in zip(dates, close)))
+        patcher = mock.patch("options.viewslib.backtest_json.PRICE_DIR", tmp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, **params):
+        legs = [{"type": "call", "side": "long", "K": 100, "price": 2}]
+        return self.client.get(reverse("backtest_json"),
+                               {"underlying": "TEST", "S0": 100, "legs": json.dumps(legs), **params})
+
+    def test_runs_without_a_payoff_grid(self):
+        res = self.get(days=30, vol=20)
+        self.assertEqual(res.status_code, 200, res.content)
+        self.assertEqual(res.json()["summary"]["starts"], 366)
+
+    def test_days_are_capped(self):
+        self.assertEqual(self.get(days=100000).status_code, 400)
+        legs = [{"type": "call", "side": "long", "K": 100, "price": 2, "days": 100000}]
+        self.assertEqual(self.get(legs=json.dumps(legs)).status_code, 400)
+        self.assertEqual(self.get(days="nan").status_code, 400)
+
+    def test_run_size_is_capped(self):
+        legs = [{"type": "call", "side": "long", "K": 100 + i, "price": 2} for i in range(13)]
+        self.assertEqual(self.get(legs=json.dumps(legs)).status_code, 400)
+        with mock.patch("options.viewslib.backtest_json.MAX_DATES", 300):
+            self.assertEqual(self.get(days=30, vol=20).status_code, 400)
+        # 366 entry dates x 31 closes held x 1 leg
+        with mock.patch("options.viewslib.backtest_json.MAX_MARKS", 366 * 31 - 1):
+            self.assertEqual(self.get(days=30, vol=20).status_code, 400)
+        with mock.patch("options.viewslib.backtest_json.MAX_MARKS", 366 * 31):
+            self.assertEqual(self.get(days=30, vol=20).status_code, 200)
+
+
+class ScenarioSweepTests(SimpleTestCase):
+    def test_bad_row_is_reported_not_fatal(self):
+        legs = [{"type": "call", "side": "long", "K": 100, "price": 2}]
+        rows = [{"name": "ok", "S0": 100, "legs": legs, "days": 30, "vol": 20},
+                {"name": "bad", "S0": 100, "legs": [dict(legs[0], Q="x")]},
+                {"name": "ok2", "S0": 100, "legs": legs, "days": 30, "vol": 20}]
+        with tempfile.TemporaryDirectory() as tmp:
+            src, out = os.path.join(tmp, "in.jsonl"), os.path.join(tmp, "out.csv")
+            with open(src, "w") as f:
+                f.write("".join(json.dumps(row) + "\n" for row in rows))
+            call_command("scenario_sweep", src, out, workers=1, stderr=io.StringIO())
+            with open(out, newline="") as f:
+                records = list(csv.DictReader(f))
+        self.assertEqual([r["name"] for r in records], ["ok", "bad", "ok2"])
+        self.assertEqual([bool(r["error"]) for r in records], [False, True, False])
+        self.assertEqual(records[0]["delta"], records[2]["delta"])
+
+
+class OptimizerTests(SimpleTestCase):
+    S0, DAYS, SIGMA = 100.0, 45, 0.18
+
+    def chain(self, n=12):
+        K = np.linspace(70, 130, n)
+        iv = 0.22 - 0.15 * np.log(K / self.S0)
+        T = self.DAYS / DAYS_PER_YEAR
+        return K, bsm_price_batch(self.S0, K, T, 0.0, iv, 0.0, "C").round(2), \
+            bsm_price_batch(self.S0, K, T, 0.0, iv, 0.0, "P").round(2)
+
+    def brute_force_condors(self, K, calls, puts, objective, max_loss, tick=0.01):
+        ec, ep = LognormalView(self.S0, self.DAYS, self.SIGMA).expected_payoffs(K)
+        scores = []
+        for i, j, k, l in itertools.combinations(range(len(K)), 4):
+            put_cash, call_cash = puts[j] - puts[i], calls[k] - calls[l]
+            if not (tick <= put_cash <= K[j] - K[i] - tick and tick <= call_cash <= K[l] - K[k] - tick):
+                continue
+            legs = [{"type": "put", "side": 1, "K": K[i], "price": puts[i], "Q": 1},
+                    {"type": "put", "side": -1, "K": K[j], "price": puts[j], "Q": 1},
+                    {"type": "call", "side": -1, "K": K[k], "price": calls[k], "Q": 1},
+                    {"type": "call", "side": 1, "K": K[l], "price": calls[l], "Q": 1}]
+            m = candidate_strategy({"structure": "iron_condor", "legs": legs}, self.S0).metrics()
+            risk = -m["max_loss"]
+            if risk < tick or (max_loss is not None and risk > max_loss):
+                continue
+            expected_pnl = put_cash + call_cash + ep[i] - ep[j] - ec[k] + ec[l]
+            scores.append({"expected_pnl": expected_pnl, "max_profit": m["max_profit"],
+                           "return_on_risk": m["max_profit"] / risk}[objective])
+        return sorted(scores, reverse=True)
+
+    def test_condors_match_brute_force(self):
+        K, calls, puts = self.chain()
+        for objective in ("expected_pnl", "max_profit", "return_on_risk"):
+            for max_loss in (None, 5.0):
+                got = optimize_chain(self.S0, K, calls, puts, "iron_condor", objective, max_loss=max_loss,
+                                     top_n=5, days=self.DAYS, sigma=self.SIGMA)
+                want = self.brute_force_condors(K, calls, puts, objective, max_loss)[:5]
+                self.assertEqual(len(want), 5)
+                np.testing.assert_allclose([r["score"] for r in got], want, rtol=1e-9, atol=1e-12,
+                                           err_msg=f"{objective}, max_loss={max_loss}")
+                for r in got:
+                    m = candidate_strategy(r, self.S0).metrics()
+                    self.assertAlmostEqual(r["max_profit"], m["max_profit"], places=9)
+                    self.assertAlmostEqual(r["risk"], -m["max_loss"], places=9)
+
+    def test_non_finite_inputs_are_rejected(self):
+        K, calls, puts = self.chain()
+        with self.assertRaises(ValueError):
+            optimize_chain(self.S0, np.append(K[:-1], np.inf), calls, puts)
+        body = {"S0": 100, "strikes": K.tolist(), "calls": calls.tolist(), "puts": puts.tolist()}
+        url = reverse("optimize_json")
+        for extra in ({"top_n": 1e999}, {"S0": "inf"}, {"vol": "nan"}, {"days": "inf"}, {"max_loss": "nan"}):
+            res = self.client.post(url, json.dumps({**body, **extra}), content_type="application/json")
+            self.assertEqual(res.status_code, 400, extra)
+
+
+class ChainStoreTests(SimpleTestCase):
+    QUOTES = [  # underlying, date, expiry, strike, type, bid, ask
+        ("SPY", "2024-03-01", "2024-03-15", 510, "C", 3.1, 3.3),
+        ("SPY", "2024-03-01", "2024-03-15", 500, "P", 2.0, 2.2),
+        ("SPY", "2024-03-01", "2024-03-15", 500, "C", 8.0, 8.4),
+        ("QQQ", "2024-03-01", "2024-04-19", 440, "put", 9.5, 9.9),
+        ("SPY", "2024-03-04", "2024-03-15", 500, "call", 7.0, 7.2),
+    ]
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "store")
+        src = os.path.join(tmp.name, "quotes.csv")
+        with open(src, "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["symbol", "quote_date", "expiration", "strike", "type", "bid", "ask"])
+            w.writerows(self.QUOTES)
+        call_command("ingest_chains", src, store=self.path, stdout=io.StringIO(), stderr=io.StringIO())
+        for name, value in (("STORE_PATH", self.path), ("_store", None)):
+            patcher = mock.patch(f"options.viewslib.chains.{name}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_ingest_round_trip(self):
+        store = ChainStore(self.path)
+        self.assertEqual(len(store), len(self.QUOTES))
+        self.assertEqual(sorted(store.symbols), ["QQQ", "SPY"])
+        chain = store.chain("SPY", "2024-03-01", "2024-03-15")
+        self.assertEqual(chain.days, 14)
+        self.assertEqual(chain.strike.tolist(), [500, 500, 510])
+        self.assertEqual(chain.is_call.tolist(), [False, True, True])
+        np.testing.assert_allclose(chain.mid, [2.1, 8.2, 3.2])
+        for i, strike in zip(chain.ids, chain.strike):
+            q = store.quote(i)
+            self.assertEqual((q["underlying"], q["date"].isoformat(), q["strike"]), ("SPY", "2024-03-01", strike))
+        self.assertEqual([d.isoformat() for d in store.dates("SPY")], ["2024-03-01", "2024-03-04"])
+        put = store.quote(int(store.chain("QQQ", "2024-03-01", "2024-04-19").ids[0]))
+        self.assertEqual((put["kind"], put["strike"], put["days"]), ("put", 440.0, 49))
+
+        # a second ingest of the same file adds nothing
+        src = os.path.join(os.path.dirname(self.path), "quotes.csv")
+        call_command("ingest_chains", src, store=self.path, stdout=io.StringIO(), stderr=io.StringIO())
+        self.assertEqual(len(ChainStore(self.path)), len(self.QUOTES))
+
+    def test_pre_1970_dates_are_rejected(self):
+        store = ChainStore(self.path)
+        with self.assertRaises(ValueError):
+            store.append(["SPY"], [to_day("1969-12-31")], [to_day("2024-03-15")],
+                         {"strike": [1.0], "is_call": [True]})
+        self.assertEqual(len(ChainStore(self.path)), len(self.QUOTES))
+
+    def test_leg_ids_must_be_integral(self):
+        chain_id = int(ChainStore(self.path).chain("SPY", "2024-03-01", "2024-03-15").find(510, "call"))
+        for ok in (chain_id, str(chain_id), float(chain_id)):
+            leg = chain_leg({"id": ok, "side": "long"})
+            self.assertEqual((leg["type"], leg["K"], leg["days"]), ("call", 510.0, 14))
+            self.assertAlmostEqual(leg["price"], 3.2)
+        for bad in (chain_id + 0.7, 1e999, float("nan"), "x", True, None, [chain_id]):
+            with self.assertRaisesMessage(ValueError, "'id' must be an integer chain id"):
+                chain_leg({"id": bad})
+
+
+class ParseQueryTests(SimpleTestCase):
+    LEGS = json.dumps([{"type": "call", "side": "long", "K": 100, "price": 2}])
+
+    def test_grid_is_coarsened_to_the_budget(self):
+        params, errors = parse_query({"S0": 100, "start": 0, "stop": 1e6, "by": 0.01, "legs": self.LEGS})
+        self.assertEqual(errors, [])
+        self.assertEqual(params["requested_by"], 0.01)
+        self.assertLessEqual(1e6 / params["by"], MAX_GRID_POINTS)
+
+    def test_non_finite_span_is_rejected(self):
+        _, errors = parse_query({"S0": 100, "start": -1e308, "stop": 1e308, "legs": self.LEGS})
+        self.assertEqual(errors, ["'stop' - 'start' is too large"])
+        for start, stop in (("-inf", 10), (0, "nan")):
+            _, errors = parse_query({"S0": 100, "start": start, "stop": stop, "legs": self.LEGS})
+            self.assertEqual(errors, ["'start', 'stop' and 'by' must be finite numbers"])
+        res = self.client.get(reverse("payoff_json"), {"S0": 100, "start": -1e308, "stop": 1e308, "legs": self.LEGS})
+        self.assertEqual(res.status_code, 400)
+
+    def test_quantity_is_bounded(self):
+        leg = {"type": "call", "side": "long", "K": 100, "price": 2}
+        for Q, want in ((3, 3), ("3", 3), (3.0, 3), (MAX_QUANTITY, MAX_QUANTITY)):
+            params, errors = parse_query({"S0": 100, "start": 50, "stop": 150, "legs": json.dumps([dict(leg, Q=Q)])})
+            self.assertEqual((errors, params["legs"][0]["Q"]), ([], want))
+        for Q in (0, -1, 2.5, "x", True, 10**30, MAX_QUANTITY + 1):
+            _, errors = parse_query({"S0": 100, "start": 50, "stop": 150, "legs": json.dumps([dict(leg, Q=Q)])})
+            self.assertEqual(len(errors), 1, Q)
+        _, errors = parse_query({"S0": 100, "start": 50, "stop": 150, "l1_type": "call", "l1_side": "long",
+                                 "l1_K": 100, "l1_price": 2, "l1_Q": str(10**30)})
+        self.assertEqual(errors, [f"invalid 'l1_Q' (must be an integer from 1 to {MAX_QUANTITY})"])
+        res = self.client.get(reverse("payoff_json"), {"S0": 100, "start": 50, "stop": 150,
+                                                       "legs": json.dumps([dict(leg, Q=10**30)])})
+        self.assertEqual(res.status_code, 400)
+
+
+class RiskJsonTests(SimpleTestCase):
+    def get(self, **params):
+        legs = [{"type": "call", "side": "long", "K": 100, "price": 2},
+                {"type": "call", "side": "short", "K": 110, "price": 0.5}]
+        return self.client.get(reverse("risk_json"),
+                               {"S0": 100, "days": 30, "vol": 20, "legs": json.dumps(legs), **params})
+
+    def test_no_payoff_grid_needed(self):
+        res = self.get()
+        self.assertEqual(res.status_code, 200, res.content)
+        body = res.json()
+        self.assertEqual(len(body["spot_shifts"]), 9)
+        self.assertEqual(np.array(body["pnl"]).shape, (9, 5))
+        self.assertAlmostEqual(body["pnl"][4][2], 0.0, places=9)  # no shift, no P&L
+
+    def test_non_finite_inputs_are_rejected(self):
+        for bad in ({"spot_range": "nan"}, {"vol_range": "inf"}, {"vol": "nan"}, {"days": "inf"}, {"S0": "inf"}):
+            self.assertEqual(self.get(**bad).status_code, 400, bad)
+
+    def test_non_finite_legs_are_rejected(self):
+        for K, price in (("nan", 2), ("inf", 2), (0, 2), (-100, 2), (100, "nan"), (100, "-inf")):
+            legs = json.dumps([{"type": "call", "side": "long", "K": K, "price": price}])
+            self.assertEqual(self.get(legs=legs).status_code, 400, (K, price))
+        _, errors = parse_query({"l1_type": "call", "l1_side": "long", "l1_K": "nan", "l1_price": "2"})
+        self.assertTrue(errors)
+
+
+class SaveStrategyTests(TestCase):
+    def post(self, Q):
+        legs = json.dumps([{"type": "call", "side": "long", "K": 100, "price": 2, "Q": Q}])
+        query = urlencode({"S0": 100, "start": 50, "stop": 150, "by": 1, "legs": legs})
+        return self.client.post(f"{reverse('save_strategy')}?{query}")
+
+    def test_saves_legs(self):
+        res = self.post(3)
+        self.assertEqual(res.status_code, 302)
+        strategy = SavedStrategy.objects.get()
+        self.assertEqual([leg.Q for leg in strategy.legs.all()], [3])
+
+    def test_non_positive_quantity_is_rejected(self):
+        for Q in (0, -1, 10**30):
+            res = self.post(Q)
+            self.assertEqual(res.status_code, 400)
+            self.assertEqual(res.json()["errors"], ["leg #1: 'Q' must be an integer from 1 to 1000000"])
+        self.assertFalse(SavedStrategy.objects.exists())
+
+
+class MonteCarloTests(SimpleTestCase):
+    def test_expected_pnl_is_sampled_with_an_honest_error(self):
+        strat = OptionStrat("call spread", 100)
+        strat.long_call(100, 2.0)
+        strat.short_call(110, 0.5)
+        t = 30 / DAYS_PER_YEAR
+        want = (bsm_price(100, 100, t, 0.02, 0.25, 0, "C") - bsm_price(100, 110, t, 0.02, 0.25, 0, "C")) \
+            * math.exp(0.02 * t) - 1.5
+        z = []
+        for seed in range(20):
+            res = strategy_pnl_distribution(strat, 100, 30, 0.25, 0.02, n_paths=20_000, seed=seed)
+            self.assertGreater(res["std_error"], 1e-3)
+            z.append((res["expected_pnl"] - want) / res["std_error"])
+        self.assertLess(max(map(abs, z)), 4.0)
+        self.assertLess(abs(np.mean(z)), 1.0)
+
+    def test_control_variate_reduces_the_error(self):
+        strat = OptionStrat("deep call", 100)
+        strat.long_call(60, 40.0)
+        with_cv = strategy_pnl_distribution(strat, 100, 30, 0.25, n_paths=20_000)
+        without = strategy_pnl_distribution(strat, 100, 30, 0.25, n_paths=20_000, control_variate=False)
+        self.assertLess(with_cv["std_error"], 0.1 * without["std_error"])
+
+    def test_path_count_is_validated(self):
+        strat = OptionStrat("call", 100)
+        strat.long_call(100, 2.0)
+        for n_paths in (0, -10, 2.5):
+            with self.assertRaisesRegex(ValueError, "n_paths"):
+                strategy_pnl_distribution(strat, 100, 30, 0.25, n_paths=n_paths)
+        with self.assertRaisesRegex(ValueError, "chunk_size"):
+            strategy_pnl_distribution(strat, 100, 30, 0.25, n_paths=100, chunk_size=0)
+        self.assertEqual(strategy_pnl_distribution(strat, 100, 30, 0.25, n_paths=1)["n_paths"], 2)
+
+
+class ImpliedVolTests(SimpleTestCase):
+    def test_round_trip(self):
+        rng = np.random.default_rng(0)
+        n = 20_000
+        K, T, sigma = rng.uniform(30, 250, n), rng.uniform(0.01, 3, n), rng.uniform(0.05, 1.5, n)
+        kind = np.where(rng.random(n) < 0.5, "C", "P")
+        price = bsm_price_batch(100.0, K, T, 0.02, sigma, 0.01, kind)
+        got, status = implied_vol_batch(price, 100.0, K, T, 0.02, 0.01, kind)
+        ok = status == IV_OK
+        self.assertGreater(ok.mean(), 0.95)
+        np.testing.assert_allclose(got[ok], sigma[ok], rtol=1e-4)
+        self.assertTrue(np.all(status[~ok] == IV_NO_TIME_VALUE))
+
+    def test_deep_otm_is_not_the_seed(self):
+        # worth ~1e-18: an absolute price tolerance accepted the 0.05 seed
+        for K, sigma in ((200.0, 0.25), (300.0, 0.4)):
+            price = bsm_price(100, K, 0.1, 0.01, sigma, 0.0, "C")
+            got, status = implied_vol(price, 100, K, 0.1, 0.01, 0.0, "C")
+            self.assertEqual(status, "ok")
+            self.assertAlmostEqual(got, sigma, places=6)
+
+    def test_no_time_value_is_flagged(self):
+        price = bsm_price(100, 300, 0.1, 0.01, 0.4, 0.0, "P")  # time value under float resolution
+        self.assertEqual(implied_vol(price, 100, 300, 0.1, 0.01, 0.0, "P"), (None, "no_time_value"))
+        self.assertEqual(implied_vol(1e-9, 100, 150, 0.1, 0.01, 0.0, "C")[1], "ok")
+
+
+class PayoffJsonTests(SimpleTestCase):
+    def get(self, **params):
+        legs = json.dumps([{"type": "call", "side": "long", "K": 100, "price": 2}])
+        return self.client.get(reverse("payoff_json"), {"S0": 100, "start": 50, "stop": 150, "legs": legs, **params})
+
+    def test_max_points(self):
+        self.assertLessEqual(self.get(max_points=100).json()["n"], 100)
+        self.assertEqual(self.get(max_points=1).status_code, 200)
+        for bad in (0, -5, "inf", "nan", "x"):
+            self.assertEqual(self.get(max_points=bad).status_code, 400, bad)
+
+    def test_mark_to_market_is_sampled_and_bounded(self):
+        mtm = {"mtm_days": "30,10", "mtm_vol": "20,40", "by": 0.0005}  # 200k grid points
+        body = self.get(**mtm).json()
+        self.assertLessEqual(body["n"], MTM_POINTS + 8)
+        self.assertEqual([len(c["y"]) for c in body["mtm"]], [body["n"]] * 4)
+        strikes = [{"type": "call", "side": "long", "K": 60 + i, "price": 1} for i in range(MAX_LEGS)]
+        self.assertEqual(self.get(legs=json.dumps(strikes), **mtm).status_code, 200)
+        # 4 curves x 40 strikes x 200k points
+        self.assertEqual(self.get(legs=json.dumps(strikes), max_points=200_000, **mtm).status_code, 400)
+        self.assertEqual(self.get(legs=json.dumps(strikes * 2)).status_code, 400)
+
+
+class StartupTests(SimpleTestCase):
+    """A web worker boots without Matplotlib/PIL (timings: benchmarks/bench_startup.py)."""
+
+    HEAVY = ("matplotlib", "matplotlib.pyplot", "PIL")
+    BOOT = """
+import json, os, sys
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mysite.settings")
+import django
+django.setup()
+from django.core.handlers.wsgi import WSGIHandler
+from django.urls import resolve
+resolve("/")  # loads the URLconf and every view module
+WSGIHandler()  # loads the middleware chain
+print(json.dumps([m for m in HEAVY if m in sys.modules]))
+"""
+
+    def test_boot_is_lazy(self):
+        root = str(Path(__file__).resolve().parents[1])
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])))
+        proc = subprocess.run([sys.executable, "-c", f"HEAVY = {self.HEAVY!r}\n" + self.BOOT],
+                              capture_output=True, text=True, env=env)
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertEqual(json.loads(proc.stdout.strip().splitlines()[-1]), [],
+                         "heavy modules (Matplotlib/PIL) imported at boot")
+
+
+class BlackScholesTests(SimpleTestCase):
+    def test_batch_matches_scalar(self):
+        rng = np.random.default_rng(1)
+        n = 500
+        S, K = rng.uniform(50, 150, n), rng.uniform(50, 150, n)
+        T = np.where(rng.random(n) < 0.05, 0.0, rng.uniform(0.01, 3, n))  # some expired
+        r, sigma, q = rng.uniform(-0.01, 0.08, n), rng.uniform(0.05, 1.2, n), rng.uniform(0, 0.04, n)
+        kind = np.where(rng.random(n) < 0.5, "C", "P")
+        price, greeks = bsm_price_greeks_batch(S, K, T, r, sigma, q, kind)
+        np.testing.assert_allclose(bsm_price_batch(S, K, T, r, sigma, q, kind), price, rtol=0, atol=0)
+        for i in range(n):
+            p, g = bsm_price_greeks(S[i], K[i], T[i], r[i], sigma[i], q[i], kind[i])
+            self.assertAlmostEqual(price[i], p, delta=1e-10 * max(1.0, p))
+            self.assertAlmostEqual(price[i], bsm_price(S[i], K[i], T[i], r[i], sigma[i], q[i], kind[i]),
+                                   delta=1e-10 * max(1.0, p))
+            for name in GREEK_NAMES:
+                self.assertAlmostEqual(greeks[name][i], g[name], delta=1e-9 * max(1.0, abs(g[name])), msg=name)
+
+    def test_call_delta_keeps_tail_precision(self):
+        # delta of a call is exp(-qT) N(d1): deep out of the money it probes N far into the lower tail
+        K = np.geomspace(100, 1e6, 2_000)
+        _, greeks = bsm_price_greeks_batch(100.0, K, 0.5, 0.03, 0.2, 0.01, "C")
+        d1 = (np.log(100.0 / K) + (0.03 - 0.01 + 0.02) * 0.5) / (0.2 * math.sqrt(0.5))
+        exact = [math.exp(-0.005) * 0.5 * math.erfc(-d / math.sqrt(2)) for d in d1]
+        live = greeks["delta"] > 1e-300  # below that the subnormals carry fewer digits
+        self.assertLess(d1[live].min(), -30)
+        np.testing.assert_allclose(greeks["delta"][live], np.array(exact)[live], rtol=1e-12)
+
+    def test_call_value_sums(self):
+        S = np.linspace(50, 150, 101)
+        ks, w = np.array([90.0, 100.0, 110.0]), np.array([1.0, -2.0, 1.0])
+        ts, sigmas = np.array([0.1, 0.5, 0.0]), np.array([0.2, 0.3, 0.25])
+        got = call_value_sums(S, ks, w, ts, sigmas, 0.03, 0.01)
+        for row, (t, sigma) in enumerate(zip(ts, sigmas)):
+            want = sum(wk * bsm_price_batch(S, k, t, 0.03, sigma, 0.01, "C") for k, wk in zip(ks, w))
+            # tabulated N(.): 3e-8 per lookup times spot and the leg weights
+            np.testing.assert_allclose(got[row], want, atol=3e-8 * 150 * 2 * np.abs(w).sum())
+
+
+class StrategyTests(SimpleTestCase):
+    def strat(self):
+        s = OptionStrat("broken fly", 100, {"start": 0, "stop": 200, "by": 0.5})
+        s.long_put(80, 1.0, 2)
+        s.short_put(95, 3.0)
+        s.short_call(105, 2.5, 3)
+        s.long_call(120, 0.5, 2)
+        return s
+
+    @staticmethod
+    def dense_payoff(strat, S):
+        legs = strat.leg_array()
+        sign = np.where(legs["is_call"], 1.0, -1.0)
+        value = np.maximum(sign * (S[:, None] - legs["K"]), 0.0) - legs["price"]
+        return value @ (legs["side"] * legs["Q"]).astype(float)
+
+    def test_payoff_matches_the_legs(self):
+        strat = self.strat()
+        S = np.linspace(0, 400, 40_001)
+        np.testing.assert_allclose(strat.payoff_at(S), self.dense_payoff(strat, S), atol=1e-9)
+        np.testing.assert_allclose(strat.payoffs, self.dense_payoff(strat, strat.STs), atol=1e-9)
+
+    def test_metrics_match_a_dense_grid(self):
+        strat = self.strat()
+        S = np.linspace(0, 400, 400_001)
+        y = self.dense_payoff(strat, S)
+        m = strat.metrics()
+        self.assertIsNone(m["max_loss"])  # net short one call above 120
+        self.assertAlmostEqual(m["max_profit"], y.max(), places=9)
+        self.assertEqual(len(m["breakevens"]), int(np.sum(np.diff(y > 0) != 0)))
+        for b in m["breakevens"]:
+            self.assertAlmostEqual(float(strat.payoff_at(b)), 0.0, places=5)
+
+    def test_sample_keeps_the_kinks(self):
+        strat = self.strat()
+        x, y = strat.sample(50)
+        self.assertLess(len(x), 70)
+        self.assertTrue(set(strat.leg_array()["K"]) <= set(x.tolist()))
+        np.testing.assert_allclose(np.interp(strat.STs, x, y), strat.payoffs, atol=1e-9)
+
+    def test_mark_to_market_matches_leg_prices(self):
+        strat = self.strat()
+        S = np.linspace(50, 150, 51)
+        values = strat.mtm_values([30, 0], [0.2, 0.35], 0.03, 0.01, S)
+        legs = strat.leg_array()
+        for i, days in enumerate((30, 0)):
+            for j, sigma in enumerate((0.2, 0.35)):
+                want = sum(side * Q * (bsm_price_batch(S, K, days / DAYS_PER_YEAR, 0.03, sigma, 0.01,
+                                                       "C" if call else "P") - price)
+                           for side, Q, K, price, call in zip(legs["side"], legs["Q"], legs["K"], legs["price"],
+                                                              legs["is_call"]))
+                # mtm curves go through a tabulated normal CDF, good to ~3e-8 per N(.)
+                np.testing.assert_allclose(values[i, j], want, atol=1e-5)
+        np.testing.assert_allclose(values[1, 0], strat.payoff_at(S), atol=1e-9)
+
+
+class PayoffPngTests(SimpleTestCase):
+    QUERY = {"S0": 100, "start": 50, "stop": 150, "by": 0.5,
+             "legs": json.dumps([{"type": "call", "side": "long", "K": 100, "price": 2},
+                                 {"type": "call", "side": "short", "K": 110, "price": 0.5}])}
+
+    def test_png_is_cached_and_revalidated(self):
+        res = self.client.get(reverse("option_payoff_png"), self.QUERY)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res["Content-Type"], "image/png")
+        self.assertTrue(res.content.startswith(b"\x89PNG"))
+        again = self.client.get(reverse("option_payoff_png"), self.QUERY, HTTP_IF_NONE_MATCH=res["ETag"])
+        self.assertEqual(again.status_code, 304)
+        with mock.patch("options.viewslib.chart._render_png") as render:
+            self.assertEqual(self.client.get(reverse("option_payoff_png"), self.QUERY).content, res.content)
+        render.assert_not_called()
+
+    def test_strategy_is_built_once_for_reordered_legs(self):
+        params, _ = parse_query(self.QUERY)
+        swapped, _ = parse_query(dict(self.QUERY, legs=json.dumps(json.loads(self.QUERY["legs"])[::-1])))
+        self.assertIs(get_strategy_result(params), get_strategy_result(swapped))
+
+    def test_svg_renderer(self):
+        params, _ = parse_query(self.QUERY)
+        svg = render_payoff_svg(build_strategy_from_params(params))
+        self.assertTrue(svg.startswith(b"<svg"))
+
+    def test_async_view_matches_sync(self):
+        request = RequestFactory().get(reverse("payoff_json"), self.QUERY)
+        sync = json.loads(payoff_json(request).content)
+        self.assertEqual(json.loads(async_to_sync(payoff_json_async)(request).content), sync)
+
+
+class VolSurfaceTests(SimpleTestCase):
+    def test_nodes_and_persistence(self):
+        expiries, k = np.array([0.1, 0.5, 1.0]), np.linspace(-0.5, 0.5, 11)
+        vols = 0.2 + 0.1 * k[None, :] ** 2 + 0.02 * expiries[:, None]
+        surface = VolSurface(100.0, expiries, k, vols, r=0.02)
+        K = 100.0 * np.exp(k[None, :] + 0.02 * expiries[:, None])
+        np.testing.assert_allclose(surface.vol(K, expiries[:, None]), vols, rtol=1e-12)
+        self.assertEqual(surface.arbitrage_violations(), {"calendar": [], "butterfly": []})
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "surface.bin")
+            surface.save(path)
+            loaded = VolSurface.load(path)
+        probe_K, probe_t = np.linspace(70, 140, 30), np.linspace(0.05, 1.5, 30)
+        np.testing.assert_array_equal(loaded.vol(probe_K, probe_t), surface.vol(probe_K, probe_t))
+
+    def test_from_prices(self):
+        K = np.linspace(80, 120, 9)
+        T = np.array([0.25, 0.5])[:, None]
+        prices = bsm_price_batch(100.0, K, T, 0.0, 0.25, 0.0, "C")
+        surface = VolSurface.from_quotes(100.0, K, T, prices=prices)
+        np.testing.assert_allclose(surface.vol(K, T), 0.25, rtol=1e-6)
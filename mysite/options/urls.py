@@ -1,10 +1,24 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# under ASGI, serve the CPU-heavy pages from the async variants (see OPTIONS_OFFLOAD)
+_ASYNC = getattr(settings, "OPTIONS_OFFLOAD", {}).get("ASYNC_VIEWS", False)
+
 urlpatterns = [
     path("", views.home, name="home"),                  
-    path("payoff.png", views.option_payoff_png, name="option_payoff_png"),
+    path("payoff.png", views.option_payoff_png_async if _ASYNC else views.option_payoff_png,
+         name="option_payoff_png"),
     path("dashboard/", views.dashboard, name="dashboard"),  
-    path("pricing/", views.pricing, name='pricing'),
-     path("payoff.json", views.payoff_json, name="payoff_json")
+    path("pricing/", views.pricing_async if _ASYNC else views.pricing, name='pricing'),
+    path("pricing.json", views.pricing_json, name="pricing_json"),
+     path("payoff.json", views.payoff_json_async if _ASYNC else views.payoff_json, name="payoff_json"),
+    path("risk.json", views.risk_json, name="risk_json"),
+    path("optimize.json", views.optimize_json, name="optimize_json"),
+    path("chain.json", views.chain_json, name="chain_json"),
+    path("backtest.json", views.backtest_json, name="backtest_json"),
+    path("saved/", views.save_strategy, name="save_strategy"),
+    path("saved/<int:pk>/", views.saved_strategy, name="saved_strategy"),
+    path("saved.json", views.saved_json, name="saved_json"),
+    path("metrics", views.metrics, name="metrics"),
 ]
\ No newline at end of file
@@ -1,3 +1,9 @@
-from .viewslib import home, dashboard, option_payoff_png, pricing, payoff_json
+from .viewslib import (home, dashboard, option_payoff_png, pricing, pricing_json, payoff_json, risk_json,
+                       save_strategy, saved_strategy, saved_json, metrics,
+                       option_payoff_png_async, payoff_json_async, pricing_async, optimize_json, chain_json,
+                       backtest_json)
 
-__all__ = ["home", "dashboard", "option_payoff_png", "pricing", "payoff_json"]
\ No newline at end of file
+__all__ = ["home", "dashboard", "option_payoff_png", "pricing", "pricing_json", "payoff_json", "risk_json",
+           "save_strategy", "saved_strategy", "saved_json", "metrics",
+           "option_payoff_png_async", "payoff_json_async", "pricing_async", "optimize_json", "chain_json",
+           "backtest_json"]
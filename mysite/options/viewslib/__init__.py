@@ -1,7 +1,16 @@
 from .home import home
 from .dashboard import dashboard
-from .chart import option_payoff_png
-from .pricing import pricing
-from .chart_json import payoff_json 
+from .chart import option_payoff_png, option_payoff_png_async
+from .pricing import pricing, pricing_async, pricing_json
+from .chart_json import payoff_json, payoff_json_async
+from .risk_json import risk_json
+from .saved import save_strategy, saved_strategy, saved_json
+from .metrics import metrics
+from .optimize_json import optimize_json
+from .chains import chain_json
+from .backtest_json import backtest_json
 
-__all__ = ["home", "dashboard", "option_payoff_png", 'pricing', "payoff_json"]
+__all__ = ["home", "dashboard", "option_payoff_png", 'pricing', "pricing_json", "payoff_json", "risk_json",
+           "save_strategy", "saved_strategy", "saved_json", "metrics",
+           "option_payoff_png_async", "payoff_json_async", "pricing_async", "optimize_json", "chain_json",
+           "backtest_json"]
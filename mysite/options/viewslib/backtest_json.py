@@ -0,0 +1,190 @@
+import hashlib
+import json
+import math
+import os
+import re
+
+import numpy as np
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+
+from ..optionslib.backtest import backtest, cycle_marks, load_prices, realized_vol
+from ..optionslib.timing import stage
+from .cache import LRUCache
+from .pricing import _parse_percent_maybe
+from .utils import build_strategy_from_params, parse_params
+
+_conf = getattr(settings, "OPTIONS_BACKTEST", {})
+PRICE_DIR = _conf.get("PRICE_DIR")
+# starts x dates equity matrix; a finer 'step' is coarsened to stay within this
+MAX_STARTS = int(_conf.get("MAX_STARTS", 500))
+MAX_CURVES = 50
+# longest holding period; the shared cycle P&L matrix is dates x trading days held
+MAX_DAYS = float(_conf.get("MAX_DAYS", 3 * 366))
+MAX_LEGS = int(_conf.get("MAX_LEGS", 12))
+# closes in the requested range, and leg marks priced (dates x closes held x legs)
+MAX_DATES = int(_conf.get("MAX_DATES", 7500))
+MAX_MARKS = int(_conf.get("MAX_MARKS", 10_000_000))
+_SYMBOL = re.compile(r"^[A-Z0-9][A-Z0-9._-]{0,19}$")
+
+# encoded responses per (strategy, price file version, date range, run settings)
+_cache_conf = _conf.get("CACHE", {})
+backtest_cache = LRUCache(
+    _cache_conf.get("MAX_ENTRIES", 64),
+    _cache_conf.get("MAX_BYTES", 32 * 1024 * 1024),
+    ttl=_cache_conf.get("TTL", 3600),
+)
+
+
+def _vol_source(raw, errors):
+    """'realized:21' (trailing window, the default), 'column:vix' (a price-file column,
+    percent or decimal) or a flat vol such as 20 / 0.2."""
+    raw = (raw or "realized:21").strip().lower()
+    kind, _, arg = raw.partition(":")
+    if kind == "realized":
+        try:
+            window = int(arg or 21)
+        except ValueError:
+            window = 0
+        if not 2 <= window <= 252:
+            errors.append("'vol' realized window must be 2..252 days")
+        return ("realized", window)
+    if kind == "column":
+        if not re.match(r"^[a-z0-9_ ]+$", arg):
+            errors.append("'vol' column name must be given, e.g. column:vix")
+        return ("column", arg)
+    sigma = _parse_percent_maybe(raw)
+    if sigma is None or sigma <= 0:
+        errors.append("invalid 'vol' (a positive number, realized:<days> or column:<name>)")
+    return ("flat", sigma)
+
+
+def _sigma(source, close, extra):
+    kind, arg = source
+    if kind == "realized":
+        return realized_vol(close, arg)
+    if kind == "column":
+        v = extra[arg]
+        # index levels like VIX are quoted in percent
+        return np.where(v > 3.0, v / 100.0, v)
+    return arg
+
+
+def _stats(values):
+    values = values[np.isfinite(values)]
+    if not values.size:
+        return None
+    return {"mean": float(values.mean()), "median": float(np.median(values)),
+            "min": float(values.min()), "max": float(values.max())}
+
+
+def _json_row(values):
+    return [None if math.isnan(v) else round(v, 6) for v in values.tolist()]
+
+
+def backtest_json(request):
+    """Roll the strategy in the query (payoff.json params, legs may carry ``days``) over
+    ``underlying``'s daily closes in ``OPTIONS_BACKTEST['PRICE_DIR']``.
+
+    Also: ``from``/``to`` (YYYY-MM-DD), ``days`` (default 30), ``vol`` (see
+    ``_vol_source``), ``rate``, ``div_yield``, ``step`` (trading days between start
+    dates), ``roll`` (0 for one cycle per start) and ``curves`` (equity curves returned).
+    """
+    params, errors = parse_params(request, grid=False)
+    q = request.GET
+    symbol = (q.get("underlying") or "").strip().upper()
+    if not PRICE_DIR:
+        return JsonResponse({"errors": ["backtests are not configured (OPTIONS_BACKTEST['PRICE_DIR'])"]},
+                            status=404)
+    if not _SYMBOL.match(symbol):
+        errors.append("'underlying' must be a ticker symbol")
+    path = os.path.join(PRICE_DIR, f"{symbol}.csv")
+    date_from, date_to = (q.get("from") or "").strip(), (q.get("to") or "").strip()
+    for name, value in (("from", date_from), ("to", date_to)):
+        if value and not re.match(r"^\d{4}-\d{2}-\d{2}$", value):
+            errors.append(f"'{name}' must be YYYY-MM-DD")
+    source = _vol_source(q.get("vol"), errors)
+    try:
+        days = float(q.get("days") or 30)
+        step = max(1, int(q.get("step") or 1))
+        n_curves = min(MAX_CURVES, max(0, int(q.get("curves") or 5)))
+    except ValueError:
+        errors.append("'days', 'step' and 'curves' must be numbers")
+        days, step, n_curves = 30.0, 1, 5
+    if len(params["legs"]) > MAX_LEGS:
+        errors.append(f"at most {MAX_LEGS} legs can be backtested")
+    leg_days = [leg.get("days", days) for leg in params["legs"]]
+    if not all(0 < d <= MAX_DAYS for d in [days, *leg_days]):
+        errors.append(f"'days' must be > 0 and at most {MAX_DAYS:g}")
+    r = _parse_percent_maybe(q.get("rate")) or 0.0
+    div = _parse_percent_maybe(q.get("div_yield")) or 0.0
+    roll = q.get("roll", "1") not in ("0", "false", "no")
+    if errors:
+        return JsonResponse({"errors": errors}, status=400)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return JsonResponse({"errors": [f"no price history for {symbol}"]}, status=404)
+
+    # the file's mtime/size stand in for its contents: a refreshed history is a new key
+    key = hashlib.sha1(json.dumps([
+        params["S0"], sorted(json.dumps(leg, sort_keys=True) for leg in params["legs"]), days,
+        symbol, st.st_mtime_ns, st.st_size, date_from, date_to, source, r, div, step, roll, n_curves,
+    ]).encode()).hexdigest()
+    body = backtest_cache.get(key)
+    if body is None:
+        try:
+            body = _run(params, path, symbol, date_from, date_to, source, leg_days, r, div, step, roll, n_curves)
+        except ValueError as ex:
+            return JsonResponse({"errors": [str(ex)]}, status=400)
+        backtest_cache.set(key, body)
+    return HttpResponse(body, content_type="application/json")
+
+
+def _run(params, path, symbol, date_from, date_to, source, leg_days, r, div, step, roll, n_curves):
+    # a realized vol window warms up on the closes before 'from'
+    warm_up = source[0] == "realized"
+    with stage("prices"):
+        dates, close, extra = load_prices(path, None if warm_up else date_from or None, date_to or None,
+                                          columns=(source[1],) if source[0] == "column" else ())
+    sigma = _sigma(source, close, extra)
+    if warm_up and date_from:
+        keep = dates >= np.datetime64(date_from)
+        dates, close, sigma = dates[keep], close[keep], sigma[keep]
+    if len(dates) < 2:
+        raise ValueError(f"fewer than two closes for {symbol} in the requested range")
+    if len(dates) > MAX_DATES:
+        raise ValueError(f"{len(dates)} closes for {symbol} in the requested range; at most {MAX_DATES}"
+                         " (narrow 'from'/'to')")
+    marks = cycle_marks(dates, leg_days)
+    if marks > MAX_MARKS:
+        raise ValueError(f"backtest too large ({marks} leg marks, at most {MAX_MARKS}): narrow 'from'/'to'"
+                         " or shorten 'days'")
+    requested_step = None
+    if -(-len(dates) // step) > MAX_STARTS:
+        requested_step, step = step, -(-len(dates) // MAX_STARTS)
+    starts = np.arange(0, len(dates), step)
+
+    with stage("backtest"):
+        strat = build_strategy_from_params(params)
+        res = backtest(strat, dates, close, None, sigma, r, div, starts=starts, roll=roll, leg_days=leg_days)
+
+    picks = np.unique(np.linspace(0, len(starts) - 1, n_curves).round().astype(int)) if n_curves else []
+    cycle_pnl = res["cycle_pnl"][np.isfinite(res["cycle_pnl"])]
+    with stage("serialize"):
+        return json.dumps({
+            "underlying": symbol, "from": str(dates[0]), "to": str(dates[-1]),
+            "step": step, "requested_step": requested_step, "roll": roll,
+            "dates": [str(d) for d in dates],
+            "summary": {
+                "starts": len(starts),
+                "final": _stats(res["final"]),
+                "max_drawdown": _stats(res["max_drawdown"]),
+                "cycle_pnl": dict(_stats(cycle_pnl) or {}, count=int(cycle_pnl.size),
+                                  win_rate=float((cycle_pnl > 0).mean()) if cycle_pnl.size else None),
+            },
+            "starts": [{"date": str(dates[s]), "final": float(f), "max_drawdown": float(dd), "cycles": int(c)}
+                       for s, f, dd, c in zip(starts, res["final"], res["max_drawdown"], res["cycles"])],
+            "curves": [{"start": str(dates[starts[i]]), "equity": _json_row(res["equity"][i]),
+                        "drawdown": _json_row(res["drawdown"][i])} for i in picks],
+        }).encode()
@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class LRUCache:
+    """Small thread-safe LRU bounded by entry count and total payload bytes.
+
+    ``sizeof`` measures an entry (``len`` suits bytes); ``ttl`` (seconds) expires
+    entries on read.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024, ttl=None, sizeof=len):
+        self.max_entries = int(max_entries)
+        self.max_bytes = int(max_bytes)
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self._data = OrderedDict()  # key -> (value, size, expires_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[2] is not None and entry[2] < time.monotonic():
+                del self._data[key]
+                self._bytes -= entry[1]
+                return None
+            self._data.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value):
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[key] = (value, size, expires)
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self._bytes -= evicted[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TieredCache:
+    """In-process LRU in front of an optional Django cache alias (shared between workers)."""
+
+    def __init__(self, local, alias=None, prefix="", timeout=None):
+        self.local = local
+        self.alias = alias
+        self.prefix = prefix
+        self.timeout = timeout
+
+    def _backend(self):
+        if not self.alias:
+            return None
+        from django.core.cache import caches
+        return caches[self.alias]
+
+    def get(self, key):
+        value = self.local.get(key)
+        if value is None:
+            backend = self._backend()
+            if backend is not None:
+                value = backend.get(self.prefix + key)
+                if value is not None:
+                    self.local.set(key, value)
+        return value
+
+    def set(self, key, value):
+        self.local.set(key, value)
+        backend = self._backend()
+        if backend is not None:
+            backend.set(self.prefix + key, value, self.timeout)
+
+
+_conf = getattr(settings, "OPTIONS_PAYOFF_PNG_CACHE", {})
+payoff_png_cache = TieredCache(
+    LRUCache(_conf.get("MAX_ENTRIES", 256), _conf.get("MAX_BYTES", 64 * 1024 * 1024)),
+    alias=_conf.get("BACKEND_ALIAS"),
+    prefix="payoff.png:",
+    timeout=_conf.get("TIMEOUT", 3600),
+)
+
+
+def _result_size(result):
+    # grid arrays (STs + payoffs, float64) dominate; count them even before they're read
+    return 16 * result.strat.grid_size() + 1024
+
+
+_conf = getattr(settings, "OPTIONS_STRATEGY_CACHE", {})
+strategy_cache = LRUCache(
+    _conf.get("MAX_ENTRIES", 128),
+    _conf.get("MAX_BYTES", 64 * 1024 * 1024),
+    ttl=_conf.get("TTL", 300),
+    sizeof=_result_size,
+)
@@ -0,0 +1,120 @@
+import datetime
+import math
+import os
+import threading
+
+import numpy as np
+from django.conf import settings
+from django.http import JsonResponse
+
+from ..optionslib.chainstore import ChainStore
+
+_conf = getattr(settings, "OPTIONS_CHAIN_STORE", {})
+STORE_PATH = _conf.get("PATH")
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """The configured ChainStore, reopened after an ingest; None when nothing is ingested."""
+    global _store
+    if not STORE_PATH:
+        return None
+    with _store_lock:
+        if _store is None:
+            if not os.path.exists(os.path.join(STORE_PATH, "chain.json")):
+                return None
+            _store = ChainStore(STORE_PATH)
+        else:
+            _store.refresh()
+        return _store
+
+
+def _quote(ref):
+    store = get_store()
+    if store is None:
+        raise ValueError("'id' needs an ingested chain store (OPTIONS_CHAIN_STORE)")
+    raw = ref["id"]
+    try:
+        # 12, "12" and 12.0 name quote 12; 1.7, inf and nan name nothing
+        value = math.nan if isinstance(raw, bool) else raw if isinstance(raw, int) else float(raw)
+    except (TypeError, ValueError):
+        value = math.nan
+    if isinstance(value, float) and not value.is_integer():
+        raise ValueError("'id' must be an integer chain id")
+    chain_id = int(value)
+    try:
+        return store.quote(chain_id)
+    except KeyError:
+        raise ValueError(f"unknown chain id {chain_id}")
+
+
+def _finite(value):
+    return value if value is not None and math.isfinite(value) else None
+
+
+def chain_leg(leg):
+    """Fill ``type``/``K``/``price``/``days``/``vol`` of a leg naming a chain ``id``;
+    fields given on the leg win. Raises ValueError with a user-facing message."""
+    quote = _quote(leg)
+    filled = {"type": quote["kind"], "K": quote["strike"], "days": quote["days"]}
+    if _finite(quote["mid"]) is not None:
+        filled["price"] = quote["mid"]
+    elif leg.get("price") in (None, ""):
+        raise ValueError(f"chain id {quote['id']} has no bid/ask or last price; pass 'price'")
+    if _finite(quote["iv"]) is not None:
+        filled["vol"] = quote["iv"]
+    return {**filled, **{k: v for k, v in leg.items() if k != "id"}}
+
+
+def chain_contract(row):
+    """pricing.json row fields (strike, kind, days, vol, spot) from a chain ``id``."""
+    quote = _quote(row)
+    filled = {"strike": quote["strike"], "kind": quote["kind"], "days_to_expiry": quote["days"]}
+    for name, key in (("vol", "iv"), ("spot", "underlying_price")):
+        if _finite(quote[key]) is not None:
+            filled[name] = quote[key]
+    return {**filled, **{k: v for k, v in row.items() if k != "id"}}
+
+
+def _json_column(values):
+    values = np.asarray(values, dtype=float)
+    return np.where(np.isfinite(values), values, None).tolist()
+
+
+def chain_json(request):
+    """Browse the chain store: ``?underlying`` lists quote dates, ``&date`` expiries and
+    ``&expiry`` the chain itself with the ids legs and pricing.json rows can refer to."""
+    store = get_store()
+    if store is None:
+        return JsonResponse({"errors": ["no chain store (run manage.py ingest_chains)"]}, status=404)
+    underlying = (request.GET.get("underlying") or "").strip().upper()
+    date = (request.GET.get("date") or "").strip()
+    expiry = (request.GET.get("expiry") or "").strip()
+    if not underlying:
+        return JsonResponse({"underlyings": store.symbols})
+    try:
+        if not date:
+            return JsonResponse({"underlying": underlying, "dates": [d.isoformat() for d in store.dates(underlying)]})
+        if not expiry:
+            day = datetime.date.fromisoformat(date)
+            return JsonResponse({"underlying": underlying, "date": day.isoformat(), "expiries": [
+                {"expiry": e.isoformat(), "days": (e - day).days} for e in store.expiries(underlying, day)]})
+        chain = store.chain(underlying, date, expiry)
+    except ValueError:
+        return JsonResponse({"errors": ["'date' and 'expiry' must be YYYY-MM-DD"]}, status=400)
+    except KeyError as ex:
+        return JsonResponse({"errors": [ex.args[0]]}, status=404)
+
+    return JsonResponse({
+        "underlying": chain.underlying, "date": chain.date.isoformat(), "expiry": chain.expiry.isoformat(),
+        "days": chain.days, "spot": _finite(chain.spot),
+        "ids": chain.ids.tolist(),
+        "strike": chain.strike.tolist(),
+        "kind": np.where(chain.is_call, "call", "put").tolist(),
+        "bid": _json_column(chain["bid"]), "ask": _json_column(chain["ask"]),
+        "last": _json_column(chain["last"]), "mid": _json_column(chain.mid),
+        "iv": _json_column(chain["iv"]),
+        "volume": chain["volume"].tolist(), "open_interest": chain["open_interest"].tolist(),
+    })
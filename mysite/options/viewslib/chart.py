@@ -1,22 +1,99 @@
 # options/viewslib/chart.py
 import io
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
-from django.http import HttpResponse
-from django.views.decorators.cache import never_cache
-from .utils import parse_params, build_strategy_from_params
-
-@never_cache
-def option_payoff_png(request):
-    params, errors = parse_params(request)
-    if errors:
-        return HttpResponse("Bad Request: " + "; ".join(errors), status=400, content_type="text/plain")
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from .cache import payoff_png_cache
+from .offload import Saturated, TimedOut, offload, unavailable
+from ..optionslib.timing import stage
+from ..optionslib.plotting import render_payoff_png, render_payoff_svg
+from .utils import parse_params, get_strategy_result, params_cache_key
+
+# "canvas": reuse one pre-styled Agg figure per worker thread; "pyplot": new figure per
+# request; "svg": Matplotlib-free vector output (served as image/svg+xml)
+RENDERER = getattr(settings, "OPTIONS_PAYOFF_RENDERER", "canvas")
+
+
+def _etag_matches(request, etag):
+    header = request.headers.get("If-None-Match", "")
+    return any(tag.strip() in (etag, "W/" + etag, "*") for tag in header.split(","))
 
-    strat = build_strategy_from_params(params)
-    fig = strat.plot(color="white", linewidth=2)
+
+def _render_png(params):
+    strat = get_strategy_result(params).strat
+    if RENDERER == "svg":
+        with stage("svg"):
+            return render_payoff_svg(strat, color="white", linewidth=2)
+    if RENDERER == "canvas":
+        return render_payoff_png(strat, color="white", linewidth=2)
+
+    import matplotlib
+    matplotlib.use("Agg")  # headless; only this path goes through pyplot
+    import matplotlib.pyplot as plt
+    with stage("plot"):
+        fig = strat.plot(color="white", linewidth=2)
     buf = io.BytesIO()
-    fig.savefig(buf, format="png", bbox_inches="tight")
+    with stage("savefig"):
+        fig.savefig(buf, format="png", bbox_inches="tight")
     plt.close(fig)
-    buf.seek(0)
-    return HttpResponse(buf.getvalue(), content_type="image/png")
+    return buf.getvalue()
+
+
+def _cached_png(key, params):
+    png = payoff_png_cache.get(key)
+    if png is None:
+        png = _render_png(params)
+        payoff_png_cache.set(key, png)
+    return png
+
+
+def _png_request(request):
+    """``(params, key, etag, error response)`` shared by the sync and async views."""
+    params, errors = parse_params(request)
+    if errors:
+        return params, None, None, HttpResponse("Bad Request: " + "; ".join(errors), status=400,
+                                                content_type="text/plain")
+    key = f"{RENDERER}-{params_cache_key(params)}"
+    return params, key, f'"{key}"', None
+
+
+def _png_response(params, etag, png):
+    if png is None:
+        response = HttpResponseNotModified()
+    else:
+        content_type = "image/svg+xml" if RENDERER == "svg" else "image/png"
+        response = HttpResponse(png, content_type=content_type)
+
+    if params["requested_by"] is not None:
+        response["X-Grid-Coarsened"] = f"by={params['requested_by']:g}->{params['by']:g}"
+    # the bytes are a pure function of the params, so let browsers revalidate by ETag
+    response["ETag"] = etag
+    patch_cache_control(response, no_cache=True, public=True)
+    return response
+
+
+def option_payoff_png(request):
+    params, key, etag, error = _png_request(request)
+    if error is not None:
+        return error
+    png = None if _etag_matches(request, etag) else _cached_png(key, params)
+    return _png_response(params, etag, png)
+
+
+async def option_payoff_png_async(request):
+    """``option_payoff_png`` with the render on the "render" offload lane."""
+    params, key, etag, error = _png_request(request)
+    if error is not None:
+        return error
+    png = None
+    if not _etag_matches(request, etag):
+        # in-process hits are served from the event loop; misses (and the shared
+        # backend lookup) go to the pool
+        png = payoff_png_cache.local.get(key)
+        if png is None:
+            try:
+                png = await offload("render", _cached_png, key, params)
+            except (Saturated, TimedOut) as exc:
+                return unavailable(exc)
+            payoff_png_cache.local.set(key, png)
+    return _png_response(params, etag, png)
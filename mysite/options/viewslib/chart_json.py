@@ -1,17 +1,97 @@
-from django.http import JsonResponse
-from .utils import parse_params, build_strategy_from_params
+import base64
+import json
+import numpy as np
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, JsonResponse
+from .offload import Saturated, TimedOut, offload, unavailable
+from .utils import _check_mtm_budget, parse_params, get_strategy_result
+from ..optionslib.plotting import MTM_POINTS
+from ..optionslib.timing import stage
 
-def payoff_json(request):
+MAX_POINTS_FLOOR = 16
+
+
+def _encode(arr, encoding):
+    if encoding == "f32":
+        return base64.b64encode(np.ascontiguousarray(arr, dtype="<f4").tobytes()).decode("ascii")
+    return arr.tolist()
+
+
+def _parse(request):
     params, errors = parse_params(request)
+
+    max_points = request.GET.get("max_points")
+    if max_points not in (None, ""):
+        try:
+            max_points = int(float(max_points))
+        except (ValueError, OverflowError):
+            errors.append("invalid 'max_points' (must be an integer)")
+            max_points = None
+        else:
+            if max_points < 1:
+                errors.append("'max_points' must be >= 1")
+            # a handful of points can't show the kinks; small positive values are raised
+            max_points = max(MAX_POINTS_FLOOR, max_points)
+    elif params["valuation"]:
+        # mark-to-market curves are priced per point: don't send the full grid by default
+        max_points = MTM_POINTS
+    else:
+        max_points = None
+    if max_points is not None and max_points > MTM_POINTS and not errors:
+        _check_mtm_budget(params["valuation"], params["legs"],
+                          min(max_points, int((params["stop"] - params["start"]) / params["by"]) + 1), errors)
+    encoding = request.GET.get("encoding") or "json"
+    if encoding not in ("json", "f32"):
+        errors.append("invalid 'encoding' (must be 'json' or 'f32')")
+    return params, max_points, encoding, errors
+
+
+def _payload(params, max_points, encoding):
+    result = get_strategy_result(params)
+    with stage("sample"):
+        x, y = result.strat.sample(max_points)
+        curves = result.strat.mtm_curves(x)
+
+    with stage("serialize"):
+        mtm = [{"label": label, "y": _encode(vals, encoding)} for label, vals in curves]
+        return {
+            "name": params.get("name", ""),
+            "S0": params.get("S0", 0.0),
+            "by": params["by"],
+            "requested_by": params["requested_by"],
+            "encoding": encoding,
+            "n": int(len(x)),
+            "x": _encode(x, encoding),
+            "y": _encode(y, encoding),
+            "mtm": mtm,
+            "metrics": result.metrics,
+            "desc": result.desc,
+        }
+
+
+def _payload_bytes(params, max_points, encoding):
+    # encoded in the worker too, so the event loop only copies bytes
+    payload = _payload(params, max_points, encoding)
+    with stage("serialize"):
+        return json.dumps(payload, cls=DjangoJSONEncoder).encode()
+
+
+def payoff_json(request):
+    params, max_points, encoding, errors = _parse(request)
+    if errors:
+        return JsonResponse({"errors": errors}, status=400)
+    payload = _payload(params, max_points, encoding)
+    with stage("serialize"):
+        return JsonResponse(payload)
+
+
+async def payoff_json_async(request):
+    """``payoff_json`` with the build, sampling and encoding on the "compute" offload lane."""
+    params, max_points, encoding, errors = _parse(request)
     if errors:
         return JsonResponse({"errors": errors}, status=400)
-    strat = build_strategy_from_params(params)
-    
-    return JsonResponse({
-        "name": params.get("name", ""),
-        "S0": params.get("S0", 0.0),
-        "x": strat.STs.tolist(),
-        "y": strat.payoffs.tolist(),
-        "metrics": strat.metrics(),       
-        "desc": strat.describe_text(),
-    })
+    try:
+        body = await offload("compute", _payload_bytes, params, max_points, encoding)
+    except (Saturated, TimedOut) as exc:
+        return unavailable(exc, as_json=True)
+    return HttpResponse(body, content_type="application/json")
@@ -1,6 +1,7 @@
 from django.shortcuts import render
 from django.utils.timezone import now
-from .utils import parse_params, build_strategy_from_params
+from .utils import parse_params, get_strategy_result
+from ..optionslib.timing import stage
 
 def dashboard(request):
     params, errors = parse_params(request)
@@ -11,12 +12,14 @@ def dashboard(request):
         "cb": int(now().timestamp()),
         "metrics": None,
         "desc_text": "",
+        "query": request.GET,
     }
 
     if not errors:
-        strat = build_strategy_from_params(params)
-        ctx["metrics"] = strat.metrics()
-        ctx["desc_text"] = strat.describe_text()
+        result = get_strategy_result(params)
+        ctx["metrics"] = result.metrics
+        ctx["desc_text"] = result.desc
         ctx["chart_ready"] = True
 
-    return render(request, "options/home.html", ctx)
+    with stage("template"):
+        return render(request, "options/home.html", ctx)
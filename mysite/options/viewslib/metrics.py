@@ -0,0 +1,21 @@
+from django.http import Http404, HttpResponse
+from .. import instrumentation
+from .cache import payoff_png_cache, strategy_cache
+from .utils import grid_guard_counts
+
+
+def metrics(request):
+    """Prometheus text endpoint: request/stage latency histograms plus grid-guard and cache counters.
+
+    404 unless OPTIONS_INSTRUMENTATION["ENABLED"] is set.
+    """
+    if not instrumentation.ENABLED:
+        raise Http404("instrumentation is disabled")
+    lines = ["# TYPE options_grid_guard_total counter"]
+    for event, n in sorted(grid_guard_counts.items()):
+        lines.append(f'options_grid_guard_total{{event="{event}"}} {n}')
+    lines.append("# TYPE options_cache_entries gauge")
+    lines.append(f'options_cache_entries{{cache="payoff_png"}} {len(payoff_png_cache.local)}')
+    lines.append(f'options_cache_entries{{cache="strategy"}} {len(strategy_cache)}')
+    body = instrumentation.registry.exposition() + "\n".join(lines) + "\n"
+    return HttpResponse(body, content_type="text/plain; version=0.0.4; charset=utf-8")
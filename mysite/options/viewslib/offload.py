@@ -0,0 +1,131 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+
+_conf = getattr(settings, "OPTIONS_OFFLOAD", {})
+RETRY_AFTER = int(_conf.get("RETRY_AFTER", 1))
+# renders and JSON/pricing work get separate pools so slow charts can't starve cheap requests
+_LANE_DEFAULTS = {
+    "render": {"KIND": "thread", "WORKERS": 2, "QUEUE": 8, "TIMEOUT": 10.0},
+    "compute": {"KIND": "thread", "WORKERS": 4, "QUEUE": 32, "TIMEOUT": 5.0},
+}
+
+
+class Saturated(Exception):
+    """Every worker is busy and the lane's queue is full."""
+
+
+class TimedOut(Exception):
+    """The work did not finish within the lane's timeout."""
+
+
+def _init_process():
+    import django
+    from django.apps import apps
+    if not apps.ready:  # spawn-based pools start from a bare interpreter
+        django.setup()
+
+
+class Lane:
+    """An executor plus an admission counter: at most ``workers + queue`` jobs in flight.
+
+    A job holds its slot until it really finishes; a timed-out job that is already running
+    keeps its worker busy, so the slot is only released by the completion callback.
+    """
+
+    def __init__(self, name, kind="thread", workers=2, queue=8, timeout=10.0):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"OPTIONS_OFFLOAD lane {name!r}: KIND must be 'thread' or 'process'")
+        self.name = name
+        self.kind = kind
+        self.workers = max(1, int(workers))
+        self.capacity = self.workers + max(0, int(queue))
+        self.timeout = timeout
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    def _pool(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.kind == "process":
+                        self._executor = ProcessPoolExecutor(self.workers, initializer=_init_process)
+                    else:
+                        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix=f"offload-{self.name}")
+        return self._executor
+
+    def _release(self, _future):
+        with self._lock:
+            self._in_flight -= 1
+
+    def submit(self, fn, *args):
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                raise Saturated(self.name)
+            self._in_flight += 1
+        try:
+            if self.kind == "thread":
+                # carry contextvars (e.g. instrumentation stage timings) into the worker thread
+                future = self._pool().submit(contextvars.copy_context().run, fn, *args)
+            else:
+                future = self._pool().submit(fn, *args)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, fn, *args):
+        """Await ``fn(*args)`` on the lane; raises Saturated or TimedOut instead of queueing forever."""
+        future = self.submit(fn, *args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            future.cancel()  # frees the slot if the job never started
+            raise TimedOut(self.name)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def _build_lanes():
+    lanes = {}
+    overrides = _conf.get("LANES", {})
+    for name in set(_LANE_DEFAULTS) | set(overrides):
+        opts = {**_LANE_DEFAULTS.get(name, _LANE_DEFAULTS["compute"]), **overrides.get(name, {})}
+        lanes[name] = Lane(name, opts["KIND"], opts["WORKERS"], opts["QUEUE"], opts["TIMEOUT"])
+    return lanes
+
+
+lanes = _build_lanes()
+
+
+async def offload(lane, fn, *args):
+    """Run CPU-bound ``fn(*args)`` on the named lane (see OPTIONS_OFFLOAD)."""
+    return await lanes[lane].run(fn, *args)
+
+
+def unavailable(exc, as_json=False):
+    """503 + Retry-After when a lane is saturated, 504 when the job timed out."""
+    if isinstance(exc, Saturated):
+        status, message = 503, f"server busy ({exc} queue full), retry shortly"
+    else:
+        status, message = 504, f"request timed out ({exc})"
+    if as_json:
+        response = JsonResponse({"errors": [message]}, status=status)
+    else:
+        response = HttpResponse(message, status=status, content_type="text/plain")
+    if status == 503:
+        response["Retry-After"] = str(RETRY_AFTER)
+    return response
@@ -0,0 +1,114 @@
+import json
+from urllib.parse import urlencode
+
+import numpy as np
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from ..optionslib.optimizer import OBJECTIVES, STRUCTURES, optimize_chain
+from ..optionslib.timing import stage
+from .pricing import _parse_percent_maybe
+
+MAX_STRIKES = 500
+MAX_TOP_N = 100
+
+
+def _column(data, name, n, errors):
+    raw = data.get(name)
+    if not isinstance(raw, list) or len(raw) != n:
+        errors.append(f"'{name}' must be an array with one entry per strike")
+        return None
+    try:
+        return np.array([np.nan if v is None else float(v) for v in raw])
+    except (TypeError, ValueError):
+        errors.append(f"'{name}' must hold numbers (null for no quote)")
+        return None
+
+
+def _number(data, name, default, errors, percent=False):
+    raw = data.get(name, default)
+    if raw is None:
+        return None
+    value = _parse_percent_maybe(raw) if percent else None
+    if value is None:
+        try:
+            value = float(raw)
+        except (TypeError, ValueError):
+            errors.append(f"invalid '{name}' (must be a number)")
+            return None
+    if not np.isfinite(value):
+        errors.append(f"invalid '{name}' (must be a finite number)")
+        return None
+    return value
+
+
+def _payoff_query(result, S0):
+    """Query string for the payoff page (same params ``parse_params`` reads)."""
+    strikes = [leg["K"] for leg in result["legs"]]
+    lo, hi = min(strikes + [S0]), max(strikes + [S0])
+    pad = 0.25 * (hi - lo) or 0.1 * S0
+    legs = [{**leg, "side": "long" if leg["side"] == 1 else "short"} for leg in result["legs"]]
+    return urlencode({
+        "name": result["structure"].replace("_", " "), "S0": f"{S0:g}",
+        "start": f"{max(lo - pad, 0.0):g}", "stop": f"{hi + pad:g}", "by": f"{(hi - lo + 2 * pad) / 400:.4g}",
+        "legs": json.dumps(legs),
+    })
+
+
+@csrf_exempt
+@require_POST
+def optimize_json(request):
+    """Best verticals / iron condors on a posted chain.
+
+    Body: ``S0``, ``strikes`` with ``calls``/``puts`` premiums (null = no quote), and
+    optionally ``structure``, ``objective``, ``max_loss``, ``max_width``, ``top_n``,
+    ``days``, ``vol`` and ``mu`` (percent or decimal) for the expiry view.
+    """
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError:
+        return JsonResponse({"errors": ["body must be valid JSON"]}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({"errors": ["body must be a JSON object"]}, status=400)
+
+    errors = []
+    strikes = data.get("strikes")
+    if not isinstance(strikes, list) or not 2 <= len(strikes) <= MAX_STRIKES:
+        return JsonResponse({"errors": [f"'strikes' must be an array of 2..{MAX_STRIKES} numbers"]}, status=400)
+    n = len(strikes)
+    K = _column(data, "strikes", n, errors)
+    calls = _column(data, "calls", n, errors)
+    puts = _column(data, "puts", n, errors)
+    S0 = _number(data, "S0", None, errors)
+    days = _number(data, "days", 30, errors)
+    sigma = _number(data, "vol", "20", errors, percent=True)
+    mu = _number(data, "mu", "0", errors, percent=True)
+    max_loss = _number(data, "max_loss", None, errors)
+    max_width = _number(data, "max_width", None, errors)
+    structure = data.get("structure", "iron_condor")
+    objective = data.get("objective", "expected_pnl")
+    if structure not in STRUCTURES:
+        errors.append(f"'structure' must be one of {', '.join(STRUCTURES)}")
+    if objective not in OBJECTIVES:
+        errors.append(f"'objective' must be one of {', '.join(OBJECTIVES)}")
+    try:
+        top_n = min(MAX_TOP_N, max(1, int(data.get("top_n", 10))))
+    except (TypeError, ValueError, OverflowError):
+        errors.append("invalid 'top_n' (must be an integer)")
+    if S0 is None:
+        errors.append("'S0' is required")
+    if errors:
+        return JsonResponse({"errors": errors}, status=400)
+
+    try:
+        with stage("optimize"):
+            results = optimize_chain(S0, K, calls, puts, structure, objective, max_loss=max_loss, top_n=top_n,
+                                     days=days, sigma=sigma, mu=mu, max_width=max_width)
+    except ValueError as ex:
+        return JsonResponse({"errors": [str(ex)]}, status=400)
+
+    for result in results:
+        result["query"] = _payoff_query(result, S0)
+    return JsonResponse({"structure": structure, "objective": objective, "count": len(results),
+                         "results": results})
@@ -1,10 +1,26 @@
+import json
+import math
 from datetime import datetime
+import numpy as np
 from django.utils import timezone
 from django.shortcuts import render
-from options.optionslib.black_scholes import bsm_price, greeks
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from options.optionslib.black_scholes import GREEK_NAMES, bsm_price_greeks, bsm_price_greeks_batch
+from options.optionslib.implied_vol import implied_vol
+from options.optionslib.lattice import lattice_price, lattice_greeks
+from options.optionslib.timing import stage
+from .chains import chain_contract
+from .offload import Saturated, TimedOut, offload, unavailable
 
 DATE_FMT = "%Y-%m-%d"
 
+# pricing.json: chains above this many contracts are streamed back in chunks
+STREAM_THRESHOLD = 5000
+STREAM_CHUNK = 2000
+MAX_CONTRACTS = 2_000_000
+
 
 def _to_float(x):
     try:
@@ -64,79 +80,311 @@ def _normalize_kind(x):
     return "call"
 
 
-def pricing(request):
+def _normalize_style(x):
+    s = str(x or "").strip().lower()
+    return "american" if s in {"a", "american", "us"} else "european"
+
+
+def _pricing_context(post):
+    """Template context for a submitted pricing form (``post`` is request.POST or a dict)."""
     context = {}
+    spot_in = post.get("spot")
+    strike_in = post.get("strike")
+    vol_in = post.get("vol", "20.0")
+    rate_in = post.get("rate", "2.0")
+    q_in = post.get("div_yield")
+    days_in = post.get("days_to_expiry")
+    date_in = post.get("expiry_date")
+    mkt_in = post.get("market_price")
+    raw_kind = post.get("kind", "call")
+    kind = _normalize_kind(raw_kind)
+    style = _normalize_style(post.get("style"))
+    lib_kind = "c" if kind == "call" else "p"
+
+    S = _to_float(spot_in)
+    K = _to_float(strike_in)
+    sigma = _parse_percent_maybe(vol_in)
+    r = _parse_percent_maybe(rate_in)
+    q = _parse_percent_maybe(q_in)
+    T = _t_from_inputs(days_in, date_in)
+    mkt = _to_float(mkt_in)
+
+    if r is None:
+        r = 0.0
+    if q is None:
+        q = 0.0
+
+    # A market price backs out sigma; it also stands in for a missing vol input.
+    if mkt is not None and S is not None and K is not None and T is not None:
+        iv, iv_status = implied_vol(mkt, S, K, T, r, q, lib_kind)
+        context["iv_status"] = iv_status
+        if iv is not None:
+            context["iv_fmt"] = _percent_str(iv)
+            if sigma is None:
+                sigma = iv
+
+    missing = []
+    if S is None:
+        missing.append("spot")
+    if K is None:
+        missing.append("strike")
+    if sigma is None:
+        missing.append("volatility")
+    if T is None:
+        missing.append("expiry (days or date)")
+
+    if missing:
+        context["error"] = "Please provide: " + ", ".join(missing)
+    else:
+        try:
+            if style == "american":
+                # no closed form for early exercise: price it on the lattice
+                with stage("lattice"):
+                    price = lattice_price(spot=S, strike=K, t=T, r=r, sigma=sigma, q=q, kind=lib_kind)
+                    greek_vals = lattice_greeks(spot=S, strike=K, t=T, r=r, sigma=sigma, q=q, kind=lib_kind)
+            else:
+                with stage("bsm_price"):
+                    price, greek_vals = bsm_price_greeks(
+                        spot=S, strike=K, t=T, r=r, sigma=sigma, q=q, kind=lib_kind
+                    )
+
+            context.update(
+                {
+                    "price": f"{price:.6f}",
+                    "t_years": f"{T:.6f}",
+                    "vol_fmt": _percent_str(sigma),
+                    "rate_fmt": _percent_str(r),
+                    "div_fmt": _percent_str(q),
+                    "greeks": {g: f"{v:.6f}" for g, v in greek_vals.items()},
+                }
+            )
+        except Exception as ex:
+            context["error"] = f"Could not compute price: {ex}"
+
+    # Always repopulate inputs for form
+    context.update(
+        {
+            "spot": spot_in,
+            "strike": strike_in,
+            "vol": vol_in,
+            "rate": rate_in,
+            "div_yield": q_in,
+            "days_to_expiry": days_in,
+            "expiry_date": date_in,
+            "market_price": mkt_in,
+            "kind": kind,
+            "style": style,
+        }
+    )
+    return context
+
 
+def pricing(request):
+    context = _pricing_context(request.POST) if request.method == "POST" else {}
+    return render(request, "options/pricing.html", context)
+
+
+async def pricing_async(request):
+    """``pricing`` with the pricing/IV work on the "compute" offload lane."""
+    context = {}
     if request.method == "POST":
-        spot_in = request.POST.get("spot")
-        strike_in = request.POST.get("strike")
-        vol_in = request.POST.get("vol", "20.0")
-        rate_in = request.POST.get("rate", "2.0")
-        q_in = request.POST.get("div_yield")
-        days_in = request.POST.get("days_to_expiry")
-        date_in = request.POST.get("expiry_date")
-        raw_kind = request.POST.get("kind", "call")
-        kind = _normalize_kind(raw_kind)
-        lib_kind = "c" if kind == "call" else "p"
-
-        S = _to_float(spot_in)
-        K = _to_float(strike_in)
-        sigma = _parse_percent_maybe(vol_in)
-        r = _parse_percent_maybe(rate_in)
-        q = _parse_percent_maybe(q_in)
-        T = _t_from_inputs(days_in, date_in)
-
-        if r is None:
-            r = 0.0
-        if q is None:
-            q = 0.0
-
-        missing = []
-        if S is None:
-            missing.append("spot")
-        if K is None:
-            missing.append("strike")
-        if sigma is None:
-            missing.append("volatility")
-        if T is None:
-            missing.append("expiry (days or date)")
+        try:
+            context = await offload("compute", _pricing_context, request.POST.dict())
+        except (Saturated, TimedOut) as exc:
+            return unavailable(exc)
+    return render(request, "options/pricing.html", context)
 
+
+def _contracts_from_rows(rows, defaults, errors):
+    """List-of-objects form: every row may override the top-level defaults."""
+    cols = {"spot": [], "strike": [], "t": [], "sigma": [], "r": [], "q": [], "kind": []}
+    for i, row in enumerate(rows, 1):
+        if not isinstance(row, dict):
+            errors.append(f"contract #{i} must be an object")
+            continue
+        if row.get("id") not in (None, ""):
+            # fields from the chain store sit between the defaults and the row's own
+            try:
+                row = chain_contract(row)
+            except ValueError as ex:
+                errors.append(f"contract #{i}: {ex}")
+                continue
+        row = {**defaults, **row}
+        S = _to_float(row.get("spot"))
+        K = _to_float(row.get("strike"))
+        sigma = _parse_percent_maybe(row.get("vol"))
+        T = _t_from_inputs(row.get("days_to_expiry"), row.get("expiry_date"))
+        missing = [n for n, v in (("spot", S), ("strike", K), ("volatility", sigma),
+                                  ("expiry (days or date)", T)) if v is None]
         if missing:
-            context["error"] = "Please provide: " + ", ".join(missing)
+            errors.append(f"contract #{i}: please provide " + ", ".join(missing))
+            continue
+        r = _parse_percent_maybe(row.get("rate")) or 0.0
+        q = _parse_percent_maybe(row.get("div_yield")) or 0.0
+        bad = [n for n, v in (("spot", S), ("strike", K), ("vol", sigma), ("rate", r), ("div_yield", q),
+                              ("expiry", T)) if not math.isfinite(v)]
+        if bad:
+            errors.append(f"contract #{i}: " + ", ".join(bad) + " must be finite")
+            continue
+        if S <= 0 or K <= 0:
+            errors.append(f"contract #{i}: spot and strike must be > 0")
+            continue
+        cols["spot"].append(S)
+        cols["strike"].append(K)
+        cols["t"].append(T)
+        cols["sigma"].append(sigma)
+        cols["r"].append(r)
+        cols["q"].append(q)
+        cols["kind"].append(_normalize_kind(row.get("kind")))
+    return cols
+
+
+def _contracts_from_columns(data, errors):
+    """Compact form: one spot, strikes x expiries x kinds, vol as scalar, per-expiry or [expiry][strike]."""
+    S = _to_float(data.get("spot"))
+    if S is None:
+        errors.append("please provide: spot")
+    elif not (math.isfinite(S) and S > 0):
+        errors.append("'spot' must be a finite number > 0")
+    r = _parse_percent_maybe(data.get("rate")) or 0.0
+    q = _parse_percent_maybe(data.get("div_yield")) or 0.0
+    if not (math.isfinite(r) and math.isfinite(q)):
+        errors.append("'rate' and 'div_yield' must be finite")
+    strikes, expiries = data.get("strikes"), data.get("expiries")
+    kinds = data.get("kinds") or [data.get("kind")]
+    if not isinstance(strikes, list) or not strikes:
+        errors.append("'strikes' must be a non-empty list of numbers")
+        return None
+    if not isinstance(expiries, list) or not expiries:
+        errors.append("'expiries' must be a non-empty list of days or YYYY-MM-DD dates")
+        return None
+    if not isinstance(kinds, list):
+        errors.append("'kinds' must be a list of call/put")
+        return None
+    # the grid is the product of the three lists: size it before building anything
+    n = len(kinds) * len(expiries) * len(strikes)
+    if n > MAX_CONTRACTS:
+        errors.append(f"too many contracts ({n} > {MAX_CONTRACTS})")
+        return None
+
+    strikes = [_to_float(k) for k in strikes]
+    if any(k is None for k in strikes):
+        errors.append("'strikes' must be a non-empty list of numbers")
+    elif not all(math.isfinite(k) and k > 0 for k in strikes):
+        errors.append("'strikes' must be finite numbers > 0")
+
+    ts = []
+    for e in expiries:
+        if isinstance(e, str) and not e.strip().lstrip("-").isdigit():
+            ts.append(_t_from_inputs(None, e))
         else:
-            try:
-                price = bsm_price(
-                    spot=S, strike=K, t=T, r=r, sigma=sigma, q=q, kind=lib_kind
-                )
-                greek_vals = greeks(
-                    spot=S, strike=K, t=T, r=r, sigma=sigma, q=q, kind=lib_kind
-                )
-
-                context.update(
-                    {
-                        "price": f"{price:.6f}",
-                        "t_years": f"{T:.6f}",
-                        "vol_fmt": _percent_str(sigma),
-                        "rate_fmt": _percent_str(r),
-                        "div_fmt": _percent_str(q),
-                        "greeks": {g: f"{v:.6f}" for g, v in greek_vals.items()},
-                    }
-                )
-            except Exception as ex:
-                context["error"] = f"Could not compute price: {ex}"
-
-        # Always repopulate inputs for form
-        context.update(
-            {
-                "spot": spot_in,
-                "strike": strike_in,
-                "vol": vol_in,
-                "rate": rate_in,
-                "div_yield": q_in,
-                "days_to_expiry": days_in,
-                "expiry_date": date_in,
-                "kind": kind,
-            }
-        )
+            ts.append(_t_from_inputs(e, None))
+    if any(t is None or not math.isfinite(t) for t in ts):
+        errors.append("'expiries' must be a non-empty list of days or YYYY-MM-DD dates")
 
-    return render(request, "options/pricing.html", context)
+    kinds = [_normalize_kind(k) for k in kinds]
+    if errors:
+        return None
+
+    vols = data.get("vols", data.get("vol"))
+    try:
+        if isinstance(vols, list):
+            surface = np.array(
+                [[_parse_percent_maybe(v) for v in row] if isinstance(row, list) else _parse_percent_maybe(row)
+                 for row in vols],
+                dtype=float,
+            )
+            if surface.ndim == 1:
+                surface = surface[:, None]
+            surface = np.broadcast_to(surface, (len(ts), len(strikes)))
+        else:
+            sigma = _parse_percent_maybe(vols)
+            surface = np.full((len(ts), len(strikes)), np.nan if sigma is None else sigma)
+    except (TypeError, ValueError):
+        errors.append("'vols' must be a number, one per expiry, or an [expiry][strike] grid")
+        return None
+    if np.isnan(surface).any():
+        errors.append("please provide: volatility")
+        return None
+    if not np.isfinite(surface).all():
+        errors.append("'vols' must be finite")
+        return None
+
+    n_k, n_t, n_c = len(kinds), len(ts), len(strikes)
+    return {
+        "spot": [S] * (n_k * n_t * n_c),
+        "strike": np.tile(strikes, n_k * n_t),
+        "t": np.tile(np.repeat(ts, n_c), n_k),
+        "sigma": np.tile(surface.ravel(), n_k),
+        "r": [r] * (n_k * n_t * n_c),
+        "q": [q] * (n_k * n_t * n_c),
+        "kind": np.repeat(kinds, n_t * n_c),
+    }
+
+
+def _price_columns(cols):
+    kind = np.asarray(cols["kind"])
+    lib_kind = kind == "call"
+    args = dict(
+        spot=np.asarray(cols["spot"], dtype=float), strike=np.asarray(cols["strike"], dtype=float),
+        t=np.asarray(cols["t"], dtype=float), r=np.asarray(cols["r"], dtype=float),
+        sigma=np.asarray(cols["sigma"], dtype=float), q=np.asarray(cols["q"], dtype=float),
+    )
+    with stage("bsm_price"):
+        price, g = bsm_price_greeks_batch(kind=lib_kind, **args)
+    out = {
+        "spot": args["spot"], "strike": args["strike"], "t_years": args["t"],
+        "sigma": args["sigma"], "kind": kind, "price": price,
+    }
+    for name in GREEK_NAMES:
+        out[name] = g[name]
+    return out
+
+
+def _rows(out, lo, hi):
+    keys = list(out)
+    cols = [out[k][lo:hi].tolist() for k in keys]
+    return [dict(zip(keys, vals)) for vals in zip(*cols)]
+
+
+def _stream_results(out, n):
+    yield '{"count": %d, "results": [' % n
+    for lo in range(0, n, STREAM_CHUNK):
+        chunk = json.dumps(_rows(out, lo, lo + STREAM_CHUNK))[1:-1]
+        yield ("," if lo else "") + chunk
+    yield "]}"
+
+
+@csrf_exempt
+@require_POST
+def pricing_json(request):
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError:
+        return JsonResponse({"errors": ["body must be valid JSON"]}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({"errors": ["body must be a JSON object"]}, status=400)
+
+    errors = []
+    if "contracts" in data:
+        rows = data["contracts"]
+        if not isinstance(rows, list):
+            return JsonResponse({"errors": ["'contracts' must be a JSON array"]}, status=400)
+        if len(rows) > MAX_CONTRACTS:
+            return JsonResponse({"errors": [f"too many contracts ({len(rows)} > {MAX_CONTRACTS})"]}, status=400)
+        defaults = {k: v for k, v in data.items() if k != "contracts"}
+        cols = _contracts_from_rows(rows, defaults, errors)
+    else:
+        cols = _contracts_from_columns(data, errors)
+    if errors:
+        return JsonResponse({"errors": errors}, status=400)
+
+    n = len(cols["strike"])
+    if n > MAX_CONTRACTS:
+        return JsonResponse({"errors": [f"too many contracts ({n} > {MAX_CONTRACTS})"]}, status=400)
+
+    out = _price_columns(cols)
+    if n > STREAM_THRESHOLD:
+        return StreamingHttpResponse(_stream_results(out, n), content_type="application/json")
+    with stage("serialize"):
+        return JsonResponse({"count": n, "results": _rows(out, 0, n)})
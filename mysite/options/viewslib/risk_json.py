@@ -0,0 +1,70 @@
+import math
+
+import numpy as np
+from django.http import JsonResponse
+from .pricing import _parse_percent_maybe
+from .utils import parse_params, build_strategy_from_params
+
+MAX_SCENARIO_STEPS = 41
+
+
+def _shifts(q, name, default_range, default_steps, errors):
+    try:
+        rng = float(q.get(f"{name}_range", default_range))
+        steps = int(q.get(f"{name}_steps", default_steps))
+    except ValueError:
+        errors.append(f"invalid '{name}_range' / '{name}_steps'")
+        return None
+    if not 1 <= steps <= MAX_SCENARIO_STEPS or not 0 <= rng < math.inf:
+        errors.append(f"'{name}_steps' must be 1..{MAX_SCENARIO_STEPS} and '{name}_range' a finite number >= 0")
+        return None
+    return np.linspace(-rng, rng, steps) / 100.0
+
+
+def risk_json(request):
+    """Aggregated greeks and a spot x vol P&L grid for the legs in the query string.
+
+    Needs S0 > 0 plus ``days`` and ``vol`` (percent) unless every leg carries its own;
+    no payoff grid (start/stop/by) is involved.
+    """
+    params, errors = parse_params(request, grid=False)
+    q = request.GET
+    legs = params["legs"]
+
+    if not 0 < params["S0"] < math.inf:
+        errors.append("'S0' must be > 0")
+    days_default = q.get("days")
+    vol_default = _parse_percent_maybe(q.get("vol"))
+    days, vols = [], []
+    for i, leg in enumerate(legs, 1):
+        d = leg.get("days", days_default)
+        v = leg.get("vol", vol_default)
+        try:
+            d = float(d)
+        except (TypeError, ValueError):
+            errors.append(f"leg #{i}: no 'days' (set it on the leg or as a query parameter)")
+            d = None
+        if v is None:
+            errors.append(f"leg #{i}: no 'vol' (set it on the leg or as a query parameter)")
+        if any(x is not None and not math.isfinite(x) for x in (d, v)):
+            errors.append(f"leg #{i}: 'days' and 'vol' must be finite")
+        days.append(d)
+        vols.append(v)
+
+    spot_shifts = _shifts(q, "spot", 20, 9, errors)
+    vol_shifts = _shifts(q, "vol", 10, 5, errors)
+    if errors:
+        return JsonResponse({"errors": errors}, status=400)
+
+    strat = build_strategy_from_params(params)
+    r = _parse_percent_maybe(q.get("rate")) or 0.0
+    div = _parse_percent_maybe(q.get("div_yield")) or 0.0
+    S, days, vols = params["S0"], np.array(days), np.array(vols, dtype=float)
+
+    return JsonResponse({
+        "S0": S,
+        "greeks": strat.greeks(S, days, vols, r, div),
+        "spot_shifts": spot_shifts.tolist(),
+        "vol_shifts": vol_shifts.tolist(),
+        "pnl": strat.risk_grid(S, days, vols, r, div, spot_shifts=spot_shifts, vol_shifts=vol_shifts).tolist(),
+    })
@@ -0,0 +1,89 @@
+from django.db.models import OuterRef, Q, Subquery
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.timezone import now
+from django.views.decorators.http import require_POST
+from ..models import PricingSnapshot, SavedStrategy
+from .utils import parse_params
+
+MAX_LISTED = 200
+
+
+def _visible(request):
+    """Strategies without an owner are shared; owned ones are only visible to their owner."""
+    qs = SavedStrategy.objects.all()
+    if request.user.is_authenticated:
+        return qs.filter(Q(owner__isnull=True) | Q(owner=request.user))
+    return qs.filter(owner__isnull=True)
+
+
+@require_POST
+def save_strategy(request):
+    """Save the strategy in the query string (same params as the payoff page)."""
+    params, errors = parse_params(request)
+    # the page only offers "save" for a valid strategy; parse_params bounds Q to what
+    # StrategyLeg.Q (PositiveIntegerField) stores
+    if errors:
+        return JsonResponse({"errors": errors}, status=400)
+    if not params["legs"]:
+        return redirect(f"/?{request.GET.urlencode()}")
+    strategy = SavedStrategy.create_with_legs(
+        params["legs"],
+        owner=request.user if request.user.is_authenticated else None,
+        name=params["name"],
+        underlying=(request.POST.get("underlying") or "").strip().upper()[:32],
+        S0=params["S0"],
+        start=params["start"],
+        stop=params["stop"],
+        by=params["by"],
+    )
+    return redirect("saved_strategy", pk=strategy.pk)
+
+
+def saved_strategy(request, pk):
+    """Payoff page for a saved strategy; the summary comes from the stored metrics."""
+    strategy = get_object_or_404(_visible(request).prefetch_related("legs"), pk=pk)
+    legs = list(strategy.legs.all())
+    if strategy.metrics is None:
+        strategy.refresh_metrics(legs)
+    ctx = {
+        "params": strategy.to_params(legs),
+        "errors": [],
+        "ready": True,
+        "cb": int(now().timestamp()),
+        "metrics": strategy.metrics,
+        "desc_text": strategy.description,
+        "query": strategy.query_string(legs),
+        "saved": strategy,
+        "snapshot": strategy.snapshots.first(),
+    }
+    return render(request, "options/home.html", ctx)
+
+
+def saved_json(request):
+    """Recently updated strategies (``?underlying=``, ``?mine=1``) with their latest snapshot."""
+    q = request.GET
+    qs = _visible(request)
+    if q.get("mine"):
+        if not request.user.is_authenticated:
+            raise Http404
+        qs = qs.filter(owner=request.user)
+    if q.get("underlying"):
+        qs = qs.filter(underlying=q["underlying"].strip().upper())
+    try:
+        limit = min(max(int(q.get("limit", 50)), 1), MAX_LISTED)
+    except ValueError:
+        return JsonResponse({"errors": ["'limit' must be an integer"]}, status=400)
+
+    latest = PricingSnapshot.objects.filter(strategy=OuterRef("pk")).order_by("-as_of")
+    rows = (
+        qs.order_by("-updated_at")
+        .annotate(
+            snapshot_as_of=Subquery(latest.values("as_of")[:1]),
+            snapshot_value=Subquery(latest.values("value")[:1]),
+            snapshot_pnl=Subquery(latest.values("pnl")[:1]),
+        )
+        .values("id", "name", "underlying", "S0", "metrics", "updated_at",
+                "snapshot_as_of", "snapshot_value", "snapshot_pnl")[:limit]
+    )
+    return JsonResponse({"results": list(rows)})
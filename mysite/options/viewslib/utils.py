@@ -1,6 +1,31 @@
+import hashlib
+import json
+import math
+import threading
 from typing import Tuple, Dict, List, Any
+from django.conf import settings
 from django.http import HttpRequest
 from ..optionslib import OptionStrat
+from ..optionslib.plotting import MTM_POINTS
+from ..optionslib.timing import stage
+from .chains import chain_leg
+from .pricing import _parse_percent_maybe
+
+_grid_conf = getattr(settings, "OPTIONS_GRID_LIMITS", {})
+# STs/payoffs are float64, so each point costs ~16 bytes plus the plot copy
+MAX_GRID_POINTS = int(_grid_conf.get("MAX_POINTS", 200_000))
+COARSEN_GRID = bool(_grid_conf.get("COARSEN", True))
+# mark-to-market curves x distinct strikes x points priced for one chart
+MAX_MTM_VALUES = int(_grid_conf.get("MAX_MTM_VALUES", 5_000_000))
+
+# how often the grid budget kicked in (read by monitoring)
+grid_guard_counts = {"coarsened": 0, "rejected": 0}
+_grid_guard_lock = threading.Lock()
+
+
+def _count(event: str) -> None:
+    with _grid_guard_lock:
+        grid_guard_counts[event] += 1
 
 
 def _to_float(name: str, val: str, errors: List[str]) -> float:
@@ -19,8 +44,26 @@ def _to_int(name: str, val: str, errors: List[str]) -> int:
         return 1
 
 
+# contracts per leg; LEG_DTYPE stores Q as int64 and payoffs scale by it
+MAX_QUANTITY = 1_000_000
+# legs per strategy (and so distinct strikes in every payoff and mark-to-market pass)
+MAX_LEGS = 40
+
+
+def _quantity(raw: Any) -> Any:
+    """A leg's ``Q`` as an int in 1..MAX_QUANTITY (``"3"`` and ``3.0`` are fine), else None."""
+    if isinstance(raw, bool):
+        return None
+    try:
+        value = raw if isinstance(raw, int) else float(raw)
+    except (TypeError, ValueError):
+        return None
+    if isinstance(value, float) and not value.is_integer():
+        return None
+    return int(value) if 1 <= value <= MAX_QUANTITY else None
+
+
 def _parse_legs_from_json(raw: str, errors: List[str]) -> List[Dict[str, Any]]:
-    import json
     try:
         data = json.loads(raw)
     except Exception:
@@ -29,12 +72,22 @@ def _parse_legs_from_json(raw: str, errors: List[str]) -> List[Dict[str, Any]]:
     if not isinstance(data, list):
         errors.append("invalid 'legs' (must be a JSON array)")
         return []
+    if len(data) > MAX_LEGS:
+        errors.append(f"at most {MAX_LEGS} legs")
+        return []
 
     legs: List[Dict[str, Any]] = []
     for i, leg in enumerate(data, 1):
         if not isinstance(leg, dict):
             errors.append(f"leg #{i} must be an object")
             continue
+        if leg.get("id") not in (None, ""):
+            # a quote in the chain store supplies type/K/price/days/vol
+            try:
+                leg = chain_leg(leg)
+            except ValueError as ex:
+                errors.append(f"leg #{i}: {ex}")
+                continue
         type_ = str(leg.get("type", "")).lower()
         side_in = str(leg.get("side", "")).lower()
         if type_ not in ("call", "put"):
@@ -53,12 +106,31 @@ def _parse_legs_from_json(raw: str, errors: List[str]) -> List[Dict[str, Any]]:
         except Exception:
             errors.append(f"leg #{i}: 'K' and 'price' must be numbers")
             continue
-        Q = int(leg.get("Q", 1))
-        legs.append({"type": type_, "side": side, "K": K, "price": price, "Q": Q})
+        if not (math.isfinite(K) and math.isfinite(price)) or K <= 0:
+            errors.append(f"leg #{i}: 'K' must be > 0 and 'price' a finite number")
+            continue
+        Q = _quantity(leg.get("Q", 1))
+        if Q is None:
+            errors.append(f"leg #{i}: 'Q' must be an integer from 1 to {MAX_QUANTITY}")
+            continue
+        parsed = {"type": type_, "side": side, "K": K, "price": price, "Q": Q}
+        # optional per-leg expiry / vol, used by risk.json
+        if leg.get("days") not in (None, ""):
+            try:
+                parsed["days"] = float(leg["days"])
+            except Exception:
+                errors.append(f"leg #{i}: 'days' must be a number")
+        if leg.get("vol") not in (None, ""):
+            vol = _parse_percent_maybe(leg["vol"])
+            if vol is None:
+                errors.append(f"leg #{i}: 'vol' must be a number")
+            else:
+                parsed["vol"] = vol
+        legs.append(parsed)
     return legs
 
 
-def _parse_indexed_legs(q) -> List[Dict[str, Any]]:
+def _parse_indexed_legs(q, errors: List[str]) -> List[Dict[str, Any]]:
     legs: List[Dict[str, Any]] = []
     for i in range(1, 21):
         t = q.get(f"l{i}_type")
@@ -73,13 +145,92 @@ def _parse_indexed_legs(q) -> List[Dict[str, Any]]:
         except Exception:
             # skip silently; the dashboard will show validation from parse_params
             continue
-        Q = int(q.get(f"l{i}_Q", 1))
+        if not (math.isfinite(K) and math.isfinite(price)) or K <= 0:
+            errors.append(f"invalid 'l{i}_K'/'l{i}_price' ('K' must be > 0, 'price' a finite number)")
+            continue
+        Q = _quantity(q.get(f"l{i}_Q") or 1)
+        if Q is None:
+            errors.append(f"invalid 'l{i}_Q' (must be an integer from 1 to {MAX_QUANTITY})")
+            continue
         legs.append({"type": type_, "side": side, "K": K, "price": price, "Q": Q})
     return legs
 
 
-def parse_params(request: HttpRequest) -> Tuple[Dict[str, Any], List[str]]:
-    q = request.GET
+MAX_MTM_DAYS = 10
+MAX_MTM_VOLS = 5
+
+
+def _parse_valuation(q, errors: List[str]):
+    """Optional pre-expiry curves: mtm_days=30,10,1 and mtm_vol=20 (percent or decimal)."""
+    raw_days = (q.get("mtm_days") or "").strip()
+    if not raw_days:
+        return None
+    days, sigmas = [], []
+    for part in raw_days.split(","):
+        d = _to_float("mtm_days", part, errors)
+        if d < 0:
+            errors.append("'mtm_days' must be >= 0")
+        days.append(d)
+    for part in (q.get("mtm_vol") or "20").split(","):
+        v = _parse_percent_maybe(part)
+        if v is None or v <= 0:
+            errors.append("invalid 'mtm_vol' (must be a positive number)")
+            continue
+        sigmas.append(v)
+    if len(days) > MAX_MTM_DAYS or len(sigmas) > MAX_MTM_VOLS:
+        errors.append(f"at most {MAX_MTM_DAYS} 'mtm_days' and {MAX_MTM_VOLS} 'mtm_vol' values")
+    return {
+        "days": days,
+        "sigmas": sigmas,
+        "r": _parse_percent_maybe(q.get("rate")) or 0.0,
+        "q": _parse_percent_maybe(q.get("div_yield")) or 0.0,
+    }
+
+
+def _check_mtm_budget(valuation, legs, points: int, errors: List[str]) -> None:
+    """Mark-to-market curves cost curves x distinct strikes x points in call_value_sums."""
+    if not valuation or not legs:
+        return
+    rows = len(valuation["days"]) * len(valuation["sigmas"])
+    strikes = len({leg["K"] for leg in legs})
+    if rows * strikes * points > MAX_MTM_VALUES:
+        errors.append(f"too many mark-to-market values ({rows} curves x {strikes} strikes x {points} points, "
+                      f"at most {MAX_MTM_VALUES}): use fewer 'mtm_days'/'mtm_vol' values or strikes")
+
+
+def _coarse_step(start: float, stop: float) -> float:
+    """Smallest 2-significant-digit step that keeps the grid within MAX_GRID_POINTS."""
+    raw = (stop - start) / MAX_GRID_POINTS
+    mag = 10 ** (math.floor(math.log10(raw)) - 1)
+    return math.ceil(raw / mag) * mag
+
+
+def _enforce_grid_budget(start: float, stop: float, by: float, errors: List[str]) -> Tuple[float, Any]:
+    """Checked before OptionStrat ever allocates the grid."""
+    if not math.isfinite(stop - start):
+        # e.g. start=-1e308&stop=1e308: no step can make that a grid
+        _count("rejected")
+        errors.append("'stop' - 'start' is too large")
+        return by, None
+    if (stop - start) / by <= MAX_GRID_POINTS:
+        return by, None
+    if not COARSEN_GRID:
+        _count("rejected")
+        errors.append(f"grid too large: at most {MAX_GRID_POINTS} points (increase 'by')")
+        return by, None
+    _count("coarsened")
+    return _coarse_step(start, stop), by
+
+
+def parse_params(request: HttpRequest, grid: bool = True) -> Tuple[Dict[str, Any], List[str]]:
+    return parse_query(request.GET, grid)
+
+
+def parse_query(q, grid: bool = True) -> Tuple[Dict[str, Any], List[str]]:
+    """``parse_params`` for any mapping with ``.get`` (QueryDict, dict); used offline too.
+
+    ``grid=False`` is for views that never plot the payoff: start/stop/by are ignored.
+    """
     errors: List[str] = []
 
     name = (q.get("name") or "").strip()
@@ -93,28 +244,40 @@ def parse_params(request: HttpRequest) -> Tuple[Dict[str, Any], List[str]]:
             errors.append("invalid 'S0' (must be a number)")
             S0 = None
 
-    start = q.get("start")
-    stop = q.get("stop")
-    by = q.get("by")
-    # if start in (None, ""): errors.append("missing 'start'")
-    # if stop  in (None, ""): errors.append("missing 'stop'")
-    # if by    in (None, ""): errors.append("missing 'by'")
+    start = q.get("start") if grid else None
+    stop = q.get("stop") if grid else None
+    by = q.get("by") if grid else None
 
     start_v = _to_float("start", start, errors) if start not in (None, "") else 0.0
     stop_v = _to_float("stop", stop, errors) if stop not in (None, "") else 0.0
     by_v = _to_float("by", by, errors) if by not in (None, "") else 1.0
 
-    # if by_v <= 0:
-    #     errors.append("'by' must be > 0")
-    # if stop_v <= start_v:
-    #     errors.append("'stop' must be > 'start'")
+    requested_by = None
+    grid_points = 0
+    if grid:
+        if not all(math.isfinite(v) for v in (start_v, stop_v, by_v)):
+            errors.append("'start', 'stop' and 'by' must be finite numbers")
+        else:
+            if by_v <= 0:
+                errors.append("'by' must be > 0")
+            if stop_v <= start_v:
+                errors.append("'stop' must be > 'start'")
+            if by_v > 0 and stop_v > start_v:
+                by_v, requested_by = _enforce_grid_budget(start_v, stop_v, by_v, errors)
+                if math.isfinite(stop_v - start_v):
+                    grid_points = int((stop_v - start_v) / by_v) + 1
 
     legs: List[Dict[str, Any]] = []
     raw_legs = q.get("legs")
     if raw_legs not in (None, ""):
         legs = _parse_legs_from_json(raw_legs, errors)
     else:
-        legs = _parse_indexed_legs(q)
+        legs = _parse_indexed_legs(q, errors)
+
+    valuation = _parse_valuation(q, errors)
+    if grid_points:
+        # charts draw the curves at MTM_POINTS sampled spots at most
+        _check_mtm_budget(valuation, legs, min(grid_points, MTM_POINTS), errors)
 
     params = {
         "name": name,  # may be ""
@@ -122,11 +285,24 @@ def parse_params(request: HttpRequest) -> Tuple[Dict[str, Any], List[str]]:
         "start": start_v,
         "stop": stop_v,
         "by": by_v,
+        "requested_by": requested_by,  # original 'by' when the grid was coarsened, else None
         "legs": legs,  # may be empty (zero line)
+        "valuation": valuation,  # None, or mark-to-market days/vols/r/q
     }
     return params, errors
 
 
+def params_cache_key(p: Dict[str, Any]) -> str:
+    """Stable hash of parsed params; leg order doesn't change the payoff so legs are sorted."""
+    legs = sorted(
+        (leg["type"], leg["side"], float(leg["K"]), float(leg["price"]), int(leg.get("Q", 1)))
+        for leg in p["legs"]
+    )
+    canon = [p["name"], float(p["S0"]), float(p["start"]), float(p["stop"]), float(p["by"]), legs,
+             p.get("valuation")]
+    return hashlib.sha1(json.dumps(canon, separators=(",", ":")).encode()).hexdigest()
+
+
 def build_strategy_from_params(p: Dict[str, Any]) -> OptionStrat:
     strat = OptionStrat(
         p["name"] or "",  # empty string name is fine
@@ -143,4 +319,33 @@ def build_strategy_from_params(p: Dict[str, Any]) -> OptionStrat:
             (strat.long_put if leg["side"] == 1 else strat.short_put)(
                 leg["K"], leg["price"], leg.get("Q", 1)
             )
-    return strat
\ No newline at end of file
+    if p.get("valuation"):
+        strat.set_valuation(**p["valuation"])
+    return strat
+
+
+class StrategyResult:
+    """Everything the views derive from one set of params, computed once."""
+    __slots__ = ("key", "strat", "metrics", "desc")
+
+    def __init__(self, key: str, strat: OptionStrat):
+        self.key = key
+        self.strat = strat
+        with stage("metrics"):
+            self.metrics = strat.metrics()
+            self.desc = strat.describe_text()
+
+
+def get_strategy_result(p: Dict[str, Any]) -> StrategyResult:
+    """Memoized build: the HTML page, payoff.json and payoff.png for the same
+    params share one OptionStrat (see OPTIONS_STRATEGY_CACHE)."""
+    from .cache import strategy_cache
+
+    key = params_cache_key(p)
+    result = strategy_cache.get(key)
+    if result is None:
+        with stage("build"):
+            strat = build_strategy_from_params(p)
+        result = StrategyResult(key, strat)
+        strategy_cache.set(key, result)
+    return result